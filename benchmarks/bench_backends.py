@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""Compare git backends on synthetic repositories.
+
+Repositories are generated with ``git fast-import`` (in a temporary
+directory) and the commit graph is then read:
+
+- through ``git log`` (records, the way the changelog is built),
+- through ``git rev-list --parents`` (the default backend),
+- straight from the packs, in Python (the ``objects`` backend).
+
+Random access (reading of single commits) is measured as well.
+
+Usage:
+
+    python benchmarks/bench_backends.py --commits 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.backends import (  # noqa
+    BaseBackend,
+    ObjectsBackend,
+    SessionBackend,
+)
+from matyan.utils import iter_git_records  # noqa
+
+RANDOM_READS = 1000
+
+
+def make_repository(path: str, count: int) -> None:
+    """Make repository of `count` commits (every fourth of them a merge)."""
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    process = subprocess.Popen(
+        ['git', 'fast-import', '--quiet'],
+        cwd=path,
+        stdin=subprocess.PIPE
+    )
+    write = process.stdin.write
+    timestamp = 1500000000
+    for mark in range(1, count + 1):
+        timestamp += 10
+        message = 'MSFT-{} Commit number {}'.format(mark // 4, mark).encode()
+        write(
+            b'commit refs/heads/master\nmark :%d\n'
+            b'author Dev <dev@example.com> %d +0000\n'
+            b'committer Dev <dev@example.com> %d +0000\n'
+            b'data %d\n%s\n' % (mark, timestamp, timestamp,
+                                len(message), message)
+        )
+        if mark > 1:
+            write(b'from :%d\n' % (mark - 1))
+        if mark > 4 and mark % 4 == 0:
+            write(b'merge :%d\n' % (mark - 3))
+        write(b'M 644 inline file%d\ndata 1\nx\n' % (mark % 100))
+    process.stdin.close()
+    process.wait()
+
+
+def measure(label: str, count: int, func) -> None:
+    start = time.perf_counter()
+    result = func()
+    duration = time.perf_counter() - start
+    print(
+        '    {:<32} {:>8.2f}s {:>8.2f}us/commit {:>9} commits'.format(
+            label,
+            duration,
+            duration * 1000000 / count,
+            result
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--commits',
+        type=int,
+        nargs='+',
+        default=[10000, 100000]
+    )
+    args = parser.parse_args()
+
+    for count in args.commits:
+        path = tempfile.mkdtemp()
+        try:
+            start = time.perf_counter()
+            make_repository(path, count)
+            print('{} commits (generated in {:.2f}s)'.format(
+                count,
+                time.perf_counter() - start
+            ))
+
+            git = BaseBackend(path)
+            objects = ObjectsBackend(path)
+            head = git.resolve('HEAD')
+            measure(
+                'git log (records)',
+                count,
+                lambda: sum(1 for _ in iter_git_records(git, head))
+            )
+            measure(
+                'git rev-list --parents',
+                count,
+                lambda: len(git.get_parents([head]))
+            )
+            commit_hashes = list(objects.get_parents([head]))
+            measure(
+                'objects (pure Python)',
+                count,
+                lambda: len(ObjectsBackend(path).get_parents([head]))
+            )
+
+            sample = random.sample(
+                commit_hashes,
+                min(RANDOM_READS, len(commit_hashes))
+            )
+            for label, backend in (
+                ('random reads, session', SessionBackend(path)),
+                ('random reads, objects', ObjectsBackend(path)),
+            ):
+                measure(
+                    label,
+                    len(sample),
+                    lambda: sum(
+                        1 for _c in sample if backend.read_commit(_c)
+                    )
+                )
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
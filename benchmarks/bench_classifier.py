@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Per-commit cost of the commit classification.
+
+Compares ``re.match`` with raw pattern strings (the way the changelog used
+to be built) with the `CommitClassifier`.
+
+Usage:
+
+    python benchmarks/bench_classifier.py --commits 1000000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.classifier import CommitClassifier  # noqa
+from matyan.labels import BRANCH_TYPE_OTHER  # noqa
+from matyan.patterns import (  # noqa
+    REGEX_PATTERN_COMMIT_LINE,
+    REGEX_PATTERN_MERGED_BRANCH_NAME,
+)
+from matyan.utils import get_branch_type  # noqa
+
+TITLES = (
+    ('Merged in feature/MSFT-{ticket}-token-authentication (pull request #1)',
+     'a b'),
+    ('Merge pull request #{ticket} in PROJ/repo from '
+     'bugfix/MSFT-{ticket}-fix-login to master', 'a b'),
+    ('MSFT-{ticket} Implement token authentication', 'a'),
+    ('MSFT-{ticket} Update docs', 'a'),
+    ('Fix tests', 'a'),
+)
+
+
+def make_records(count: int):
+    return [
+        {
+            'title': TITLES[_i % len(TITLES)][0].format(ticket=_i % 5000),
+            'merge': TITLES[_i % len(TITLES)][1],
+        }
+        for _i in range(count)
+    ]
+
+
+def classify_raw(records):
+    for record in records:
+        if ' ' in record['merge']:
+            match = re.match(REGEX_PATTERN_MERGED_BRANCH_NAME, record['title'])
+            if not match:
+                yield None
+                continue
+            try:
+                branch_type = get_branch_type(match.group('branch_type'))
+            except AttributeError:
+                branch_type = BRANCH_TYPE_OTHER
+            yield (
+                branch_type,
+                match.group('ticket_number'),
+                match.group('branch_title'),
+            )
+        else:
+            match = re.match(REGEX_PATTERN_COMMIT_LINE, record['title'])
+            try:
+                yield (
+                    None,
+                    match.group('ticket_number'),
+                    match.group('commit_message'),
+                )
+            except AttributeError:
+                yield None, '', record['title']
+
+
+def measure(label: str, count: int, func) -> None:
+    start = time.perf_counter()
+    classified = sum(1 for _ in func())
+    duration = time.perf_counter() - start
+    print(
+        '{:<24} {:>8.2f}s {:>8.2f}us/commit {:>9} classified'.format(
+            label,
+            duration,
+            duration * 1000000 / count,
+            classified
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commits', type=int, default=1000000)
+    args = parser.parse_args()
+    count = args.commits
+
+    records = make_records(count)
+    measure('re.match (raw strings)', count, lambda: classify_raw(records))
+    classifier = CommitClassifier()
+    measure(
+        'CommitClassifier',
+        count,
+        lambda: classifier.classify(records)
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""Build both changelog trees in one pass or one after another.
+
+A synthetic repository is generated with ``git fast-import`` (in a temporary
+directory): feature branches of a few commits each, merged one after
+another, with a release tagged every 200 merges. Then the following is
+timed:
+
+- `prepare_changelog` alone (flat tree),
+- `prepare_releases_changelog` alone (releases tree),
+- reading the logs once and building both trees with a single
+  `build_changelog_trees` pass.
+
+Usage:
+
+    python benchmarks/bench_engine.py --commits 10000 100000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.tree import TreeBuilder  # noqa
+from matyan.utils import (  # noqa
+    build_changelog_trees,
+    finalize_releases_tree,
+    get_logs,
+    get_releases_tree_builder,
+    prepare_changelog,
+    prepare_releases_changelog,
+)
+
+BRANCH_TYPES = ('feature', 'bugfix', 'hotfix')
+COMMITS_PER_BRANCH = 3
+MERGES_PER_RELEASE = 200
+
+
+def make_repository(path: str, count: int) -> None:
+    """Make repository of (about) `count` commits."""
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    process = subprocess.Popen(
+        ['git', 'fast-import', '--quiet'],
+        cwd=path,
+        stdin=subprocess.PIPE
+    )
+    write = process.stdin.write
+    state = {'mark': 0, 'timestamp': 1500000000}
+
+    def commit(ref: bytes, message: str, parents) -> int:
+        state['mark'] += 1
+        state['timestamp'] += 10
+        message = message.encode()
+        write(
+            b'commit %s\nmark :%d\n'
+            b'author Dev %d <dev@example.com> %d +0000\n'
+            b'committer Dev <dev@example.com> %d +0000\n'
+            b'data %d\n%s\n' % (ref, state['mark'], state['mark'] % 50,
+                                state['timestamp'], state['timestamp'],
+                                len(message), message)
+        )
+        if parents:
+            write(b'from :%d\n' % parents[0])
+            for parent in parents[1:]:
+                write(b'merge :%d\n' % parent)
+        write(b'M 644 inline file%d\ndata 1\nx\n' % (state['mark'] % 100))
+        return state['mark']
+
+    head = commit(b'refs/heads/master', 'Initial commit', [])
+    ticket = 0
+    while state['mark'] < count:
+        ticket += 1
+        branch = head
+        for number in range(COMMITS_PER_BRANCH):
+            branch = commit(
+                b'refs/heads/branch',
+                'MSFT-{} Change number {}'.format(ticket, number),
+                [branch]
+            )
+        head = commit(
+            b'refs/heads/master',
+            'Merged in {}/MSFT-{}-some-branch-title (pull request #{})'.format(
+                BRANCH_TYPES[ticket % len(BRANCH_TYPES)],
+                ticket,
+                ticket
+            ),
+            [head, branch]
+        )
+        if ticket % MERGES_PER_RELEASE == 0:
+            write(b'reset refs/tags/0.%d\nfrom :%d\n' % (
+                ticket // MERGES_PER_RELEASE,
+                head
+            ))
+    process.stdin.close()
+    process.wait()
+    subprocess.run(['git', 'branch', '-q', '-D', 'branch'], cwd=path)
+
+
+def prepare_both(path: str) -> None:
+    logs = get_logs(path=path)
+    tree_builder = TreeBuilder(unique_commit_messages=True)
+    releases_tree_builder = get_releases_tree_builder(
+        logs,
+        unique_commit_messages=True
+    )
+    build_changelog_trees(
+        logs,
+        tree_builder=tree_builder,
+        releases_tree_builder=releases_tree_builder
+    )
+    tree_builder.build()
+    finalize_releases_tree(releases_tree_builder.build())
+
+
+def measure(label: str, count: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    duration = time.perf_counter() - start
+    print(
+        '    {:<32} {:>8.2f}s {:>8.2f}us/commit'.format(
+            label,
+            duration,
+            duration * 1000000 / count
+        )
+    )
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--commits',
+        type=int,
+        nargs='+',
+        default=[10000, 100000]
+    )
+    args = parser.parse_args()
+
+    for count in args.commits:
+        path = tempfile.mkdtemp()
+        try:
+            make_repository(path, count)
+            print('{} commits'.format(count))
+            flat = measure(
+                'prepare_changelog',
+                count,
+                lambda: prepare_changelog(
+                    unique_commit_messages=True,
+                    path=path
+                )
+            )
+            releases = measure(
+                'prepare_releases_changelog',
+                count,
+                lambda: prepare_releases_changelog(
+                    unique_commit_messages=True,
+                    path=path
+                )
+            )
+            print('    {:<32} {:>8.2f}s'.format('both, one after another',
+                                             flat + releases))
+            measure('both, single pass', count, lambda: prepare_both(path))
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Fetching of ticket data one at a time and with `fetch_many`.
+
+A fake fetcher answers each request after a fixed latency (simulating a
+round trip to the issue tracker), so that the timings only show how the
+requests are scheduled.
+
+Usage:
+
+    python benchmarks/bench_fetch.py --tickets 600 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.fetchers import BaseFetcher  # noqa
+
+
+class LatencyFetcher(BaseFetcher):
+
+    uid: str = 'BenchLatencyFetcher'
+    latency: float = 0.05
+
+    def get_instance(self):
+        return None
+
+    def fetch_issue_data(self, issue_id: str):
+        time.sleep(self.latency)
+        return {'title': issue_id, 'description': issue_id}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tickets', type=int, default=600)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        default=[1, 8, 32]
+    )
+    args = parser.parse_args()
+
+    LatencyFetcher.latency = args.latency
+    issue_ids = ['MSFT-{}'.format(_i) for _i in range(args.tickets)]
+    print('{} tickets, {}s latency'.format(args.tickets, args.latency))
+
+    fetcher = LatencyFetcher()
+    start = time.perf_counter()
+    for issue_id in issue_ids:
+        fetcher.fetch_issue_data(issue_id)
+    print('    {:<16} {:>8.2f}s'.format(
+        'one at a time',
+        time.perf_counter() - start
+    ))
+
+    for workers in args.workers:
+        fetcher = LatencyFetcher()
+        fetcher.workers = workers
+        start = time.perf_counter()
+        fetcher.fetch_many(issue_ids)
+        print('    {:<16} {:>8.2f}s'.format(
+            'workers={}'.format(workers),
+            time.perf_counter() - start
+        ))
+
+
+if __name__ == '__main__':
+    main()
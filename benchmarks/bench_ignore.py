@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""Per-commit cost of the ignore rules check.
+
+Compares the plain checks (a list of exact words, a tuple of prefixes and
+a loop over the regex patterns) with the `IgnoreRuleSet`.
+
+Usage:
+
+    python benchmarks/bench_ignore.py --commits 1000000 --rules 300
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.ignore import IgnoreRuleSet  # noqa
+
+TITLES = (
+    'Implement token authentication {}',
+    'Wip {}',
+    'More on docs {}',
+    'Prepare 0.{}',
+    'Fix tests',
+)
+
+
+def make_rules(count: int):
+    third = count // 3
+    return (
+        ['word number {}'.format(_i) for _i in range(third)] + ['wip 7'],
+        ['continue on {} '.format(_i) for _i in range(third)] + ['more on'],
+        [r'Release {}\.\d+'.format(_i) for _i in range(third)]
+        + [r'[Pp]repare\s\d+\.\d+(\.\d)*'],
+    )
+
+
+def check_plain(messages, exact_words, prefixes, patterns):
+    prefixes = tuple(prefixes)
+    for message in messages:
+        if message.lower() in exact_words:
+            yield True
+            continue
+        if message.lower().startswith(prefixes):
+            yield True
+            continue
+        ignored = False
+        for pattern in patterns:
+            try:
+                if re.match(pattern, message).group():
+                    ignored = True
+                    break
+            except AttributeError:
+                pass
+        yield ignored
+
+
+def measure(label: str, count: int, func) -> None:
+    start = time.perf_counter()
+    ignored = sum(1 for _ignored in func() if _ignored)
+    duration = time.perf_counter() - start
+    print(
+        '{:<24} {:>8.2f}s {:>8.2f}us/commit {:>9} ignored'.format(
+            label,
+            duration,
+            duration * 1000000 / count,
+            ignored
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commits', type=int, default=1000000)
+    parser.add_argument('--rules', type=int, default=300)
+    args = parser.parse_args()
+    count = args.commits
+
+    messages = [
+        TITLES[_i % len(TITLES)].format(_i % 10) for _i in range(count)
+    ]
+    exact_words, prefixes, patterns = make_rules(args.rules)
+    measure(
+        'plain checks',
+        count,
+        lambda: check_plain(messages, exact_words, prefixes, patterns)
+    )
+    rules = IgnoreRuleSet(exact_words, prefixes, patterns)
+    measure(
+        'IgnoreRuleSet',
+        count,
+        lambda: (rules.is_ignored(_message) for _message in messages)
+    )
+
+
+if __name__ == '__main__':
+    main()
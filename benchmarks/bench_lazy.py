@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Build and render the releases changelog with eager or lazy releases.
+
+Synthetic commits are placed by the `ReleasesTreeBuilder` and by the
+`ColumnarReleasesTreeBuilder`, with the tree made upfront or releases made
+on access (``lazy_tree``). The tree is then rendered as markdown, fully
+and without the `Other` section (as with ``--no-other``). Every other
+commit is not part of any ticket (goes into the `Other` section).
+
+Times are cumulative: placement and build, then rendering on top of that.
+Memory (traced by `tracemalloc`) is measured from the placement on: held
+once the tree is built (commits placed along with the tree) and the peak
+of the placement, build and full rendering (rendered lines included).
+Tracing slows everything down, times are only comparable with each other.
+
+Usage:
+
+    python benchmarks/bench_lazy.py --commits 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.constants import TICKET_NUMBER_OTHER  # noqa
+from matyan.labels import BRANCH_TYPE_OTHER  # noqa
+from matyan.renderers import MarkdownRenderer  # noqa
+from matyan.store import ColumnarReleasesTreeBuilder  # noqa
+from matyan.tree import ReleasesTreeBuilder, TicketRecord  # noqa
+
+COMMITS_PER_TICKET = 5
+TICKETS_PER_RELEASE = 200
+AUTHORS = 50
+
+
+def place_commits(builder, count: int) -> None:
+    for number in range(count):
+        ticket = number // COMMITS_PER_TICKET // 2
+        release = '0.{}'.format(ticket // TICKETS_PER_RELEASE)
+        if number % 2:
+            branch_type = BRANCH_TYPE_OTHER
+            ticket_number = TICKET_NUMBER_OTHER
+        else:
+            branch_type = 'feature'
+            ticket_number = 'MSFT-{}'.format(ticket)
+            if number % (COMMITS_PER_TICKET * 2) == 0:
+                builder.add_ticket(
+                    release,
+                    TicketRecord(
+                        ticket_number=ticket_number,
+                        branch_type=branch_type,
+                        title='Ticket {}'.format(ticket),
+                        commits={},
+                    )
+                )
+        builder.add_commit(
+            release,
+            branch_type,
+            ticket_number,
+            '{:040x}'.format(number * 2654435761),
+            '{:040x}'.format(number * 2654435761)[:7],
+            'Developer {}'.format(number % AUTHORS),
+            '2020-02-09 12:{:02d}:{:02d} +0100'.format(
+                number // 60 % 60,
+                number % 60
+            ),
+            ticket_number,
+            'Change number {} of the ticket.'.format(number)
+        )
+
+
+def measure(label: str,
+            count: int,
+            builder_cls,
+            releases,
+            lazy_tree: bool) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    if lazy_tree:
+        builder = builder_cls(releases, {}, lazy_tree=True)
+    else:
+        builder = builder_cls(releases, {})
+    place_commits(builder, count)
+    releases_tree = builder.build()
+    built = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    durations = []
+    for include_other in (True, False):
+        start = time.perf_counter()
+        MarkdownRenderer().render_releases_changelog(
+            releases_tree=releases_tree,
+            include_other=include_other,
+            headings_only=False,
+            fetch_description=False
+        )
+        durations.append(built + time.perf_counter() - start)
+        if include_other:
+            peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        '    {:<16} {:>8.2f}s built {:>8.2f}s rendered '
+        '{:>8.2f}s rendered (no other) {:>8.1f} MiB held '
+        '{:>8.1f} MiB peak'.format(
+            label,
+            built,
+            *durations,
+            held / 2 ** 20,
+            peak / 2 ** 20
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--commits',
+        type=int,
+        nargs='+',
+        default=[100000, 1000000]
+    )
+    args = parser.parse_args()
+
+    for count in args.commits:
+        releases = [
+            '0.{}'.format(_i)
+            for _i in range(
+                count // COMMITS_PER_TICKET // 2 // TICKETS_PER_RELEASE,
+                -1,
+                -1
+            )
+        ]
+        print('{} commits'.format(count))
+        for label, builder_cls, lazy_tree in (
+            ('dicts', ReleasesTreeBuilder, False),
+            ('columnar', ColumnarReleasesTreeBuilder, False),
+            ('columnar, lazy', ColumnarReleasesTreeBuilder, True),
+        ):
+            measure(label, count, builder_cls, releases, lazy_tree)
+
+
+if __name__ == '__main__':
+    main()
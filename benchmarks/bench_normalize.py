@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Per-commit cost of the commit message normalization.
+
+Compares calling ``unslugify``, ``capitalize`` and ``add_final_dot`` one
+after another with the (cached) `Normalizer`.
+
+Usage:
+
+    python benchmarks/bench_normalize.py --commits 1000000 --distinct 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.auto_correct import (  # noqa
+    add_final_dot,
+    capitalize,
+    Normalizer,
+    unslugify,
+)
+
+
+def measure(label: str, count: int, func) -> None:
+    start = time.perf_counter()
+    func()
+    duration = time.perf_counter() - start
+    print(
+        '{:<24} {:>8.2f}s {:>8.2f}us/commit'.format(
+            label,
+            duration,
+            duration * 1000000 / count
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commits', type=int, default=1000000)
+    parser.add_argument('--distinct', type=int, default=1000)
+    args = parser.parse_args()
+    count = args.commits
+
+    messages = [
+        'fix-tests-{}. update docs'.format(_i % args.distinct)
+        for _i in range(count)
+    ]
+    measure(
+        'plain calls',
+        count,
+        lambda: [
+            add_final_dot(capitalize(unslugify(_message)))
+            for _message in messages
+        ]
+    )
+    normalize = Normalizer()
+    measure(
+        'Normalizer',
+        count,
+        lambda: [normalize(_message) for _message in messages]
+    )
+    print('hits: {}, misses: {}'.format(normalize.hits, normalize.misses))
+
+
+if __name__ == '__main__':
+    main()
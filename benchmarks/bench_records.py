@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Compare JSON lines with NUL separated records on a synthetic git log.
+
+Usage:
+
+    python benchmarks/bench_records.py --commits 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.constants import (  # noqa
+    RECORD_FIELD_SEPARATOR,
+    RECORD_SEPARATOR,
+)
+from matyan.records import iter_records  # noqa
+from matyan.utils import iter_log_entries  # noqa
+
+TITLES = (
+    'MSFT-{ticket} Implement token authentication',
+    'MSFT-{ticket} Update "authentication" docs',
+    'Merged in feature/MSFT-{ticket}-token-authentication (pull request #1)',
+    'Fix tests',
+    'Use \\d+ in the "tag" pattern',
+)
+
+
+def make_commits(count: int):
+    for counter in range(count):
+        yield (
+            '{:040x}'.format(counter),
+            '{:07x}'.format(counter),
+            '2019-11-17 20:50:49 +0000',
+            TITLES[counter % len(TITLES)].format(ticket=counter % 5000),
+            'Artur Barseghyan',
+            'artur.barseghyan@gmail.com',
+            '{:040x}'.format(counter + 1),
+        )
+
+
+def make_json_log(count: int) -> str:
+    # The way git fills in the `PRETTY_FORMAT` (no escaping at all)
+    return '\n'.join(
+        '{{"commit_hash": "{}", "commit_abbr": "{}", "datetime": "{}", '
+        '"title": "{}","author": "{}", "author_email": "{}", '
+        '"merge": "{}"}}'.format(*_commit)
+        for _commit in make_commits(count)
+    )
+
+
+def make_records_log(count: int) -> bytes:
+    return '\n'.join(
+        RECORD_FIELD_SEPARATOR.join(
+            (_hash, _abbr, _date, _author, _parents, '', _title)
+        ) + RECORD_SEPARATOR
+        for _hash, _abbr, _date, _title, _author, _email, _parents
+        in make_commits(count)
+    ).encode()
+
+
+def measure(label: str, count: int, func) -> None:
+    start = time.perf_counter()
+    parsed = sum(1 for _ in func())
+    duration = time.perf_counter() - start
+    print(
+        '{:<24} {:>8.2f}s {:>8.2f}us/commit {:>9} parsed {:>9} lost'.format(
+            label,
+            duration,
+            duration * 1000000 / count,
+            parsed,
+            count - parsed
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commits', type=int, default=1000000)
+    args = parser.parse_args()
+    count = args.commits
+
+    json_log = make_json_log(count)
+    measure(
+        'json.loads per line',
+        count,
+        lambda: iter_log_entries(json_log.split('\n'))
+    )
+    del json_log
+
+    records_log = make_records_log(count)
+    measure(
+        'records (one buffer)',
+        count,
+        lambda: iter_records([records_log])
+    )
+    measure(
+        'records (64K chunks)',
+        count,
+        lambda: iter_records(
+            records_log[_pos:_pos + 65536]
+            for _pos in range(0, len(records_log), 65536)
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
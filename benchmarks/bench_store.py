@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Memory and time of the columnar commit store.
+
+Synthetic commits are placed into the releases tree by the
+`ReleasesTreeBuilder` (nested dicts of records) and by the
+`ColumnarReleasesTreeBuilder` (commits in a `CommitStore`, placements
+grouped by a linear sort over integer columns).
+
+Memory is measured with ``tracemalloc`` once all commits are placed, before
+the tree is built. Synthetic hashes and titles are made on the fly, which
+adds to the placement time of both.
+
+Usage:
+
+    python benchmarks/bench_store.py --commits 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.store import ColumnarReleasesTreeBuilder  # noqa
+from matyan.tree import ReleasesTreeBuilder  # noqa
+
+COMMITS_PER_TICKET = 5
+TICKETS_PER_RELEASE = 200
+AUTHORS = 50
+
+
+def place_commits(builder, count: int) -> None:
+    for number in range(count):
+        ticket = number // COMMITS_PER_TICKET
+        release = '0.{}'.format(ticket // TICKETS_PER_RELEASE)
+        ticket_number = 'MSFT-{}'.format(ticket)
+        builder.add_commit(
+            release,
+            'feature' if ticket % 3 else 'bugfix',
+            ticket_number,
+            '{:040x}'.format(number * 2654435761),
+            '{:040x}'.format(number * 2654435761)[:7],
+            'Developer {}'.format(number % AUTHORS),
+            '2020-02-09 12:{:02d}:{:02d} +0100'.format(
+                number // 60 % 60,
+                number % 60
+            ),
+            ticket_number,
+            'Change number {} of the ticket.'.format(number)
+        )
+
+
+def measure(label: str, count: int, builder_cls, releases) -> None:
+    start = time.perf_counter()
+    builder = builder_cls(releases, {})
+    place_commits(builder, count)
+    placed = time.perf_counter() - start
+    start = time.perf_counter()
+    builder.build()
+    built = time.perf_counter() - start
+    del builder
+
+    # Memory is measured in a separate run, since tracing slows things down
+    tracemalloc.start()
+    builder = builder_cls(releases, {})
+    place_commits(builder, count)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(
+        '    {:<16} {:>8.1f}MB {:>8.2f}us/commit placed '
+        '{:>8.2f}us/commit built'.format(
+            label,
+            memory / 1024 / 1024,
+            placed * 1000000 / count,
+            built * 1000000 / count
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--commits',
+        type=int,
+        nargs='+',
+        default=[100000, 1000000]
+    )
+    args = parser.parse_args()
+
+    for count in args.commits:
+        releases = [
+            '0.{}'.format(_i)
+            for _i in range(
+                count // COMMITS_PER_TICKET // TICKETS_PER_RELEASE, -1, -1
+            )
+        ]
+        print('{} commits'.format(count))
+        measure('dicts', count, ReleasesTreeBuilder, releases)
+        measure('columnar', count, ColumnarReleasesTreeBuilder, releases)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Memory use of the changelog tree.
+
+A synthetic repository (feature branches of a few commits each, merged
+into master, a release tag every hundred merges) is generated with
+``git fast-import`` and the (releases) changelog tree is built of it.
+
+Sizes of all unique objects of the tree are summed up for the tree of
+slotted records and for its dict view (the way the tree used to be made
+of). Strings are shared by both, so the difference is in the containers
+and in the interned authors and ticket numbers.
+
+Usage:
+
+    python benchmarks/bench_tree_memory.py --commits 100000 500000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath('src'))
+
+from matyan.tree import tree_to_dict  # noqa
+from matyan.utils import prepare_releases_changelog  # noqa
+
+COMMITS_PER_BRANCH = 4
+MERGES_PER_RELEASE = 100
+AUTHORS = 50
+
+
+def make_repository(path: str, count: int) -> None:
+    """Make repository of about `count` commits."""
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    process = subprocess.Popen(
+        ['git', 'fast-import', '--quiet'],
+        cwd=path,
+        stdin=subprocess.PIPE
+    )
+    write = process.stdin.write
+    timestamp = 1500000000
+    mark = 0
+    master = None
+    for branch in range(1, count // (COMMITS_PER_BRANCH + 1) + 1):
+        parent = master
+        for number in range(COMMITS_PER_BRANCH + 1):
+            mark += 1
+            timestamp += 10
+            author = 'Developer {}'.format(mark % AUTHORS).encode()
+            if number < COMMITS_PER_BRANCH:
+                message = 'MSFT-{} Change number {}'.format(branch, number)
+            else:
+                message = 'Merged in feature/MSFT-{}-branch-{} ' \
+                          '(pull request #{})'.format(branch, branch, branch)
+            message = message.encode()
+            write(
+                b'commit refs/heads/master\nmark :%d\n'
+                b'author %s <dev@example.com> %d +0000\n'
+                b'committer %s <dev@example.com> %d +0000\n'
+                b'data %d\n%s\n' % (mark, author, timestamp, author,
+                                    timestamp, len(message), message)
+            )
+            if number < COMMITS_PER_BRANCH:
+                if parent:
+                    write(b'from :%d\n' % parent)
+                write(b'M 644 inline file%d\ndata 1\nx\n' % (mark % 100))
+                parent = mark
+            else:
+                # Merge of the branch into master
+                if master:
+                    write(b'from :%d\nmerge :%d\n' % (master, parent))
+                else:
+                    write(b'from :%d\n' % parent)
+                master = mark
+        if branch % MERGES_PER_RELEASE == 0:
+            write(b'reset refs/tags/0.%d\nfrom :%d\n' % (
+                branch // MERGES_PER_RELEASE,
+                master
+            ))
+    process.stdin.close()
+    process.wait()
+
+
+def get_size(root) -> int:
+    """Sum up sizes of all unique objects reachable from the root."""
+    seen = set()
+    stack = [root]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif hasattr(obj, '__slots__'):
+            stack.extend(
+                getattr(obj, _key)
+                for _key in obj.__slots__
+                if hasattr(obj, _key)
+            )
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--commits',
+        type=int,
+        nargs='+',
+        default=[100000]
+    )
+    args = parser.parse_args()
+
+    for count in args.commits:
+        path = tempfile.mkdtemp()
+        try:
+            make_repository(path, count)
+            start = time.perf_counter()
+            releases_tree = prepare_releases_changelog(path=path)
+            print('{} commits (tree built in {:.2f}s)'.format(
+                count,
+                time.perf_counter() - start
+            ))
+            records_size = get_size(releases_tree)
+            dicts_size = get_size(tree_to_dict(releases_tree))
+            print('    {:<16} {:>10.1f}MB'.format(
+                'dicts',
+                dicts_size / 1024 / 1024
+            ))
+            print('    {:<16} {:>10.1f}MB'.format(
+                'records',
+                records_size / 1024 / 1024
+            ))
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
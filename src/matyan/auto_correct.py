@@ -1,4 +1,9 @@
-from typing import AnyStr
+import re
+from functools import lru_cache
+from typing import AnyStr, Callable, Dict, Iterable
+
+from .labels import get_settings
+from .logger import LOGGER
 
 __author__ = 'Artur Barseghyan'
 __copyright__ = '2019-2020 Artur Barseghyan'
@@ -7,6 +12,11 @@ __all__ = (
     'add_final_dot',
     'capitalize',
     'capitalize_first_letter',
+    'DEFAULT_NORMALIZE_CACHE_SIZE',
+    'DEFAULT_NORMALIZE_STEPS',
+    'get_normalizer',
+    'Normalizer',
+    'NORMALIZE_STEPS',
     'unslugify',
 )
 
@@ -55,3 +65,79 @@ def add_final_dot(value: AnyStr) -> AnyStr:
     if len(value) and value[-1].isalnum() and not value.endswith('.'):
         return value + "."
     return value
+
+
+# Steps of the commit message normalization, by their names in the config
+NORMALIZE_STEPS: Dict[str, Callable[[str], str]] = {
+    'unslugify': unslugify,
+    'capitalize': capitalize,
+    'add_final_dot': add_final_dot,
+}
+DEFAULT_NORMALIZE_STEPS = ('unslugify', 'capitalize', 'add_final_dot')
+DEFAULT_NORMALIZE_CACHE_SIZE = 4096
+
+
+class Normalizer:
+    """Normalization pipeline of commit messages.
+
+    Steps are applied in the given order. Results are kept in a bounded LRU
+    cache keyed by the raw message, since the same messages (such as
+    "Fix tests") tend to repeat a lot.
+    """
+
+    def __init__(
+        self,
+        steps: Iterable[str] = DEFAULT_NORMALIZE_STEPS,
+        cache_size: int = DEFAULT_NORMALIZE_CACHE_SIZE
+    ):
+        self.steps = tuple(steps)
+        try:
+            self.functions = tuple(NORMALIZE_STEPS[_s] for _s in self.steps)
+        except KeyError as err:
+            raise ValueError(
+                f"Unknown normalization step {err}. Choose from: "
+                f"{', '.join(NORMALIZE_STEPS)}"
+            )
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, value: str) -> str:
+        for function in self.functions:
+            value = function(value)
+        return value
+
+    def __call__(self, value: str) -> str:
+        return self.normalize(value)
+
+    @property
+    def hits(self) -> int:
+        return self.normalize.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        return self.normalize.cache_info().misses
+
+    def log_stats(self) -> None:
+        """Log hits and misses of the cache."""
+        LOGGER.info(
+            f"Normalized commit messages: {self.hits} cache hits, "
+            f"{self.misses} misses"
+        )
+
+
+def get_normalizer() -> Normalizer:
+    """Get normalizer of commit messages as configured.
+
+    The ``normalize`` setting lists the steps (separated by spaces, commas
+    or new lines), ``normalizeCacheSize`` sets the size of the cache.
+
+    :return:
+    """
+    settings = get_settings()
+    steps = settings.get('normalize')
+    cache_size = settings.get('normalizeCacheSize')
+    return Normalizer(
+        DEFAULT_NORMALIZE_STEPS if steps is None
+        else [_s for _s in re.split(r'[\s,]+', steps) if _s],
+        DEFAULT_NORMALIZE_CACHE_SIZE if cache_size is None
+        else int(cache_size)
+    )
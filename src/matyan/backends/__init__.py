@@ -0,0 +1,4 @@
+from .base import *
+from .session import *
+from .commit_graph import *
+from .objects import *
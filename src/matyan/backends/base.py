@@ -0,0 +1,275 @@
+import os
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from git import Git
+from git.exc import GitCommandError
+
+from ..registry import Registry
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'BackendRegistry',
+    'BaseBackend',
+    'DEFAULT_BACKEND',
+    'get_backend',
+    'parse_commit',
+)
+
+DEFAULT_BACKEND = 'git'
+
+
+class BackendRegistry(Registry, type(Git)):
+    """Git backend registry."""
+
+    REGISTRY: Dict[str, Type] = {}
+
+
+def parse_commit(data: bytes) -> Dict[str, Any]:
+    """Parse raw commit object.
+
+    :param data: Commit object data (as stored by git).
+    :return: Dictionary with `tree`, `parents`, `author`, `committer` and
+        `message` keys.
+    """
+    headers, _, message = data.partition(b'\n\n')
+    commit = {
+        'tree': None,
+        'parents': [],
+        'author': None,
+        'committer': None,
+        'message': message.decode('utf-8', 'replace'),
+    }
+    for line in headers.split(b'\n'):
+        # Continuation lines (multi-line headers, such as `gpgsig`)
+        if line.startswith(b' '):
+            continue
+        key, _, value = line.partition(b' ')
+        if key == b'parent':
+            commit['parents'].append(value.decode('ascii'))
+        elif key == b'tree':
+            commit['tree'] = value.decode('ascii')
+        elif key in (b'author', b'committer'):
+            commit[key.decode('ascii')] = value.decode('utf-8', 'replace')
+    return commit
+
+
+class BaseBackend(Git, metaclass=BackendRegistry):
+    """Plain GitPython ``Git``. Each call runs a new git process."""
+
+    uid: str = DEFAULT_BACKEND
+    # Instances are kept for the whole run (see `get_backend`)
+    persistent: bool = False
+
+    def get_git_dir(self) -> str:
+        """Get absolute path to the git directory.
+
+        :return:
+        """
+        return self.rev_parse('--absolute-git-dir')
+
+    def get_common_dir(self) -> str:
+        """Get absolute path to the common git directory.
+
+        Same as the git directory, unless in a linked worktree: objects and
+        refs (other than ``HEAD``) are shared by all of the worktrees.
+
+        :return:
+        """
+        # Relative to the working directory, unless in a linked worktree
+        return os.path.abspath(
+            os.path.join(self.working_dir, self.rev_parse('--git-common-dir'))
+        )
+
+    def resolve(self, revision: str) -> Optional[str]:
+        """Resolve revision to the full hash of the commit.
+
+        :param revision:
+        :return: Commit hash or None if revision could not be resolved.
+        """
+        try:
+            return self.rev_parse(
+                '--verify',
+                '--quiet',
+                '{}^{{commit}}'.format(revision)
+            )
+        except GitCommandError:
+            return None
+
+    def resolve_many(self, revisions: List[str]) -> List[Optional[str]]:
+        """Resolve revisions to the full hashes of the commits.
+
+        :param revisions:
+        :return:
+        """
+        if len(revisions) > 1:
+            # All at once, unless any of them is not valid
+            try:
+                return self.rev_parse(*[
+                    '{}^{{commit}}'.format(_revision)
+                    for _revision in revisions
+                ]).split('\n')
+            except GitCommandError:
+                pass
+        return [self.resolve(_revision) for _revision in revisions]
+
+    def resolve_range(self, expression: str) -> Tuple[List[str], List[str]]:
+        """Resolve revision range (such as ``A..B``) without walking it.
+
+        :param expression: Revision or revision range.
+        :return: Tuple of commits to include and commits to exclude (along
+            with their ancestors). Both are empty if the expression is not
+            valid.
+        """
+        try:
+            output = self.rev_parse('--revs-only', expression)
+        except GitCommandError:
+            return [], []
+
+        include = []
+        exclude = []
+        for line in filter(None, output.split('\n')):
+            if line.startswith('^'):
+                exclude.append(line[1:])
+            else:
+                include.append(line)
+        # Tags are not peeled by `git rev-parse` for ranges
+        commit_hashes = self.resolve_many(include + exclude)
+        if not include or not all(commit_hashes):
+            return [], []
+        return commit_hashes[:len(include)], commit_hashes[len(include):]
+
+    def read_commit(self, commit_hash: str) -> Dict[str, Any]:
+        """Read commit object.
+
+        :param commit_hash:
+        :return: See `parse_commit`.
+        """
+        return parse_commit(
+            self.cat_file(
+                'commit',
+                commit_hash,
+                stdout_as_string=False,
+                strip_newline_in_stdout=False
+            )
+        )
+
+    def get_parents(self, commit_hashes: List[str]) -> Dict[str, List[str]]:
+        """Get parents of the given commits and all of their ancestors.
+
+        :param commit_hashes:
+        :return: Dictionary of commit hashes and their parents.
+        """
+        process = self.rev_list(
+            '--parents',
+            '--stdin',
+            istream=subprocess.PIPE,
+            as_process=True
+        )
+        process.proc.stdin.write(
+            ''.join('{}\n'.format(_c) for _c in commit_hashes).encode()
+        )
+        process.proc.stdin.close()
+        parents = {}
+        for line in process.stdout:
+            commit_hash, *commit_parents = line.decode('ascii').split()
+            parents[commit_hash] = commit_parents
+        process.wait()
+        return parents
+
+    def get_missing(self, object_hashes: List[str]) -> List[str]:
+        """Get objects which are not in the repository (anymore).
+
+        All of them are checked by a single ``git cat-file --batch-check``.
+
+        :param object_hashes:
+        :return:
+        """
+        if not object_hashes:
+            return []
+        process = self.cat_file(
+            '--batch-check',
+            istream=subprocess.PIPE,
+            as_process=True
+        )
+        process.proc.stdin.write(
+            ''.join('{}\n'.format(_o) for _o in object_hashes).encode()
+        )
+        process.proc.stdin.close()
+        missing = []
+        for line in process.stdout:
+            name, _, status = line.decode('utf-8').rstrip('\n').rpartition(' ')
+            if status == 'missing':
+                missing.append(name)
+        process.wait()
+        return missing
+
+    def get_unreachable(self,
+                        commit_hashes: List[str],
+                        bases: List[str]) -> List[str]:
+        """Get commits which are not reachable from any of the bases.
+
+        :param commit_hashes:
+        :param bases:
+        :return: Commits (in the given order) which are neither the bases,
+            nor their ancestors.
+        """
+        if not commit_hashes:
+            return []
+        if not bases:
+            return list(commit_hashes)
+        targets = set(commit_hashes)
+        unreachable = set()
+        process = self.rev_list(
+            *targets,
+            '--not',
+            *bases,
+            as_process=True
+        )
+        for line in process.stdout:
+            commit_hash = line.decode('ascii').strip()
+            if commit_hash in targets:
+                unreachable.add(commit_hash)
+                # No need to walk any further
+                if len(unreachable) == len(targets):
+                    process.proc.kill()
+                    break
+        process.proc.wait()
+        return [
+            _commit_hash for _commit_hash in commit_hashes
+            if _commit_hash in unreachable
+        ]
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Check if commit is an ancestor of (or same as) the other one.
+
+        :param ancestor:
+        :param descendant:
+        :return:
+        """
+        return not self.get_unreachable([ancestor], [descendant])
+
+
+_BACKENDS: Dict[tuple, BaseBackend] = {}
+
+
+def get_backend(path: str, uid: str = None) -> BaseBackend:
+    """Get git backend for the given path.
+
+    Persistent backends are created once per path and backend and then
+    reused for all of the subsequent calls.
+
+    :param path:
+    :param uid: Backend uid. Unknown backends fall back to the default one.
+    :return:
+    """
+    backend_cls = BackendRegistry.get(uid or DEFAULT_BACKEND, BaseBackend)
+    if not backend_cls.persistent:
+        return backend_cls(path)
+
+    key = (backend_cls.uid, path)
+    if key not in _BACKENDS:
+        _BACKENDS[key] = backend_cls(path)
+    return _BACKENDS[key]
@@ -0,0 +1,337 @@
+import os
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from ..logger import LOGGER
+from .helpers import NameTable, open_mmap
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'CommitGraph',
+    'GENERATION_INFINITY',
+)
+
+COMMIT_GRAPH_SIGNATURE = b'CGPH'
+COMMIT_GRAPH_VERSION = 1
+# Only SHA-1 object names are supported
+HASH_VERSION_SHA1 = 1
+CHUNK_OID_FANOUT = b'OIDF'
+CHUNK_OID_LOOKUP = b'OIDL'
+CHUNK_COMMIT_DATA = b'CDAT'
+CHUNK_EXTRA_EDGES = b'EDGE'
+
+PARENT_NONE = 0x70000000
+PARENT_EXTRA_EDGES = 0x80000000
+# Generation of commits which are not in the commit-graph (yet)
+GENERATION_INFINITY = 0xffffffff
+# Generation of commits written by git not computing generations
+GENERATION_ZERO = 0
+
+COMMIT_DATA_SIZE = 20 + 16
+
+
+class CommitGraphLayer:
+    """Memory mapped commit-graph file.
+
+    Only version 1 files of SHA-1 repositories are supported, `ValueError`
+    is raised for the others.
+    """
+
+    def __init__(self, filename: str, base_count: int = 0):
+        self.filename = filename
+        self.base_count = base_count
+        self.data = data = open_mmap(filename)
+        if (
+            len(data) < 8
+            or data[:4] != COMMIT_GRAPH_SIGNATURE
+            or data[4] != COMMIT_GRAPH_VERSION
+            or data[5] != HASH_VERSION_SHA1
+        ):
+            raise ValueError(f"Unsupported commit-graph {filename}")
+
+        self.chunks: Dict[bytes, int] = {}
+        for position in range(data[6]):
+            start = 8 + position * 12
+            self.chunks[data[start:start + 4]] = int.from_bytes(
+                data[start + 4:start + 12],
+                'big'
+            )
+
+        for chunk in (CHUNK_OID_FANOUT, CHUNK_OID_LOOKUP, CHUNK_COMMIT_DATA):
+            if chunk not in self.chunks:
+                raise ValueError(f"Unsupported commit-graph {filename}")
+
+        fanout = self.chunks[CHUNK_OID_FANOUT]
+        self.fanout = [
+            int.from_bytes(data[fanout + _i * 4:fanout + _i * 4 + 4], 'big')
+            for _i in range(256)
+        ]
+        self.count = self.fanout[-1]
+        self.names = NameTable(
+            data,
+            self.chunks[CHUNK_OID_LOOKUP],
+            self.count
+        )
+        self.commit_data = self.chunks[CHUNK_COMMIT_DATA]
+        self.extra_edges = self.chunks.get(CHUNK_EXTRA_EDGES)
+
+    def get_position(self, sha: bytes) -> Optional[int]:
+        """Get position of the commit within the layer.
+
+        :param sha: Raw 20 bytes commit name.
+        :return:
+        """
+        first = sha[0]
+        low = self.fanout[first - 1] if first else 0
+        high = self.fanout[first]
+        position = bisect_left(self.names, sha, low, high)
+        if position >= high or self.names[position] != sha:
+            return None
+        return position
+
+
+class CommitGraph:
+    """Reader of the git commit-graph (a single file or a chain of them).
+
+    Parents and generation numbers (topological levels) of commits are read
+    without inflating any objects, the walks are done on positions (no
+    lookups by hash). Generation of a commit is always greater than
+    generations of its parents, which allows to cut the walks short.
+    """
+
+    def __init__(self, layers: List[CommitGraphLayer]):
+        self.layers = layers
+
+    @classmethod
+    def open(cls, objects_dir: str) -> Optional['CommitGraph']:
+        """Open commit-graph of the object database.
+
+        :param objects_dir:
+        :return: Commit graph or None if there is no commit-graph (or it is
+            not supported).
+        """
+        info_dir = os.path.join(objects_dir, 'info')
+        chain = os.path.join(info_dir, 'commit-graphs', 'commit-graph-chain')
+        if os.path.exists(chain):
+            with open(chain) as _file:
+                filenames = [
+                    os.path.join(
+                        info_dir,
+                        'commit-graphs',
+                        'graph-{}.graph'.format(_line.strip())
+                    )
+                    for _line in _file
+                    if _line.strip()
+                ]
+        elif os.path.exists(os.path.join(info_dir, 'commit-graph')):
+            filenames = [os.path.join(info_dir, 'commit-graph')]
+        else:
+            return None
+
+        layers = []
+        base_count = 0
+        try:
+            for filename in filenames:
+                layer = CommitGraphLayer(filename, base_count)
+                layers.append(layer)
+                base_count += layer.count
+        except (OSError, ValueError) as err:
+            # Objects are read without the commit-graph then
+            LOGGER.info(f"Commit-graph is not used: {err}")
+            return None
+        return cls(layers)
+
+    def __len__(self) -> int:
+        return sum(_layer.count for _layer in self.layers)
+
+    def __contains__(self, commit_hash: str) -> bool:
+        return self.get_position(commit_hash) is not None
+
+    def get_position(self, commit_hash: str) -> Optional[int]:
+        """Get global position of the commit.
+
+        :param commit_hash:
+        :return:
+        """
+        sha = bytes.fromhex(commit_hash)
+        for layer in self.layers:
+            position = layer.get_position(sha)
+            if position is not None:
+                return layer.base_count + position
+        return None
+
+    def _get_layer(self, position: int) -> CommitGraphLayer:
+        for layer in self.layers:
+            if position < layer.base_count + layer.count:
+                return layer
+        raise IndexError(position)
+
+    def get_hash(self, position: int) -> str:
+        """Get hash of the commit at the given position.
+
+        :param position:
+        :return:
+        """
+        layer = self._get_layer(position)
+        return layer.names[position - layer.base_count].hex()
+
+    def get_parent_positions(self, position: int) -> List[int]:
+        """Get positions of parents of the commit at the given position.
+
+        :param position:
+        :return:
+        """
+        layer = self._get_layer(position)
+        data = layer.data
+        start = (
+            layer.commit_data
+            + (position - layer.base_count) * COMMIT_DATA_SIZE
+            + 20
+        )
+        first = int.from_bytes(data[start:start + 4], 'big')
+        if first == PARENT_NONE:
+            return []
+        second = int.from_bytes(data[start + 4:start + 8], 'big')
+        if second == PARENT_NONE:
+            return [first]
+        if not second & PARENT_EXTRA_EDGES:
+            return [first, second]
+
+        parents = [first]
+        edge = layer.extra_edges + (second & ~PARENT_EXTRA_EDGES) * 4
+        while True:
+            value = int.from_bytes(data[edge:edge + 4], 'big')
+            parents.append(value & ~PARENT_EXTRA_EDGES)
+            if value & PARENT_EXTRA_EDGES:
+                return parents
+            edge += 4
+
+    def get_generation_at(self, position: int) -> int:
+        """Get generation number of the commit at the given position.
+
+        :param position:
+        :return:
+        """
+        layer = self._get_layer(position)
+        start = (
+            layer.commit_data
+            + (position - layer.base_count) * COMMIT_DATA_SIZE
+            + 28
+        )
+        return int.from_bytes(layer.data[start:start + 4], 'big') >> 2
+
+    def get_generation(self, commit_hash: str) -> int:
+        """Get generation number (topological level) of the commit.
+
+        :param commit_hash:
+        :return: Generation or `GENERATION_INFINITY` if commit is not in the
+            commit-graph.
+        """
+        position = self.get_position(commit_hash)
+        if position is None:
+            return GENERATION_INFINITY
+        return self.get_generation_at(position)
+
+    def get_parents(self, commit_hash: str) -> Optional[List[str]]:
+        """Get parents of the commit.
+
+        :param commit_hash:
+        :return: Parents or None if commit is not in the commit-graph.
+        """
+        position = self.get_position(commit_hash)
+        if position is None:
+            return None
+        return [
+            self.get_hash(_position)
+            for _position in self.get_parent_positions(position)
+        ]
+
+    def get_reachable_parents(
+        self,
+        positions: List[int]
+    ) -> Dict[str, List[str]]:
+        """Get parents of the given commits and all of their ancestors.
+
+        :param positions: Positions of the commits to start from.
+        :return: Dictionary of commit hashes and their parents.
+        """
+        get_parent_positions = self.get_parent_positions
+        parent_positions = {}
+        stack = list(positions)
+        while stack:
+            position = stack.pop()
+            if position in parent_positions:
+                continue
+            parent_positions[position] = get_parent_positions(position)
+            stack.extend(parent_positions[position])
+
+        hashes = {
+            _position: self.get_hash(_position)
+            for _position in parent_positions
+        }
+        return {
+            hashes[_position]: [hashes[_parent] for _parent in _parents]
+            for _position, _parents in parent_positions.items()
+        }
+
+    def get_unreachable(self,
+                        commit_hashes: Iterable[str],
+                        bases: Iterable[str]) -> Optional[List[str]]:
+        """Get commits which are not reachable from any of the bases.
+
+        A single walk from the bases is done, which never goes below the
+        lowest generation of the commits looked for and stops as soon as
+        all of them are found.
+
+        :param commit_hashes:
+        :param bases:
+        :return: Commits (in the given order) which are neither the bases,
+            nor their ancestors. None if any of the commits is not in the
+            commit-graph.
+        """
+        targets = {}
+        for commit_hash in commit_hashes:
+            position = self.get_position(commit_hash)
+            if position is None:
+                return None
+            targets.setdefault(position, commit_hash)
+        starts = [self.get_position(_base) for _base in bases]
+        if None in starts:
+            return None
+
+        get_parent_positions = self.get_parent_positions
+        get_generation_at = self.get_generation_at
+        remaining = set(targets)
+        generation = min(map(get_generation_at, remaining), default=0)
+        seen = set(starts)
+        stack = list(seen)
+        while stack and remaining:
+            position = stack.pop()
+            remaining.discard(position)
+            for parent in get_parent_positions(position):
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                # Lower generations can not reach any of the targets
+                parent_generation = get_generation_at(parent)
+                if (
+                    parent_generation == GENERATION_ZERO
+                    or parent_generation >= generation
+                ):
+                    stack.append(parent)
+        return [
+            _commit_hash for _position, _commit_hash in targets.items()
+            if _position in remaining
+        ]
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> Optional[bool]:
+        """Check if commit is an ancestor of (or same as) the other one.
+
+        :param ancestor:
+        :param descendant:
+        :return: None if any of the commits is not in the commit-graph.
+        """
+        unreachable = self.get_unreachable([ancestor], [descendant])
+        return None if unreachable is None else not unreachable
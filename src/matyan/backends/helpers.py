@@ -0,0 +1,41 @@
+import mmap
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'NameTable',
+    'is_hash',
+    'open_mmap',
+)
+
+
+def is_hash(value: str) -> bool:
+    if len(value) != 40:
+        return False
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        return False
+    return True
+
+
+def open_mmap(filename: str) -> mmap.mmap:
+    with open(filename, 'rb') as _file:
+        return mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class NameTable:
+    """Sorted object names of the pack index, as a sequence for bisect."""
+
+    def __init__(self, data: mmap.mmap, offset: int, count: int):
+        self.data = data
+        self.offset = offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: int) -> bytes:
+        start = self.offset + position * 20
+        return self.data[start:start + 20]
@@ -0,0 +1,504 @@
+import glob
+import os
+import zlib
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .base import parse_commit
+from .commit_graph import CommitGraph
+from .helpers import NameTable, is_hash, open_mmap
+from .session import SessionBackend
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'ObjectDatabase',
+    'ObjectsBackend',
+    'Pack',
+    'PackIndex',
+)
+
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+OBJECT_TYPES = {
+    OBJ_COMMIT: 'commit',
+    OBJ_TREE: 'tree',
+    OBJ_BLOB: 'blob',
+    OBJ_TAG: 'tag',
+}
+
+PACK_INDEX_SIGNATURE = b'\377tOc'
+# Size of chunks compressed data is fed to zlib in
+INFLATE_CHUNK_SIZE = 4096
+# Same order as git uses to expand short ref names
+REF_PREFIXES = ('', 'refs/', 'refs/tags/', 'refs/heads/', 'refs/remotes/')
+
+
+def inflate(buffer: memoryview, offset: int, size: int) -> bytes:
+    """Decompress zlib stream starting at the given offset.
+
+    :param buffer:
+    :param offset:
+    :param size: Size of the decompressed data.
+    :return:
+    """
+    decompressor = zlib.decompressobj()
+    chunks = []
+    while not decompressor.eof:
+        chunk = buffer[offset:offset + INFLATE_CHUNK_SIZE]
+        if not chunk:
+            break
+        chunks.append(decompressor.decompress(chunk))
+        offset += INFLATE_CHUNK_SIZE
+    data = b''.join(chunks)
+    if len(data) != size:
+        raise ValueError("Corrupted object")
+    return data
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply git delta to the base object.
+
+    :param base:
+    :param delta:
+    :return:
+    """
+    def _read_size(position: int) -> Tuple[int, int]:
+        size = shift = 0
+        while True:
+            byte = delta[position]
+            position += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return size, position
+
+    _, position = _read_size(0)
+    target_size, position = _read_size(position)
+    result = []
+    length = len(delta)
+    while position < length:
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            # Copy from the base
+            offset = size = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[position] << (bit * 8)
+                    position += 1
+            for bit in range(3):
+                if opcode & (1 << (4 + bit)):
+                    size |= delta[position] << (bit * 8)
+                    position += 1
+            result.append(base[offset:offset + (size or 0x10000)])
+        elif opcode:
+            # Insert new data
+            result.append(delta[position:position + opcode])
+            position += opcode
+        else:
+            raise ValueError("Invalid delta opcode")
+
+    data = b''.join(result)
+    if len(data) != target_size:
+        raise ValueError("Corrupted delta")
+    return data
+
+
+class PackIndex:
+    """Memory mapped pack index (``.idx``, version 2)."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.data = open_mmap(filename)
+        if (
+            self.data[:4] != PACK_INDEX_SIGNATURE
+            or int.from_bytes(self.data[4:8], 'big') != 2
+        ):
+            raise ValueError(f"Unsupported pack index {filename}")
+
+        self.fanout = [
+            int.from_bytes(self.data[8 + _i * 4:12 + _i * 4], 'big')
+            for _i in range(256)
+        ]
+        self.count = self.fanout[-1]
+        self.names_offset = 8 + 256 * 4
+        self.offsets_offset = self.names_offset + self.count * (20 + 4)
+        self.large_offsets_offset = self.offsets_offset + self.count * 4
+        self.names = NameTable(self.data, self.names_offset, self.count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get_offset(self, sha: bytes) -> Optional[int]:
+        """Get offset of the object in the pack.
+
+        :param sha: Raw 20 bytes object name.
+        :return: Offset or None if object is not in the pack.
+        """
+        first = sha[0]
+        low = self.fanout[first - 1] if first else 0
+        high = self.fanout[first]
+        position = bisect_left(self.names, sha, low, high)
+        if position >= high or self.names[position] != sha:
+            return None
+
+        start = self.offsets_offset + position * 4
+        offset = int.from_bytes(self.data[start:start + 4], 'big')
+        if offset & 0x80000000:
+            start = self.large_offsets_offset + (offset & 0x7fffffff) * 8
+            offset = int.from_bytes(self.data[start:start + 8], 'big')
+        return offset
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.names)
+
+
+class Pack:
+    """Memory mapped pack file along with its index."""
+
+    def __init__(self, index_filename: str):
+        self.index = PackIndex(index_filename)
+        self.filename = '{}.pack'.format(index_filename[:-len('.idx')])
+        self.data = open_mmap(self.filename)
+        self.buffer = memoryview(self.data)
+
+    def read_header(self, offset: int) -> Tuple[int, int, int]:
+        """Read header of the packed object.
+
+        :param offset:
+        :return: (type, size, offset of the data) tuple.
+        """
+        data = self.data
+        byte = data[offset]
+        offset += 1
+        object_type = (byte >> 4) & 7
+        size = byte & 0x0f
+        shift = 4
+        while byte & 0x80:
+            byte = data[offset]
+            offset += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+        return object_type, size, offset
+
+    def read_at(self,
+                offset: int,
+                database: 'ObjectDatabase') -> Tuple[int, bytes]:
+        """Read object at the given offset, resolving deltas.
+
+        :param offset:
+        :param database: Used to look up bases of `REF_DELTA` objects.
+        :return: (type, data) tuple.
+        """
+        object_type, size, data_offset = self.read_header(offset)
+        if object_type == OBJ_OFS_DELTA:
+            data = self.data
+            byte = data[data_offset]
+            data_offset += 1
+            base_offset = byte & 0x7f
+            while byte & 0x80:
+                byte = data[data_offset]
+                data_offset += 1
+                base_offset = ((base_offset + 1) << 7) | (byte & 0x7f)
+            base_type, base = self.read_at(offset - base_offset, database)
+            delta = inflate(self.buffer, data_offset, size)
+            return base_type, apply_delta(base, delta)
+
+        if object_type == OBJ_REF_DELTA:
+            base_sha = self.data[data_offset:data_offset + 20]
+            base_type, base = database.read_raw(base_sha)
+            delta = inflate(self.buffer, data_offset + 20, size)
+            return base_type, apply_delta(base, delta)
+
+        return object_type, inflate(self.buffer, data_offset, size)
+
+
+class ObjectDatabase:
+    """Reader of the git object database (packs and loose objects).
+
+    Nothing is spawned: pack files and their indexes are memory mapped and
+    objects are inflated in Python.
+    """
+
+    def __init__(self, objects_dir: str):
+        self.objects_dirs = [objects_dir]
+        alternates = os.path.join(objects_dir, 'info', 'alternates')
+        if os.path.exists(alternates):
+            with open(alternates) as _file:
+                for line in _file:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        self.objects_dirs.append(
+                            os.path.join(objects_dir, line)
+                        )
+
+        self.packs = [
+            Pack(_filename)
+            for _objects_dir in self.objects_dirs
+            for _filename in sorted(
+                glob.glob(os.path.join(_objects_dir, 'pack', '*.idx'))
+            )
+        ]
+
+    def read_loose(self, sha: bytes) -> Optional[Tuple[int, bytes]]:
+        hex_sha = sha.hex()
+        for objects_dir in self.objects_dirs:
+            filename = os.path.join(objects_dir, hex_sha[:2], hex_sha[2:])
+            try:
+                with open(filename, 'rb') as _file:
+                    raw = zlib.decompress(_file.read())
+            except FileNotFoundError:
+                continue
+            header, _, data = raw.partition(b'\0')
+            type_name = header.split(b' ', 1)[0].decode('ascii')
+            for object_type, _type_name in OBJECT_TYPES.items():
+                if _type_name == type_name:
+                    return object_type, data
+        return None
+
+    def read_raw(self, sha: bytes) -> Tuple[int, bytes]:
+        """Read object.
+
+        :param sha: Raw 20 bytes object name.
+        :return: (type, data) tuple.
+        :raise KeyError: If object does not exist.
+        """
+        for pack in self.packs:
+            offset = pack.index.get_offset(sha)
+            if offset is not None:
+                return pack.read_at(offset, self)
+
+        loose = self.read_loose(sha)
+        if loose is None:
+            raise KeyError(sha.hex())
+        return loose
+
+    def read(self, hex_sha: str) -> Tuple[str, bytes]:
+        """Read object.
+
+        :param hex_sha: Full object hash.
+        :return: (type name, data) tuple.
+        :raise KeyError: If object does not exist.
+        """
+        object_type, data = self.read_raw(bytes.fromhex(hex_sha))
+        return OBJECT_TYPES[object_type], data
+
+
+class ObjectsBackend(SessionBackend):
+    """Pure Python object reader.
+
+    Refs and commits are read straight from the ``.git`` directory (packs
+    are memory mapped). If the repository has a commit-graph, parents are
+    read from it (see `CommitGraph`). Lookups which can't be served that
+    way (such as revision expressions) are left to the `SessionBackend`.
+    Log walks still go through git.
+    """
+
+    uid: str = 'objects'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._database: Optional[ObjectDatabase] = None
+        self._packed_refs: Optional[Tuple[tuple, Dict[str, str]]] = None
+        # Not looked up yet
+        self._commit_graph: Union[CommitGraph, None, bool] = False
+
+    @property
+    def database(self) -> ObjectDatabase:
+        if self._database is None:
+            self._database = ObjectDatabase(
+                os.path.join(self.get_common_dir(), 'objects')
+            )
+        return self._database
+
+    def get_packed_refs(self) -> Dict[str, str]:
+        # Read again whenever the file is rewritten (refs are packed)
+        filename = os.path.join(self.get_common_dir(), 'packed-refs')
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return {}
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self._packed_refs is None or self._packed_refs[0] != version:
+            packed_refs = {}
+            with open(filename) as _file:
+                for line in _file:
+                    if line.startswith(('#', '^')):
+                        continue
+                    sha, _, name = line.strip().partition(' ')
+                    packed_refs[name] = sha
+            self._packed_refs = (version, packed_refs)
+        return self._packed_refs[1]
+
+    def read_ref(self, name: str, depth: int = 5) -> Optional[str]:
+        """Read ref (following symbolic refs).
+
+        Refs of the worktree (such as ``HEAD``) are looked up in the git
+        directory first, the shared ones in the common git directory.
+
+        :param name: Full ref name (such as `refs/tags/0.1` or `HEAD`).
+        :param depth: Max depth of symbolic refs.
+        :return: Object hash or None if ref does not exist.
+        """
+        for directory in dict.fromkeys(
+            (self.get_git_dir(), self.get_common_dir())
+        ):
+            filename = os.path.join(directory, name)
+            if not os.path.isfile(filename):
+                continue
+            with open(filename) as _file:
+                value = _file.read().strip()
+            if value.startswith('ref: '):
+                return self.read_ref(value[5:], depth - 1) if depth else None
+            return value if is_hash(value) else None
+        return self.get_packed_refs().get(name)
+
+    def peel(self, sha: str) -> Optional[str]:
+        """Peel object (annotated tags) to a commit.
+
+        :param sha:
+        :return: Commit hash or None if object is not a commit.
+        """
+        while True:
+            object_type, data = self.database.read(sha)
+            if object_type == 'commit':
+                return sha
+            if object_type != 'tag' or not data.startswith(b'object '):
+                return None
+            sha = data[7:47].decode('ascii')
+
+    def resolve(self, revision: str) -> Optional[str]:
+        if revision in self._resolved:
+            return self._resolved[revision]
+
+        sha = revision if is_hash(revision) else None
+        if sha is None:
+            for prefix in REF_PREFIXES:
+                sha = self.read_ref(prefix + revision)
+                if sha:
+                    break
+            else:
+                if os.path.isfile(os.path.join(
+                    self.get_common_dir(), 'refs', 'remotes', revision,
+                    'HEAD'
+                )):
+                    sha = self.read_ref(
+                        'refs/remotes/{}/HEAD'.format(revision)
+                    )
+
+        try:
+            commit_hash = self.peel(sha) if sha else None
+        except KeyError:
+            commit_hash = None
+        if commit_hash is None:
+            # Revision expressions, abbreviated hashes, etc.
+            return super().resolve(revision)
+
+        # Refs move, only hashes are memoized (see `SessionBackend`)
+        if is_hash(revision):
+            self._resolved[revision] = commit_hash
+        return commit_hash
+
+    def resolve_range(self, expression: str) -> Tuple[List[str], List[str]]:
+        # Plain `A..B` ranges (and single revisions) are resolved here
+        if '...' in expression or expression.startswith('^'):
+            return super().resolve_range(expression)
+
+        lower, _, upper = expression.rpartition('..')
+        if _:
+            revisions = [upper or 'HEAD', lower or 'HEAD']
+        else:
+            revisions = [upper]
+        commit_hashes = [self.resolve(_revision) for _revision in revisions]
+        if not all(commit_hashes):
+            return super().resolve_range(expression)
+        return commit_hashes[:1], commit_hashes[1:]
+
+    def read_commit(self, commit_hash: str) -> Dict[str, Any]:
+        if commit_hash not in self._commits:
+            try:
+                object_type, data = self.database.read(commit_hash)
+            except KeyError:
+                return super().read_commit(commit_hash)
+            if object_type != 'commit':
+                raise ValueError(f"{commit_hash} is not a commit")
+            self._commits[commit_hash] = parse_commit(data)
+        return self._commits[commit_hash]
+
+    @property
+    def commit_graph(self) -> Optional[CommitGraph]:
+        if self._commit_graph is False:
+            self._commit_graph = CommitGraph.open(
+                os.path.join(self.get_common_dir(), 'objects')
+            )
+        return self._commit_graph
+
+    def get_commit_parents(self, commit_hash: str) -> List[str]:
+        """Get parents of the commit.
+
+        The commit-graph is used if available. Commits which are not in it
+        (yet) are read from the object database, or by git if not found
+        there (for instance, packed after the database was opened).
+
+        :param commit_hash:
+        :return:
+        """
+        if self.commit_graph is not None:
+            parents = self.commit_graph.get_parents(commit_hash)
+            if parents is not None:
+                return parents
+
+        # Only parents are needed here, which are not worth memoizing whole
+        # commits for.
+        try:
+            _, data = self.database.read(commit_hash)
+        except KeyError:
+            return super().read_commit(commit_hash)['parents']
+        parents = []
+        position = data.index(b'\n') + 1
+        while data.startswith(b'parent ', position):
+            parents.append(data[position + 7:position + 47].decode('ascii'))
+            position += 48
+        return parents
+
+    def get_parents(self, commit_hashes: List[str]) -> Dict[str, List[str]]:
+        commit_graph = self.commit_graph
+        parents = {}
+        # Commits of the commit-graph are walked by the commit-graph itself
+        positions = []
+        stack = list(commit_hashes)
+        while stack:
+            commit_hash = stack.pop()
+            if commit_hash in parents:
+                continue
+            if commit_graph is not None:
+                position = commit_graph.get_position(commit_hash)
+                if position is not None:
+                    positions.append(position)
+                    continue
+            parents[commit_hash] = self.get_commit_parents(commit_hash)
+            stack.extend(parents[commit_hash])
+
+        if positions:
+            parents.update(commit_graph.get_reachable_parents(positions))
+        return parents
+
+    def get_unreachable(self,
+                        commit_hashes: List[str],
+                        bases: List[str]) -> List[str]:
+        # Generation numbers of the commit-graph cut the walk short
+        if self.commit_graph is not None and commit_hashes and bases:
+            unreachable = self.commit_graph.get_unreachable(
+                commit_hashes,
+                bases
+            )
+            if unreachable is not None:
+                return unreachable
+        return super().get_unreachable(commit_hashes, bases)
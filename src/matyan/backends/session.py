@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional
+
+from .base import BaseBackend, parse_commit
+from .helpers import is_hash
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'SessionBackend',
+)
+
+
+class SessionBackend(BaseBackend):
+    """Long-lived git session.
+
+    Object and ref lookups are sent to persistent ``git cat-file
+    --batch-check`` and ``git cat-file --batch`` processes, started on first
+    use and reused for the rest of the run, instead of spawning git for each
+    of them. Only lookups of full hashes are memoized, since refs (such as
+    ``HEAD``) move while the backend is alive. Log walks and revision
+    ranges (`log`, `rev_list` and `resolve_range`) still spawn git.
+    """
+
+    uid: str = 'session'
+    persistent: bool = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._git_dir: Optional[str] = None
+        self._common_dir: Optional[str] = None
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._commits: Dict[str, Dict[str, Any]] = {}
+
+    def get_git_dir(self) -> str:
+        if self._git_dir is None:
+            self._git_dir = super().get_git_dir()
+        return self._git_dir
+
+    def get_common_dir(self) -> str:
+        if self._common_dir is None:
+            self._common_dir = super().get_common_dir()
+        return self._common_dir
+
+    def resolve(self, revision: str) -> Optional[str]:
+        if revision in self._resolved:
+            return self._resolved[revision]
+        try:
+            commit_hash, _, _ = self.get_object_header(
+                '{}^{{commit}}'.format(revision)
+            )
+        except ValueError:
+            commit_hash = None
+        else:
+            commit_hash = commit_hash.decode('ascii')
+        if is_hash(revision):
+            self._resolved[revision] = commit_hash
+        return commit_hash
+
+    def read_commit(self, commit_hash: str) -> Dict[str, Any]:
+        if commit_hash not in self._commits:
+            _, _, _, data = self.get_object_data(commit_hash)
+            self._commits[commit_hash] = parse_commit(data)
+        return self._commits[commit_hash]
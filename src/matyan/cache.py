@@ -0,0 +1,222 @@
+import heapq
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Set
+
+from .constants import RECORD_FORMAT
+from .logger import LOGGER
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'CACHE_DIR_NAME',
+    'COMMIT_CACHE_FILE_NAME',
+    'CommitCache',
+)
+
+CACHE_DIR_NAME = 'matyan'
+CACHE_VERSION = '3'
+COMMIT_CACHE_FILE_NAME = 'commits.jsonl'
+
+
+def get_timestamp(date: str) -> int:
+    """Get timestamp out of the `%ci` formatted date.
+
+    :param date:
+    :return:
+    """
+    return int(datetime.strptime(date, '%Y-%m-%d %H:%M:%S %z').timestamp())
+
+
+class CommitCache:
+    """Persistent cache of parsed commit records.
+
+    Records are keyed by full commit hash and stored as JSON lines under
+    ``.git/matyan/`` (a version header first, then one record per line).
+    Since commits never change, only the commits which are not reachable
+    from the cached tips need to be read from git, and only those are
+    appended to the file. The history is then walked in Python, in the same
+    order as ``git log`` does (by commit date).
+
+    Records only depend on the `RECORD_FORMAT`, not on the configuration:
+    commits are classified after being read, on each run. Classified
+    commits are not cached, so the cache is not keyed by the configuration.
+    """
+
+    def __init__(self, git_dir: str):
+        self.dir = os.path.join(git_dir, CACHE_DIR_NAME)
+        self.filename = os.path.join(self.dir, COMMIT_CACHE_FILE_NAME)
+        self.commits: Dict[str, Dict[str, Any]] = {}
+        self.tips: List[str] = []
+        # Records not saved yet. The whole file is written, if the cached
+        # commits are not the ones of the file plus the new records.
+        self.pending: List[Dict[str, Any]] = []
+        self.rewrite = True
+
+    @property
+    def version(self) -> List[str]:
+        return [CACHE_VERSION, RECORD_FORMAT]
+
+    def load(self) -> 'CommitCache':
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as _file:
+                # Caches written by other versions are not used
+                if json.loads(next(_file, 'null')) == self.version:
+                    self.add(json.loads(_line) for _line in _file)
+                    self.rewrite = False
+        except FileNotFoundError:
+            pass
+        except Exception:
+            LOGGER.exception(f"Could not load commit cache {self.filename}")
+            self.clear()
+        return self
+
+    def save(self) -> None:
+        os.makedirs(self.dir, exist_ok=True)
+        if self.rewrite:
+            tmp_filename = '{}.tmp'.format(self.filename)
+            with open(tmp_filename, 'w', encoding='utf-8') as _file:
+                _file.write(json.dumps(self.version) + '\n')
+                _file.writelines(
+                    json.dumps(_record) + '\n'
+                    for _record in self.commits.values()
+                )
+            os.replace(tmp_filename, self.filename)
+        elif self.pending:
+            with open(self.filename, 'a', encoding='utf-8') as _file:
+                _file.write(''.join(
+                    json.dumps(_record) + '\n' for _record in self.pending
+                ))
+        self.pending = []
+        self.rewrite = False
+
+    def clear(self) -> None:
+        self.commits, self.tips = {}, []
+        self.pending = []
+        self.rewrite = True
+
+    def discard(self, commit_hashes: Iterable[str]) -> None:
+        """Forget commits which are no longer in the repository.
+
+        For instance, tips of deleted branches, pruned by ``git gc``.
+
+        :param commit_hashes:
+        :return:
+        """
+        commit_hashes = set(commit_hashes)
+        for commit_hash in commit_hashes:
+            self.commits.pop(commit_hash, None)
+        self.tips = [
+            _tip for _tip in self.tips if _tip not in commit_hashes
+        ]
+        self.rewrite = True
+
+    def add(self, records: Iterable[Dict[str, Any]]) -> List[str]:
+        """Add cached records (as they are stored).
+
+        Tips are updated along: cached commits which are nobody's parent.
+        New commits are never parents of the cached ones (being not
+        reachable from them), so only the new parents are checked.
+
+        :param records:
+        :return: Hashes of the records added.
+        """
+        added = []
+        parents = set()
+        for record in records:
+            self.commits[record['commit_hash']] = record
+            added.append(record['commit_hash'])
+            parents.update(record['merge'].split())
+        if added:
+            self.tips = [
+                _commit_hash
+                for _commit_hash in dict.fromkeys(self.tips + added)
+                if _commit_hash not in parents
+            ]
+        return added
+
+    def get_exclude_args(self) -> List[str]:
+        """Get git arguments excluding the already cached commits.
+
+        :return:
+        """
+        return ['^{}'.format(_tip) for _tip in self.tips]
+
+    def update(self, records: Iterable[Dict[str, str]]) -> int:
+        """Add new records to the cache.
+
+        :param records:
+        :return: Number of records added.
+        """
+        new_records = []
+        for record in records:
+            record = dict(record)
+            # Ref names change over time, never cache them
+            record.pop('refs', None)
+            record['timestamp'] = get_timestamp(record['datetime'])
+            new_records.append(record)
+        self.add(new_records)
+        self.pending.extend(new_records)
+        return len(new_records)
+
+    def get_ancestors(self, commit_hashes: Iterable[str]) -> Set[str]:
+        """Get all cached commits reachable from the given ones.
+
+        :param commit_hashes:
+        :return:
+        """
+        commits = self.commits
+        ancestors = set()
+        stack = [_c for _c in commit_hashes if _c in commits]
+        while stack:
+            commit_hash = stack.pop()
+            if commit_hash in ancestors:
+                continue
+            ancestors.add(commit_hash)
+            stack.extend(
+                _p for _p in commits[commit_hash]['merge'].split()
+                if _p not in ancestors and _p in commits
+            )
+        return ancestors
+
+    def walk(self,
+             include: Iterable[str],
+             exclude: Iterable[str] = ()) -> Iterator[Dict[str, Any]]:
+        """Walk cached commits the same way ``git log`` does.
+
+        Commits are yielded by commit date, newest first. Commits of the
+        same date keep the order in which they were reached.
+
+        :param include: Hashes of commits to start the walk from.
+        :param exclude: Hashes of commits, ancestors of which (themselves
+            included) shall be skipped.
+        :return:
+        """
+        commits = self.commits
+        seen = self.get_ancestors(exclude)
+        queue = []
+        counter = 0
+        for commit_hash in include:
+            if commit_hash in commits and commit_hash not in seen:
+                seen.add(commit_hash)
+                record = commits[commit_hash]
+                heapq.heappush(
+                    queue,
+                    (-record['timestamp'], counter, commit_hash)
+                )
+                counter += 1
+
+        while queue:
+            commit_hash = heapq.heappop(queue)[2]
+            record = commits[commit_hash]
+            yield record
+            for parent in record['merge'].split():
+                if parent in commits and parent not in seen:
+                    seen.add(parent)
+                    heapq.heappush(
+                        queue,
+                        (-commits[parent]['timestamp'], counter, parent)
+                    )
+                    counter += 1
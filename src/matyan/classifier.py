@@ -0,0 +1,116 @@
+import re
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from .labels import BRANCH_TYPE_OTHER, BRANCH_TYPES
+from .patterns import (
+    REGEX_PATTERN_COMMIT_LINE,
+    REGEX_PATTERN_MERGED_BRANCH_NAME,
+)
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'CommitClassifier',
+)
+
+
+class CommitClassifier:
+    """Classifier of commits by their titles.
+
+    Patterns are compiled once, when the classifier is created (from the
+    patterns built out of the configuration, unless given explicitly).
+    """
+
+    def __init__(
+        self,
+        merged_branch_pattern: str = REGEX_PATTERN_MERGED_BRANCH_NAME,
+        commit_pattern: str = REGEX_PATTERN_COMMIT_LINE,
+        branch_types: Mapping[str, str] = None
+    ):
+        self.merged_branch_regex = re.compile(merged_branch_pattern)
+        self.commit_regex = re.compile(commit_pattern)
+        self.branch_types = BRANCH_TYPES if branch_types is None \
+            else branch_types
+        # Branch types as they appear in titles (any case) and their keys
+        self._branch_types: Dict[Optional[str], str] = {
+            None: BRANCH_TYPE_OTHER,
+        }
+
+    def get_branch_type(self, branch_type: Optional[str]) -> str:
+        """Get branch type (key) of the branch type found in the title.
+
+        :param branch_type:
+        :return:
+        """
+        try:
+            return self._branch_types[branch_type]
+        except KeyError:
+            key = branch_type.lower()
+            self._branch_types[branch_type] = key \
+                if key in self.branch_types \
+                else BRANCH_TYPE_OTHER
+            return self._branch_types[branch_type]
+
+    def classify_merge(self, title: str) -> Optional[Dict[str, Any]]:
+        """Classify merge commit.
+
+        :param title:
+        :return: None if the title does not look like a merged branch.
+        """
+        match = self.merged_branch_regex.match(title)
+        if not match:
+            return None
+
+        branch_type, ticket_number, branch_title = match.group(
+            'branch_type',
+            'ticket_number',
+            'branch_title'
+        )
+        return {
+            'merge': True,
+            'branch_type': self.get_branch_type(branch_type),
+            'ticket_number': ticket_number,
+            'message': branch_title,
+        }
+
+    def classify_commit(self, title: str) -> Dict[str, Any]:
+        """Classify regular (non-merge) commit.
+
+        :param title:
+        :return:
+        """
+        match = self.commit_regex.match(title)
+        if match:
+            ticket_number, message = match.group(
+                'ticket_number',
+                'commit_message'
+            )
+        else:
+            ticket_number, message = '', title
+        return {
+            'merge': False,
+            'branch_type': None,
+            'ticket_number': ticket_number,
+            'message': message,
+        }
+
+    def classify(
+        self,
+        records: Iterable[Dict[str, str]]
+    ) -> Iterator[Tuple[Dict[str, str], Optional[Dict[str, Any]]]]:
+        """Classify commit records.
+
+        :param records: Commit entries (see `iter_log_entries`).
+        :return: Iterator of (record, classification) tuples. Classification
+            holds `merge`, `branch_type`, `ticket_number` and `message` (the
+            branch title for merges, the title without the ticket number
+            otherwise). It's None for merges of unknown branches.
+        """
+        classify_merge = self.classify_merge
+        classify_commit = self.classify_commit
+        for record in records:
+            if ' ' in record['merge']:
+                yield record, classify_merge(record['title'])
+            else:
+                yield record, classify_commit(record['title'])
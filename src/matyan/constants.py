@@ -3,6 +3,12 @@ __copyright__ = '2019-2020 Artur Barseghyan'
 __license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
 __all__ = (
     'PRETTY_FORMAT',
+    'RECORD_CHUNK_SIZE',
+    'RECORD_FIELD_SEPARATOR',
+    'RECORD_FORMAT',
+    'RECORD_SEPARATOR',
+    'TAG_INDEX_FORMAT',
+    'TAG_REF_PREFIX',
     'TICKET_NUMBER_OTHER',
 )
 
@@ -16,4 +22,32 @@ PRETTY_FORMAT = '{' \
                 '"merge": "%P"' \
                 '}'
 
+# Records: fields are separated by NUL and each commit is terminated with the
+# record separator. Only the fields needed for rendering are requested.
+RECORD_FIELD_SEPARATOR = '\x00'
+RECORD_SEPARATOR = '\x1e'
+
+RECORD_FORMAT = '%H%x00' \
+                '%h%x00' \
+                '%ci%x00' \
+                '%an%x00' \
+                '%P%x00' \
+                '%D%x00' \
+                '%s%x1e'
+
+# Prefix of tags among the ref names (`%D`) of a record.
+TAG_REF_PREFIX = 'tag: '
+
+# Size of chunks (in bytes) the streamed records are read in.
+RECORD_CHUNK_SIZE = 65536
+
+# Tag index (`git for-each-ref refs/tags`): object the tag points to, the
+# peeled commit (annotated tags only), tag date and tag name. Creator date is
+# the tagger date of annotated tags and the committer date of lightweight
+# ones (`%(taggerdate)` is empty for the latter).
+TAG_INDEX_FORMAT = '%(objectname)%00' \
+                   '%(*objectname)%00' \
+                   '%(creatordate:short)%00' \
+                   '%(refname:strip=2)'
+
 TICKET_NUMBER_OTHER = 'other'
@@ -1,4 +1,7 @@
 from .base import *
+from .cache import *
+from .memo import *
+from .resilience import *
 
 try:
     from .jira import *
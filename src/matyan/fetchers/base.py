@@ -1,16 +1,21 @@
-from typing import Dict, Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
 
 from ..config import CONFIG
 from ..registry import Registry
+from .resilience import Resilience
 
 __author__ = 'Artur Barseghyan'
 __copyright__ = '2019-2020 Artur Barseghyan'
 __license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
 __all__ = (
     'BaseFetcher',
+    'DEFAULT_WORKERS',
     'FetcherRegistry',
 )
 
+DEFAULT_WORKERS = 8
+
 
 class FetcherRegistry(Registry):
     """Fetcher registry."""
@@ -22,13 +27,15 @@ class BaseFetcher(metaclass=FetcherRegistry):
 
     uid: str = None
     instance: Type
-    retries: int = 0
-    max_retries: int = 10
+    resilience: Resilience
+    workers: int = DEFAULT_WORKERS
+    batch_size: int = 1
 
     def __init__(self, *args, **kwargs):
         if not self.uid:
             raise NotImplementedError
 
+        self.resilience = self.get_resilience()
         self.instance = self.get_instance()
 
     def get_config(self) -> Dict[str, str]:
@@ -37,11 +44,128 @@ class BaseFetcher(metaclass=FetcherRegistry):
     def get_instance(self) -> Type:
         raise NotImplementedError
 
+    def get_resilience(self) -> Resilience:
+        """Get timeouts, retries, rate limiting and circuit breaking.
+
+        Read from the options of the fetcher section of the configuration
+        (see `Resilience.from_config`).
+
+        :return:
+        """
+        return Resilience.from_config(self.uid)
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Make a request (see `Resilience.call`).
+
+        :param func:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        return self.resilience.call(func, *args, **kwargs)
+
+    def get_workers(self) -> int:
+        """Get size of the worker pool of `fetch_many`.
+
+        Read from the ``workers`` option of the fetcher section (for
+        instance, ``[Jira]``) of the configuration.
+
+        :return:
+        """
+        return max(
+            1,
+            CONFIG.getint(self.uid, 'workers', fallback=self.workers)
+        )
+
+    def get_batch_size(self) -> int:
+        """Get number of issues fetched by a single `fetch_batch` call.
+
+        Read from the ``batchSize`` option of the fetcher section of the
+        configuration.
+
+        :return:
+        """
+        return max(
+            1,
+            CONFIG.getint(self.uid, 'batchSize', fallback=self.batch_size)
+        )
+
     def fetch_issue_data(self, issue_id: str) -> Dict[str, str]:
         raise NotImplementedError
 
+    def fetch_batch(
+        self,
+        issue_ids: List[str]
+    ) -> Dict[str, Optional[Dict[str, str]]]:
+        """Fetch data of a batch of issues.
+
+        Fetchers capable of looking up many issues in a single request
+        shall override it (and set the `batch_size`). Issues are fetched
+        one by one otherwise.
+
+        :param issue_ids: Distinct issue ids.
+        :return: Issue data keyed by issue id. Issues known not to exist
+            shall be mapped to None, issues which could not be fetched
+            shall be left out (or mapped to empty data).
+        """
+        return {
+            _issue_id: self.fetch_issue_data(_issue_id)
+            for _issue_id in issue_ids
+        }
+
+    def fetch_batches(
+        self,
+        issue_ids: List[str]
+    ) -> Dict[str, Optional[Dict[str, str]]]:
+        """Fetch distinct issues in batches, concurrently.
+
+        Issues are split into batches of `get_batch_size` issues (see
+        `fetch_batch`), fetched by a pool of `get_workers` threads.
+
+        :param issue_ids: Distinct issue ids.
+        :return: Results of `fetch_batch`, merged.
+        """
+        batch_size = self.get_batch_size()
+        batches = [
+            issue_ids[_i:_i + batch_size]
+            for _i in range(0, len(issue_ids), batch_size)
+        ]
+        workers = min(self.get_workers(), len(batches))
+        fetched = {}
+        if workers <= 1:
+            for batch in batches:
+                fetched.update(self.fetch_batch(batch))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for result in executor.map(self.fetch_batch, batches):
+                    fetched.update(result)
+        return fetched
+
+    def fetch_many(
+        self,
+        issue_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, str]]:
+        """Fetch data of many issues, concurrently.
+
+        Each distinct issue is fetched once (see `fetch_batches`).
+
+        :param issue_ids:
+        :return: Issue data keyed by issue id. Data of issues which could
+            not be fetched (or do not exist) is empty.
+        """
+        issue_ids = list(dict.fromkeys(issue_ids))
+        fetched = self.fetch_batches(issue_ids)
+        return {
+            _issue_id: fetched.get(_issue_id) or {}
+            for _issue_id in issue_ids
+        }
+
+    def close(self) -> None:
+        """Release resources held by the fetcher (nothing by default)."""
+
     def should_continue(self) -> bool:
-        return self.retries < self.max_retries
+        """Check if requests are allowed (the circuit is not open)."""
+        return self.resilience.breaker.allow()
 
     def register_error(self) -> None:
-        self.retries += 1
+        self.resilience.breaker.record_failure()
@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from ..logger import LOGGER
+from .base import BaseFetcher
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'CachedFetcher',
+    'DEFAULT_NEGATIVE_TTL',
+    'DEFAULT_TTL',
+    'ISSUE_CACHE_FILE_NAME',
+    'IssueCache',
+)
+
+ISSUE_CACHE_FILE_NAME = 'issues.sqlite3'
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL = 24 * 60 * 60
+
+
+class IssueCache:
+    """Persistent cache of issue data (SQLite).
+
+    Entries are keyed by fetcher uid and issue id. Issues known not to
+    exist are stored too (with no data), so that they are not looked up
+    over and over again. The cache may be used by many threads at once
+    (see `MemoizedFetcher`): they share a single connection, one at a time.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(
+            filename,
+            timeout=30,
+            check_same_thread=False
+        )
+        self.lock = threading.Lock()
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS issues ("
+                "fetcher TEXT NOT NULL, "
+                "issue_id TEXT NOT NULL, "
+                "data TEXT, "
+                "fetched_at REAL NOT NULL, "
+                "PRIMARY KEY (fetcher, issue_id))"
+            )
+
+    def get_many(self,
+                 fetcher: str,
+                 issue_ids: List[str],
+                 ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 now: float = None) -> Dict[str, Optional[Dict[str, str]]]:
+        """Get fresh entries of the given issues.
+
+        :param fetcher: Fetcher uid.
+        :param issue_ids:
+        :param ttl: Lifetime of the issue data, in seconds.
+        :param negative_ttl: Lifetime of the issues not found, in seconds.
+        :param now:
+        :return: Issue data keyed by issue id. Issues not found are mapped
+            to None, stale (or not cached) issues are left out.
+        """
+        if now is None:
+            now = time.time()
+        cached = {}
+        rows = []
+        with self.lock:
+            # Stay well within the limit of SQLite host parameters
+            for start in range(0, len(issue_ids), 500):
+                chunk = issue_ids[start:start + 500]
+                rows.extend(self.connection.execute(
+                    "SELECT issue_id, data, fetched_at FROM issues "
+                    "WHERE fetcher = ? AND issue_id IN ({})".format(
+                        ', '.join('?' * len(chunk))
+                    ),
+                    [fetcher, *chunk]
+                ))
+        for issue_id, data, fetched_at in rows:
+            age = now - fetched_at
+            if data is None:
+                if age < negative_ttl:
+                    cached[issue_id] = None
+            elif age < ttl:
+                cached[issue_id] = json.loads(data)
+        return cached
+
+    def set_many(self,
+                 fetcher: str,
+                 issues: Dict[str, Optional[Dict[str, str]]],
+                 now: float = None) -> None:
+        """Store entries of the given issues.
+
+        :param fetcher: Fetcher uid.
+        :param issues: Issue data keyed by issue id, None for the issues
+            not found.
+        :param now:
+        :return:
+        """
+        if now is None:
+            now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO issues "
+                "(fetcher, issue_id, data, fetched_at) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        fetcher,
+                        _issue_id,
+                        None if _data is None else json.dumps(_data),
+                        now,
+                    )
+                    for _issue_id, _data in issues.items()
+                ]
+            )
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+class CachedFetcher:
+    """Fetcher reading issues through the persistent `IssueCache`.
+
+    Wraps any fetcher (see `FetcherRegistry`). Only the issues not cached
+    (or stale) are fetched. Issue data is cached, as well as the issues not
+    found. Issues which could not be fetched (errors) are not cached.
+    """
+
+    def __init__(self,
+                 fetcher: BaseFetcher,
+                 cache: IssueCache,
+                 ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 refresh: bool = False):
+        """Constructor.
+
+        :param fetcher:
+        :param cache:
+        :param ttl: Lifetime of the issue data, in seconds.
+        :param negative_ttl: Lifetime of the issues not found, in seconds.
+        :param refresh: If True, cached entries are not read (but they are
+            replaced by the fetched ones).
+        """
+        self.fetcher = fetcher
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.refresh = refresh
+
+    @property
+    def uid(self) -> str:
+        return self.fetcher.uid
+
+    def fetch_issue_data(self, issue_id: str) -> Dict[str, str]:
+        return self.fetch_many([issue_id])[issue_id]
+
+    def fetch_many(
+        self,
+        issue_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, str]]:
+        """Fetch data of many issues, through the cache.
+
+        :param issue_ids:
+        :return: Issue data keyed by issue id (see `BaseFetcher.fetch_many`).
+        """
+        issue_ids = list(dict.fromkeys(issue_ids))
+        cached = {} if self.refresh else self.cache.get_many(
+            self.uid,
+            issue_ids,
+            ttl=self.ttl,
+            negative_ttl=self.negative_ttl
+        )
+        missing = [
+            _issue_id for _issue_id in issue_ids
+            if _issue_id not in cached
+        ]
+        fetched = self.fetcher.fetch_batches(missing) if missing else {}
+        self.cache.set_many(
+            self.uid,
+            {
+                _issue_id: _data
+                for _issue_id, _data in fetched.items()
+                if _data is None or _data
+            }
+        )
+        LOGGER.info(
+            f"Issue cache: {len(issue_ids) - len(missing)} hits, "
+            f"{len(missing)} fetched"
+        )
+        cached.update(fetched)
+        return {
+            _issue_id: cached.get(_issue_id) or {}
+            for _issue_id in issue_ids
+        }
+
+    def close(self) -> None:
+        """Close the cache (and the wrapped fetcher)."""
+        self.cache.close()
+        self.fetcher.close()
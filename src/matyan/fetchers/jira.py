@@ -1,9 +1,11 @@
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
 from atlassian import Jira
+import requests
 
 from ..logger import LOGGER
 from .base import BaseFetcher
+from .resilience import FetchError, RetryableFetchError, get_retry_after
 
 __author__ = 'Artur Barseghyan'
 __copyright__ = '2019-2020 Artur Barseghyan'
@@ -18,29 +20,163 @@ class JiraFetcher(BaseFetcher):
 
     uid: str = 'Jira'
     instance: Jira
+    batch_size: int = 100
+    fields: tuple = ('summary', 'description')
 
     def get_instance(self) -> Jira:
         config = self.get_config()
+        # Responses are returned as they are (advanced mode), so that
+        # failed requests can be told apart and retried
         return Jira(
             url=config["url"],
             username=config["username"],
-            password=config["token"]
+            password=config["token"],
+            timeout=self.resilience.timeout,
+            advanced_mode=True
         )
 
     def fetch_issue_data(self, issue_id: str) -> Dict[str, str]:
-        if not self.should_continue():
-            LOGGER.error(
-                f"Skip {issue_id} after global number of retries reached"
-            )
-            return {}
+        return self.fetch_batch([issue_id]).get(issue_id) or {}
 
+    def request(self,
+                path: str,
+                params: Dict[str, Any]) -> requests.Response:
+        """Make a single GET request to the REST API.
+
+        :param path:
+        :param params:
+        :return: Response, unless it is worth retrying.
+        """
         try:
-            issue = self.instance.issue(issue_id)
+            response = self.instance.get(path, params=params)
+        except (requests.Timeout, requests.ConnectionError) as err:
+            raise RetryableFetchError(str(err)) from err
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableFetchError(
+                f"HTTP {response.status_code} from {response.url}",
+                retry_after=get_retry_after(
+                    response.headers.get('Retry-After')
+                )
+            )
+        return response
+
+    def search(self, issue_ids: List[str], start: int = 0) -> Dict[str, Any]:
+        """Make a single ``key in (...)`` JQL search request.
+
+        :param issue_ids:
+        :param start:
+        :return: Search results.
+        """
+        # Keys which do not exist (anymore) are reported as warnings,
+        # instead of failing the whole search
+        response = self.request(
+            'rest/api/2/search',
+            {
+                'jql': 'key in ({})'.format(', '.join(issue_ids)),
+                'fields': ','.join(self.fields),
+                'startAt': start,
+                'maxResults': len(issue_ids),
+                'validateQuery': 'warn',
+            }
+        )
+        if response.status_code != 200:
+            raise FetchError(
+                f"HTTP {response.status_code} from {response.url}"
+            )
+        return response.json()
+
+    def get_issue(self, issue_id: str) -> Optional[Dict[str, Any]]:
+        """Make a single issue request.
+
+        Unlike the search, it finds issues moved to another project (under
+        their new keys).
+
+        :param issue_id:
+        :return: Issue or None if it does not exist.
+        """
+        response = self.request(
+            f'rest/api/2/issue/{issue_id}',
+            {'fields': ','.join(self.fields)}
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise FetchError(
+                f"HTTP {response.status_code} from {response.url}"
+            )
+        return response.json()
+
+    @staticmethod
+    def get_issue_data(issue: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            'title': issue['fields']['summary'],
+            'description': issue['fields']['description'],
+        }
+
+    def fetch_batch(
+        self,
+        issue_ids: List[str]
+    ) -> Dict[str, Optional[Dict[str, str]]]:
+        """Fetch issues with a single ``key in (...)`` JQL search.
+
+        Only the `fields` used by the changelog are requested. Pages of the
+        search are followed, in case the server returns fewer issues than
+        asked for. Keys are matched case-insensitively. Issues not found by
+        the search are looked up one by one (see `get_issue`), those not
+        found at all are reported (and mapped to None).
+
+        :param issue_ids:
+        :return:
+        """
+        found = {}
+
+        def _get_fetched() -> Dict[str, Dict[str, str]]:
             return {
-                'title': issue['fields']['summary'],
-                'description': issue['fields']['description'],
+                _issue_id: found[_issue_id.upper()]
+                for _issue_id in issue_ids
+                if _issue_id.upper() in found
             }
-        except (TypeError, KeyError, IOError) as err:
+
+        try:
+            start = 0
+            while True:
+                response = self.call(self.search, issue_ids, start)
+                issues = response['issues']
+                for issue in issues:
+                    found[issue['key'].upper()] = self.get_issue_data(issue)
+                start += len(issues)
+                if not issues or start >= response['total']:
+                    break
+        except FetchError as err:
+            LOGGER.error(
+                f"Problems getting the issues {', '.join(issue_ids)}: {err}"
+            )
+            return _get_fetched()
+        except (TypeError, KeyError, ValueError):
             self.register_error()
-            LOGGER.exception(f"Problems getting the issue {issue_id}")
-            return {}
+            LOGGER.exception(
+                f"Problems getting the issues {', '.join(issue_ids)}"
+            )
+            return _get_fetched()
+
+        fetched = _get_fetched()
+        missing = []
+        for issue_id in issue_ids:
+            if issue_id in fetched:
+                continue
+            try:
+                issue = self.call(self.get_issue, issue_id)
+                fetched[issue_id] = issue and self.get_issue_data(issue)
+            except FetchError as err:
+                LOGGER.error(f"Problems getting the issue {issue_id}: {err}")
+                continue
+            except (TypeError, KeyError, ValueError):
+                self.register_error()
+                LOGGER.exception(f"Problems getting the issue {issue_id}")
+                continue
+            if issue is None:
+                missing.append(issue_id)
+        if missing:
+            LOGGER.warning(f"Issues not found: {', '.join(missing)}")
+        return fetched
@@ -0,0 +1,106 @@
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, Union
+
+from ..logger import LOGGER
+from .base import BaseFetcher
+from .cache import CachedFetcher
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'MemoizedFetcher',
+)
+
+
+class MemoizedFetcher:
+    """Fetcher requesting each distinct issue at most once.
+
+    Wraps any fetcher (or the `CachedFetcher`). Results are kept for the
+    lifetime of the wrapper (a single run). Lookups of issues which are
+    being fetched already (by another thread) wait for that request,
+    instead of making their own.
+    """
+
+    def __init__(self, fetcher: Union[BaseFetcher, CachedFetcher]):
+        self.fetcher = fetcher
+        self.results: Dict[str, Dict[str, str]] = {}
+        self.pending: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.requested = 0
+        self.fetched = 0
+
+    @property
+    def uid(self) -> str:
+        return self.fetcher.uid
+
+    @property
+    def saved(self) -> int:
+        """Number of lookups served without a call to the fetcher."""
+        return self.requested - self.fetched
+
+    def fetch_issue_data(self, issue_id: str) -> Dict[str, str]:
+        return self.fetch_many([issue_id])[issue_id]
+
+    def fetch_many(
+        self,
+        issue_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, str]]:
+        """Fetch data of many issues, each of them at most once per run.
+
+        :param issue_ids:
+        :return: Issue data keyed by issue id (see `BaseFetcher.fetch_many`).
+        """
+        issue_ids = list(issue_ids)
+        own: Dict[str, Future] = {}
+        waiting: Dict[str, Future] = {}
+        with self.lock:
+            self.requested += len(issue_ids)
+            for issue_id in issue_ids:
+                if (
+                    issue_id in self.results
+                    or issue_id in own
+                    or issue_id in waiting
+                ):
+                    continue
+                if issue_id in self.pending:
+                    waiting[issue_id] = self.pending[issue_id]
+                else:
+                    own[issue_id] = self.pending[issue_id] = Future()
+            self.fetched += len(own)
+
+        if own:
+            try:
+                fetched = self.fetcher.fetch_many(list(own))
+            except BaseException as err:
+                with self.lock:
+                    for issue_id, future in own.items():
+                        del self.pending[issue_id]
+                        future.set_exception(err)
+                raise
+
+            with self.lock:
+                for issue_id, future in own.items():
+                    self.results[issue_id] = fetched.get(issue_id) or {}
+                    del self.pending[issue_id]
+                    future.set_result(self.results[issue_id])
+
+        for future in waiting.values():
+            future.result()
+
+        return {
+            _issue_id: self.results[_issue_id]
+            for _issue_id in issue_ids
+        }
+
+    def close(self) -> None:
+        """Close the wrapped fetcher."""
+        self.fetcher.close()
+
+    def log_stats(self) -> None:
+        """Log lookups of issues saved by the memo."""
+        LOGGER.info(
+            f"Issue lookups: {self.requested} requested, "
+            f"{self.fetched} fetched, {self.saved} saved"
+        )
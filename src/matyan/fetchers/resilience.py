@@ -0,0 +1,301 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+from ..config import CONFIG
+from ..logger import LOGGER
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'FetchError',
+    'Resilience',
+    'RetryableFetchError',
+    'TokenBucket',
+    'get_retry_after',
+)
+
+
+class FetchError(IOError):
+    """Request to the issue tracker failed."""
+
+
+class RetryableFetchError(FetchError):
+    """Request to the issue tracker failed, but might succeed if retried.
+
+    For instance, timeouts, rate limiting (HTTP 429) or server errors.
+    """
+
+    def __init__(self, *args, retry_after: float = None):
+        super().__init__(*args)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(FetchError):
+    """Requests are not made, since too many of them failed in a row."""
+
+
+def get_retry_after(value: Optional[str],
+                    now: datetime = None) -> Optional[float]:
+    """Get delay (in seconds) out of the value of ``Retry-After`` header.
+
+    :param value: Number of seconds or HTTP date.
+    :param now:
+    :return:
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if now is None:
+        now = datetime.now(timezone.utc)
+    return max(0.0, (date - now).total_seconds())
+
+
+class TokenBucket:
+    """Rate limiter, shared by the threads fetching issues.
+
+    Up to `burst` requests are made at once, then `rate` requests per
+    second. Requests over the limit reserve a token and wait for it.
+    """
+
+    def __init__(self,
+                 rate: float,
+                 burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Any] = time.sleep):
+        """Constructor.
+
+        :param rate: Requests per second. Unlimited, if not positive.
+        :param burst:
+        :param clock:
+        :param sleep:
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(self.burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting for it if needed.
+
+        :return: Time waited, in seconds.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst,
+                self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """Stop making requests after too many of them failed in a row.
+
+    Once `threshold` consecutive failures are recorded, the circuit opens
+    and requests are not allowed for `reset_timeout` seconds. Then a single
+    trial request is allowed (other requests are not, until it is done): the
+    circuit closes if it succeeds and opens again if it fails. Trials which
+    are not done within `reset_timeout` seconds are given up on.
+    """
+
+    def __init__(self,
+                 threshold: int = 5,
+                 reset_timeout: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        """Constructor.
+
+        :param threshold: Disabled, if not positive.
+        :param reset_timeout:
+        :param clock:
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probed_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """Check if a request is allowed.
+
+        :return:
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            now = self.clock()
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            # Half open, a single trial request at a time
+            if (
+                self.probed_at is not None
+                and now - self.probed_at < self.reset_timeout
+            ):
+                return False
+            self.probed_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probed_at = None
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.probed_at is not None:
+                # Trial request failed, the circuit opens again
+                self.probed_at = None
+                self.opened_at = self.clock()
+                LOGGER.warning(
+                    f"Circuit opened again, requests are paused for "
+                    f"{self.reset_timeout}s"
+                )
+            elif (
+                self.threshold > 0
+                and self.failures >= self.threshold
+                and self.opened_at is None
+            ):
+                self.opened_at = self.clock()
+                LOGGER.warning(
+                    f"Circuit opened after {self.failures} failures in a "
+                    f"row, requests are paused for {self.reset_timeout}s"
+                )
+
+
+class Resilience:
+    """Timeouts, retries, rate limiting and circuit breaking of requests.
+
+    Requests failing with `RetryableFetchError` are retried with
+    exponential backoff and full jitter, unless the server tells when to
+    retry (``Retry-After``).
+    """
+
+    def __init__(self,
+                 timeout: float = 30,
+                 retries: int = 3,
+                 backoff: float = 0.5,
+                 backoff_max: float = 30,
+                 rate_limit: float = 0,
+                 rate_burst: int = 1,
+                 circuit_threshold: int = 5,
+                 circuit_reset: float = 60,
+                 sleep: Callable[[float], Any] = time.sleep):
+        """Constructor.
+
+        :param timeout: Timeout of a single request, in seconds.
+        :param retries: Number of retries of a failed request.
+        :param backoff: Base delay of the retries, in seconds.
+        :param backoff_max: Maximum delay of the retries, in seconds.
+        :param rate_limit: Requests per second (unlimited if not positive).
+        :param rate_burst: Requests made at once, before limiting.
+        :param circuit_threshold: Failures in a row to open the circuit.
+        :param circuit_reset: Seconds for which the circuit stays open.
+        :param sleep:
+        """
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.bucket = TokenBucket(rate_limit, rate_burst, sleep=sleep)
+        self.breaker = CircuitBreaker(circuit_threshold, circuit_reset)
+
+    @classmethod
+    def from_config(cls, section: str, **kwargs) -> 'Resilience':
+        """Make out of the options of the configuration section.
+
+        :param section: Fetcher section (for instance, ``Jira``).
+        :param kwargs:
+        :return:
+        """
+        for name, option, getter in (
+            ('timeout', 'timeout', CONFIG.getfloat),
+            ('retries', 'retries', CONFIG.getint),
+            ('backoff', 'backoff', CONFIG.getfloat),
+            ('backoff_max', 'backoffMax', CONFIG.getfloat),
+            ('rate_limit', 'rateLimit', CONFIG.getfloat),
+            ('rate_burst', 'rateBurst', CONFIG.getint),
+            ('circuit_threshold', 'circuitThreshold', CONFIG.getint),
+            ('circuit_reset', 'circuitReset', CONFIG.getfloat),
+        ):
+            value = getter(section, option, fallback=None)
+            if value is not None:
+                kwargs[name] = value
+        return cls(**kwargs)
+
+    def get_delay(self, attempt: int, retry_after: float = None) -> float:
+        """Get delay before the retry.
+
+        :param attempt: Number of the failed attempt (starting at 0).
+        :param retry_after: Delay requested by the server (capped at
+            `backoff_max`).
+        :return:
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(
+            0,
+            min(self.backoff_max, self.backoff * 2 ** attempt)
+        )
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Call the function making a request.
+
+        :param func: Shall raise `RetryableFetchError` on failures which
+            might be retried and `FetchError` on the other failures.
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("Circuit is open")
+            self.bucket.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except RetryableFetchError as err:
+                self.breaker.record_failure()
+                if attempt >= self.retries:
+                    raise
+                delay = self.get_delay(attempt, err.retry_after)
+                LOGGER.info(f"Retrying in {delay:.2f}s after: {err}")
+                self.sleep(delay)
+                attempt += 1
+            except FetchError:
+                self.breaker.record_failure()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
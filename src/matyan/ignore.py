@@ -0,0 +1,188 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .labels import (
+    get_ignore_commits_exact_words,
+    get_ignore_commits_prefixes,
+    get_ignore_commits_regex_patterns,
+)
+from .logger import LOGGER
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'IgnoreRuleSet',
+    'RULE_EXACT',
+    'RULE_PREFIX',
+    'RULE_REGEX',
+)
+
+RULE_EXACT = 'exact'
+RULE_PREFIX = 'prefix'
+RULE_REGEX = 'regex'
+
+# Key of the trie node, which marks the end of a prefix
+_END = None
+# Back references, global inline flags (these can't be combined)
+_REGEX_NOT_COMBINABLE = re.compile(r'\\\d|\(\?P=|\(\?[aiLmsux]+\)')
+
+
+class IgnoreRuleSet:
+    """Rules of the `IgnoreCommits` section, compiled for fast matching.
+
+    - Exact words are kept in a frozenset.
+    - Prefixes are kept in a character trie (one walk per message, no
+      matter how many prefixes there are).
+    - Regex patterns are combined into a single alternation, each of them
+      wrapped into a group to tell which one matched.
+
+    Exact words and prefixes are matched against the lower cased message,
+    regex patterns against the message as is. Hits are counted per rule
+    (see `hits`).
+    """
+
+    def __init__(
+        self,
+        exact_words: Iterable[str] = (),
+        prefixes: Iterable[str] = (),
+        regex_patterns: Iterable[str] = ()
+    ):
+        self.exact_words = frozenset(exact_words)
+        self.prefixes = tuple(prefixes)
+        self.regex_patterns = tuple(regex_patterns)
+        self.hits = Counter()
+
+        self.trie: Dict = {}
+        for prefix in self.prefixes:
+            node = self.trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[_END] = prefix
+
+        self.compiled_patterns = [
+            re.compile(_pattern) for _pattern in self.regex_patterns
+        ]
+        self.regex, self.regex_groups = self._combine(self.compiled_patterns)
+
+    @classmethod
+    def from_config(cls, regex: bool = True) -> 'IgnoreRuleSet':
+        """Make rule set of the `IgnoreCommits` configuration section.
+
+        :param regex: If False, regex patterns are left out.
+        :return:
+        """
+        return cls(
+            get_ignore_commits_exact_words(),
+            get_ignore_commits_prefixes(),
+            get_ignore_commits_regex_patterns() if regex else ()
+        )
+
+    @staticmethod
+    def _combine(
+        compiled_patterns: List[re.Pattern]
+    ) -> Tuple[Optional[re.Pattern], Dict[int, str]]:
+        """Combine patterns into a single alternation.
+
+        :param compiled_patterns:
+        :return: Combined pattern and the pattern of each (outer) group. The
+            combined pattern is None if patterns can't be combined (for
+            instance, because of conflicting group names, global inline
+            flags or back references, which would refer to the wrong
+            groups).
+        """
+        if not compiled_patterns:
+            return None, {}
+
+        groups = {}
+        alternatives = []
+        index = 1
+        for compiled in compiled_patterns:
+            if _REGEX_NOT_COMBINABLE.search(compiled.pattern):
+                return None, {}
+            groups[index] = compiled.pattern
+            alternatives.append('({})'.format(compiled.pattern))
+            index += compiled.groups + 1
+
+        try:
+            return re.compile('|'.join(alternatives)), groups
+        except re.error:
+            return None, {}
+
+    def match_regex(self, commit_message: str) -> Optional[str]:
+        """Get the regex pattern matching the message.
+
+        Only non-empty matches at the beginning of the message count.
+
+        :param commit_message:
+        :return: Pattern or None.
+        """
+        if self.regex is not None:
+            match = self.regex.match(commit_message)
+            if match is None:
+                return None
+            if match.group():
+                return self.regex_groups[match.lastindex]
+
+        # Alternatives matching an empty string shadow the ones after them,
+        # thus check patterns one by one.
+        for compiled in self.compiled_patterns:
+            match = compiled.match(commit_message)
+            if match and match.group():
+                return compiled.pattern
+        return None
+
+    def match_prefix(self, commit_message: str) -> Optional[str]:
+        """Get the (shortest) prefix of the lower cased message.
+
+        :param commit_message:
+        :return: Prefix or None.
+        """
+        return self._match_prefix(commit_message.lower())
+
+    def _match_prefix(self, lower_commit_message: str) -> Optional[str]:
+        node = self.trie
+        for char in lower_commit_message:
+            if _END in node:
+                break
+            node = node.get(char)
+            if node is None:
+                return None
+        return node.get(_END)
+
+    def match(self, commit_message: str) -> Optional[Tuple[str, str]]:
+        """Get the rule the message is ignored by.
+
+        :param commit_message:
+        :return: Tuple of rule type and rule or None.
+        """
+        rule = None
+        lower_commit_message = commit_message.lower()
+        if lower_commit_message in self.exact_words:
+            rule = (RULE_EXACT, lower_commit_message)
+        elif self.trie:
+            prefix = self._match_prefix(lower_commit_message)
+            if prefix is not None:
+                rule = (RULE_PREFIX, prefix)
+        if rule is None and self.compiled_patterns:
+            pattern = self.match_regex(commit_message)
+            if pattern is not None:
+                rule = (RULE_REGEX, pattern)
+
+        if rule is not None:
+            self.hits[rule] += 1
+        return rule
+
+    def is_ignored(self, commit_message: str) -> bool:
+        """Check if the message shall be ignored.
+
+        :param commit_message:
+        :return:
+        """
+        return self.match(commit_message) is not None
+
+    def log_hits(self) -> None:
+        """Log hits of the rules, most frequent first."""
+        for (rule_type, rule), count in self.hits.most_common():
+            LOGGER.info(f"Ignored {count} commits by {rule_type} '{rule}'")
@@ -17,6 +17,7 @@ __all__ = (
     'get_other_branch_type',
     'get_other_branch_type_key',
     'get_settings',
+    'get_settings_flag',
     'get_unreleased_key_label',
     'IGNORE_COMMITS_EXACT_WORDS',
     'UNRELEASED',
@@ -39,6 +40,19 @@ def get_settings() -> SectionProxy:
         return {}
 
 
+def get_settings_flag(name: str, default: bool = False) -> bool:
+    """Get boolean flag from the `Settings` section.
+
+    :param name:
+    :param default:
+    :return:
+    """
+    value = get_settings().get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
 def get_other_branch_type() -> Dict[str, str]:
     """Get other branch type.
 
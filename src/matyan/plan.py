@@ -0,0 +1,123 @@
+from typing import Iterable, List
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = ('LogPlan',)
+
+
+class LogPlan:
+    """What the changelog needs of the git history (see `get_logs`).
+
+    - `commits`: Regular (non-merge) commits are needed. Headings are made
+      of the merges only, so the commits walk is skipped then.
+    - `released`: Released commits (and tags of commits) are needed. If
+      not, only the commits not contained in any tag are read
+      (``HEAD --not --tags``) and tags of commits are not read at all.
+    - `range_tags`: The range is bounded by releases (as with
+      ``--latest-release`` or ``--max-releases``), so only the tags within
+      it are needed. Tags of commits are then read from the tag index along
+      the walk of the range, instead of walking the whole history reachable
+      from tags.
+    - `since`, `until`, `author` and `paths`: Filters of the commits walk,
+      passed to git (``--since``, ``--until``, ``--author`` and pathspecs).
+      Only the paths filter the merges walk: headings are made of the
+      merges bringing changes to the paths into the mainline
+      (``--first-parent``), while commits of all branches are kept
+      (``--full-history``). Tags of commits are read unfiltered.
+    """
+
+    __slots__ = (
+        'commits',
+        'released',
+        'range_tags',
+        'since',
+        'until',
+        'author',
+        'paths',
+    )
+
+    def __init__(self,
+                 commits: bool = True,
+                 released: bool = True,
+                 range_tags: bool = False,
+                 since: str = None,
+                 until: str = None,
+                 author: str = None,
+                 paths: Iterable[str] = None):
+        self.commits = commits
+        self.released = released
+        self.range_tags = range_tags
+        self.since = since
+        self.until = until
+        self.author = author
+        self.paths = list(paths) if paths else []
+
+    def __repr__(self) -> str:
+        return "{}({})".format(
+            self.__class__.__name__,
+            ', '.join(
+                f"{_name}={getattr(self, _name)!r}"
+                for _name in self.__slots__
+            )
+        )
+
+    def get_filter_args(self, merges: bool = False) -> List[str]:
+        """Get git log arguments of the filters.
+
+        Pathspecs (if any) come last, so the arguments shall be appended to
+        the end of the git log command.
+
+        :param merges: Arguments of the merges walk. Merges of the branches
+            are never simplified away with ``--full-history``, but they are
+            kept even if they only differ from the branch (not from the
+            mainline) in the paths. Dates and author of the merges are
+            not filtered, since they are not the ones of the commits of
+            the branch (headings would be lost otherwise).
+        :return:
+        """
+        filter_args = []
+        if not merges:
+            if self.since:
+                filter_args.append(f"--since={self.since}")
+            if self.until:
+                filter_args.append(f"--until={self.until}")
+            if self.author:
+                filter_args.append(f"--author={self.author}")
+        if self.paths:
+            filter_args.append(
+                "--first-parent" if merges else "--full-history"
+            )
+            filter_args.append("--")
+            filter_args.extend(self.paths)
+        return filter_args
+
+    @classmethod
+    def for_changelog(cls,
+                      headings_only: bool = False,
+                      unreleased_only: bool = False,
+                      range_tags: bool = False,
+                      since: str = None,
+                      until: str = None,
+                      author: str = None,
+                      paths: Iterable[str] = None) -> 'LogPlan':
+        """Get plan for the changelog options.
+
+        :param headings_only:
+        :param unreleased_only:
+        :param range_tags:
+        :param since:
+        :param until:
+        :param author:
+        :param paths:
+        :return:
+        """
+        return cls(
+            commits=not headings_only,
+            released=not unreleased_only,
+            range_tags=range_tags,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths
+        )
@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, Iterator
+
+from .constants import RECORD_FIELD_SEPARATOR, RECORD_SEPARATOR
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'iter_records',
+    'parse_record',
+)
+
+RECORD_SEPARATOR_BYTES = RECORD_SEPARATOR.encode()
+RECORD_FIELD_SEPARATOR_BYTES = RECORD_FIELD_SEPARATOR.encode()
+
+
+def parse_record(record: bytes) -> Dict[str, str]:
+    """Parse a single record (as produced by the `RECORD_FORMAT`).
+
+    Fields are split on the bytes level and decoded one by one. Titles are
+    taken as is, so no escaping issues are possible.
+
+    :param record:
+    :return:
+    """
+    (
+        commit_hash,
+        commit_abbr,
+        date,
+        author,
+        parents,
+        refs,
+        title,
+    ) = record.split(RECORD_FIELD_SEPARATOR_BYTES, 6)
+    return {
+        # Records are newline separated by git, strip it out
+        'commit_hash': commit_hash.strip().decode('ascii'),
+        'commit_abbr': commit_abbr.decode('ascii'),
+        'datetime': date.decode('ascii'),
+        'title': title.decode('utf-8', 'replace'),
+        'author': author.decode('utf-8', 'replace'),
+        'merge': parents.decode('ascii'),
+        'refs': refs.decode('utf-8', 'replace'),
+    }
+
+
+def iter_records(chunks: Iterable[bytes]) -> Iterator[Dict[str, str]]:
+    """Parse records out of the given chunks of git output.
+
+    Chunks do not need to be aligned with the records, so that the output of
+    git can be fed as it's read. A single buffer would simply be given as a
+    list of one element.
+
+    :param chunks:
+    :return:
+    """
+    tail = b''
+    for chunk in chunks:
+        records = (tail + chunk if tail else chunk).split(
+            RECORD_SEPARATOR_BYTES
+        )
+        tail = records.pop()
+        for record in records:
+            yield parse_record(record)
+
+    if tail.strip():
+        yield parse_record(tail)
@@ -0,0 +1,144 @@
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .constants import RECORD_FIELD_SEPARATOR
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'ReleaseIndex',
+    'TagIndex',
+)
+
+
+class TagIndex:
+    """Tags of the repository, read in a single ``git for-each-ref`` pass.
+
+    Both annotated and lightweight tags are peeled to the commits they point
+    to. Commits are keyed by their full hashes.
+    """
+
+    def __init__(self, tags: List[Tuple[str, str, str]]):
+        """
+        :param tags: List of (tag, commit_hash, date) tuples, earliest first.
+        """
+        self.tags = tags
+        self.commits: Dict[str, List[str]] = {}
+        self.dates: Dict[str, str] = {}
+        for tag, commit_hash, date in tags:
+            self.commits.setdefault(commit_hash, []).append(tag)
+            self.dates[tag] = date
+
+    @classmethod
+    def parse(cls, text: str) -> 'TagIndex':
+        """Parse the output of ``git for-each-ref`` (see `TAG_INDEX_FORMAT`).
+
+        :param text:
+        :return:
+        """
+        tags = []
+        for line in text.split('\n'):
+            if not line:
+                continue
+            object_hash, commit_hash, date, tag = line.split(
+                RECORD_FIELD_SEPARATOR,
+                3
+            )
+            tags.append((tag, commit_hash or object_hash, date))
+        return cls(tags)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def get_tags(self, commit_hash: str) -> List[str]:
+        """Get tags pointing to the commit.
+
+        :param commit_hash: Full commit hash.
+        :return:
+        """
+        return self.commits.get(commit_hash, [])
+
+    def iter_tagged_commits(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over (tag, commit_hash) tuples, earliest first."""
+        for tag, commit_hash, _date in self.tags:
+            yield tag, commit_hash
+
+
+class ReleaseIndex:
+    """Release (the earliest tag containing it) of each commit.
+
+    Works like a batched ``git describe --contains``. Tags are processed
+    from the earliest to the latest. Ancestors of each tag, not claimed by
+    any of the earlier tags, are assigned to it. Since ancestors of a
+    claimed commit are always claimed as well, the walk stops there, which
+    makes the whole assignment linear in the size of the graph.
+
+    Commits are stored as raw 20 bytes digests pointing to the position of
+    the tag in the list of tags.
+    """
+
+    def __init__(self, tags: List[str], commit_releases: Dict[bytes, int]):
+        self.tags = tags
+        self.commit_releases = commit_releases
+
+    @classmethod
+    def build(cls,
+              tags: Iterable[Tuple[str, str]],
+              parents: Mapping[str, Sequence[str]]) -> 'ReleaseIndex':
+        """Build the index.
+
+        :param tags: Iterable of (tag, commit_hash) tuples, earliest first.
+        :param parents: Mapping of commit hashes to their parents.
+        :return:
+        """
+        tag_names = []
+        commit_releases = {}
+        for tag, commit_hash in tags:
+            position = len(tag_names)
+            claimed = len(commit_releases)
+            stack = [commit_hash]
+            while stack:
+                commit_hash = stack.pop()
+                key = bytes.fromhex(commit_hash)
+                if key in commit_releases:
+                    continue
+                commit_releases[key] = position
+                stack.extend(parents.get(commit_hash, ()))
+
+            # Tags of already released commits have nothing to show
+            if len(commit_releases) > claimed:
+                tag_names.append(tag)
+
+        return cls(tag_names, commit_releases)
+
+    def __len__(self) -> int:
+        return len(self.commit_releases)
+
+    def __contains__(self, commit_hash: str) -> bool:
+        return bytes.fromhex(commit_hash) in self.commit_releases
+
+    def get(self, commit_hash: str, default: str = None) -> Optional[str]:
+        """Get release of the commit.
+
+        :param commit_hash: Full commit hash.
+        :param default:
+        :return:
+        """
+        position = self.commit_releases.get(bytes.fromhex(commit_hash))
+        if position is None:
+            return default
+        return self.tags[position]
+
+    @property
+    def releases(self) -> List[str]:
+        """Releases, latest first."""
+        return self.tags[::-1]
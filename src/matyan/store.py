@@ -0,0 +1,509 @@
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import partial
+from time import gmtime
+from typing import (
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .tree import (
+    CommitRecord,
+    LazyReleaseNode,
+    ReleaseNode,
+    ReleasesTreeBuilder,
+    TicketRecord,
+)
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'ColumnarReleasesTreeBuilder',
+    'CommitStore',
+    'StringTable',
+)
+
+EPOCH = datetime(1970, 1, 1)
+# Length of the dates as formatted by git (``%ci``)
+# For instance: 2020-02-09 12:00:00 +0100
+DATE_LENGTH = 25
+# Placement of a ticket without any commit
+ROW_TICKET = -1
+
+
+class StringTable:
+    """Table of distinct values, coded by integers in order of appearance."""
+
+    def __init__(self, values: Iterable[Hashable] = ()):
+        self.values: List[Hashable] = []
+        self.codes: Dict[Hashable, int] = {}
+        for value in values:
+            self.code(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, code: int) -> Hashable:
+        return self.values[code]
+
+    def code(self, value: Hashable) -> int:
+        """Get code of the value (added to the table if not there yet).
+
+        :param value:
+        :return:
+        """
+        try:
+            return self.codes[value]
+        except KeyError:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            return code
+
+
+def parse_date(value: str) -> Optional[Tuple[int, int]]:
+    """Parse git date (``%ci``) into epoch seconds and UTC offset.
+
+    :param value:
+    :return: Tuple of epoch seconds and offset (in minutes) or None if the
+        date can't be stored that way without losing anything.
+    """
+    if len(value) != DATE_LENGTH or value[20] not in '+-' \
+            or value[20:] == '-0000':
+        return None
+    try:
+        moment = datetime.fromisoformat(value[:19])
+        offset = int(value[21:23]) * 60 + int(value[23:25])
+    except ValueError:
+        return None
+    if value[20] == '-':
+        offset = -offset
+    seconds = (moment - EPOCH) // timedelta(seconds=1) - offset * 60
+    return seconds, offset
+
+
+def format_date(seconds: int, offset: int) -> str:
+    """Format epoch seconds and UTC offset the way git (``%ci``) does.
+
+    :param seconds:
+    :param offset: Offset in minutes.
+    :return:
+    """
+    moment = gmtime(seconds + offset * 60)
+    return '%04d-%02d-%02d %02d:%02d:%02d %s%02d%02d' % (
+        moment.tm_year,
+        moment.tm_mon,
+        moment.tm_mday,
+        moment.tm_hour,
+        moment.tm_min,
+        moment.tm_sec,
+        '-' if offset < 0 else '+',
+        abs(offset) // 60,
+        abs(offset) % 60
+    )
+
+
+class CommitStore:
+    """Columnar store of parsed commits.
+
+    Every commit is a row of parallel arrays:
+
+    - hashes in a single fixed width bytes buffer,
+    - lengths of the abbreviated hashes,
+    - dates as epoch seconds and UTC offsets,
+    - authors and ticket numbers coded by integers (see `StringTable`),
+    - titles in a single packed UTF-8 buffer (with offsets).
+
+    Memory used grows linearly with the number of commits, with no per
+    commit Python objects.
+    """
+
+    def __init__(self):
+        self.hash_size = None
+        self.hashes = bytearray()
+        self.abbr_lengths = array('B')
+        self.dates = array('q')
+        self.date_offsets = array('h')
+        # Dates which can't be stored as numbers, by row
+        self.raw_dates: Dict[int, str] = {}
+        self.authors = array('I')
+        self.author_table = StringTable()
+        self.ticket_numbers = array('I')
+        self.ticket_number_table = StringTable()
+        self.titles = bytearray()
+        self.title_offsets = array('Q', [0])
+
+    def __len__(self) -> int:
+        return len(self.abbr_lengths)
+
+    def append(
+        self,
+        commit_hash: str,
+        commit_abbr: str,
+        author: str,
+        date: str,
+        ticket_number: Optional[str],
+        title: str
+    ) -> int:
+        """Append commit.
+
+        :param commit_hash:
+        :param commit_abbr:
+        :param author:
+        :param date: Date as formatted by git (``%ci``).
+        :param ticket_number:
+        :param title:
+        :return: Row of the commit.
+        """
+        row = len(self.abbr_lengths)
+        raw_hash = bytes.fromhex(commit_hash)
+        if self.hash_size is None:
+            self.hash_size = len(raw_hash)
+        elif len(raw_hash) != self.hash_size:
+            raise ValueError(f"Unexpected commit hash {commit_hash}")
+        self.hashes += raw_hash
+        self.abbr_lengths.append(len(commit_abbr))
+
+        parsed_date = parse_date(date)
+        if parsed_date is None:
+            self.raw_dates[row] = date
+            parsed_date = (0, 0)
+        self.dates.append(parsed_date[0])
+        self.date_offsets.append(parsed_date[1])
+
+        self.authors.append(self.author_table.code(author))
+        self.ticket_numbers.append(
+            self.ticket_number_table.code(ticket_number)
+        )
+        self.titles += title.encode('utf-8', 'surrogatepass')
+        self.title_offsets.append(len(self.titles))
+        return row
+
+    def get_hash(self, row: int) -> str:
+        start = row * self.hash_size
+        return self.hashes[start:start + self.hash_size].hex()
+
+    def get_date(self, row: int) -> str:
+        if row in self.raw_dates:
+            return self.raw_dates[row]
+        return format_date(self.dates[row], self.date_offsets[row])
+
+    def get_title(self, row: int) -> str:
+        return self.titles[
+            self.title_offsets[row]:self.title_offsets[row + 1]
+        ].decode('utf-8', 'surrogatepass')
+
+    def get_commit(self, row: int) -> CommitRecord:
+        """Get commit record of the row.
+
+        :param row:
+        :return:
+        """
+        commit_hash = self.get_hash(row)
+        return CommitRecord(
+            commit_hash,
+            commit_hash[:self.abbr_lengths[row]],
+            self.author_table[self.authors[row]],
+            self.get_date(row),
+            self.ticket_number_table[self.ticket_numbers[row]],
+            self.get_title(row)
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the arrays and buffers (string tables left out)."""
+        return sum(
+            len(_column) * getattr(_column, 'itemsize', 1)
+            for _column in (
+                self.hashes,
+                self.abbr_lengths,
+                self.dates,
+                self.date_offsets,
+                self.authors,
+                self.ticket_numbers,
+                self.titles,
+                self.title_offsets,
+            )
+        )
+
+
+class ColumnarReleasesTreeBuilder(ReleasesTreeBuilder):
+    """Builder of the releases changelog tree backed by a `CommitStore`.
+
+    Nothing is inserted into the tree until it's built. Commits go into the
+    store and each placement (of a commit or of a ticket) is recorded as a
+    row of integer columns: the ticket group (release, branch type and
+    ticket) and the commit row. When the tree is built, placements are
+    sorted by their groups (counting sort, linear) and the tree is made of
+    the groups, in order. The tree is the same as the one built by the
+    `ReleasesTreeBuilder`.
+
+    If `lazy_tree` is set, releases are `LazyReleaseNode`: their branch
+    types, tickets and commits are made of the sorted placements only when
+    accessed (and are not kept by the tree), so that only the columns and
+    the subtree of the release being rendered are held in memory.
+    """
+
+    def __init__(
+        self,
+        releases: Iterable[str],
+        date_tags: Dict[str, str],
+        unique_commit_messages: bool = False,
+        lazy_tree: bool = False
+    ):
+        self.releases = list(releases)
+        self.date_tags = date_tags
+        self.unique_commit_messages = unique_commit_messages
+        self.lazy_tree = lazy_tree
+        self.store = CommitStore()
+
+        # Releases are coded in the order of the tree (the known ones first)
+        self.release_table = StringTable(self.releases)
+        self.branch_type_table = StringTable()
+        self.ticket_number_table = StringTable()
+        # Groups of (release, branch type) and (branch group, ticket)
+        self.branch_groups: Dict[Tuple[int, int], int] = {}
+        self.branch_group_releases = array('I')
+        self.branch_group_branch_types = array('I')
+        self.ticket_groups: Dict[Tuple[int, int], int] = {}
+        self.ticket_group_branches = array('I')
+        self.ticket_group_ticket_numbers = array('I')
+        # Tickets of the merged branches
+        self.tickets: List[TicketRecord] = []
+
+        # Placements
+        self.placement_groups = array('I')
+        self.placement_rows = array('q')
+
+    def get_ticket_group(
+        self,
+        release: str,
+        branch_type: str,
+        ticket_number: str
+    ) -> int:
+        """Get (or make) group of the ticket.
+
+        Groups are numbered in the order they are seen first.
+
+        :param release:
+        :param branch_type:
+        :param ticket_number:
+        :return:
+        """
+        release_code = self.release_table.code(release)
+        branch_type_code = self.branch_type_table.code(branch_type)
+        key = (release_code, branch_type_code)
+        branch_group = self.branch_groups.get(key)
+        if branch_group is None:
+            branch_group = self.branch_groups[key] = len(self.branch_groups)
+            self.branch_group_releases.append(release_code)
+            self.branch_group_branch_types.append(branch_type_code)
+
+        ticket_number_code = self.ticket_number_table.code(ticket_number)
+        key = (branch_group, ticket_number_code)
+        ticket_group = self.ticket_groups.get(key)
+        if ticket_group is None:
+            ticket_group = self.ticket_groups[key] = len(self.ticket_groups)
+            self.ticket_group_branches.append(branch_group)
+            self.ticket_group_ticket_numbers.append(ticket_number_code)
+        return ticket_group
+
+    def add_ticket(self, release: str, ticket: TicketRecord) -> None:
+        self.placement_groups.append(
+            self.get_ticket_group(
+                release,
+                ticket.branch_type,
+                ticket.ticket_number
+            )
+        )
+        # Tickets are referred to by negative rows, below `ROW_TICKET`
+        self.placement_rows.append(ROW_TICKET - 1 - len(self.tickets))
+        self.tickets.append(ticket)
+
+    def touch_ticket(
+        self,
+        release: str,
+        branch_type: str,
+        ticket_number: str
+    ) -> None:
+        self.placement_groups.append(
+            self.get_ticket_group(release, branch_type, ticket_number)
+        )
+        self.placement_rows.append(ROW_TICKET)
+
+    def add_commit(
+        self,
+        release: str,
+        branch_type: str,
+        ticket_number: str,
+        commit_hash: str,
+        commit_abbr: str,
+        author: str,
+        date: str,
+        commit_ticket_number: str,
+        title: str
+    ) -> None:
+        self.placement_groups.append(
+            self.get_ticket_group(release, branch_type, ticket_number)
+        )
+        self.placement_rows.append(
+            self.store.append(
+                commit_hash,
+                commit_abbr,
+                author,
+                date,
+                commit_ticket_number,
+                title
+            )
+        )
+
+    def sort_placements(self) -> array:
+        """Sort placements by the tree order of their groups.
+
+        Placements of the same group keep their order.
+
+        :return: Sorted placement indexes.
+        """
+        # Tree order of the ticket groups: by release, then by branch group
+        # (first seen within the release), then by the group itself
+        branch_group_releases = self.branch_group_releases
+        ticket_group_branches = self.ticket_group_branches
+        group_order = sorted(
+            range(len(ticket_group_branches)),
+            key=lambda _group: (
+                branch_group_releases[ticket_group_branches[_group]],
+                ticket_group_branches[_group],
+                _group,
+            )
+        )
+        group_ranks = array('I', [0]) * len(group_order)
+        for rank, group in enumerate(group_order):
+            group_ranks[group] = rank
+
+        # Counting sort of the placements by the ranks of their groups
+        starts = array('I', [0]) * (len(group_order) + 1)
+        for group in self.placement_groups:
+            starts[group_ranks[group] + 1] += 1
+        for rank in range(len(group_order)):
+            starts[rank + 1] += starts[rank]
+        order = array('I', [0]) * len(self.placement_groups)
+        for index, group in enumerate(self.placement_groups):
+            rank = group_ranks[group]
+            order[starts[rank]] = index
+            starts[rank] += 1
+        return order
+
+    def iter_release_placements(
+        self,
+        order: array
+    ) -> Iterator[Tuple[int, int, int]]:
+        """Iterate over the placements of each release.
+
+        :param order: Sorted placement indexes (see `sort_placements`).
+        :return: Iterator of (release code, start, end) tuples, slices of
+            the `order`.
+        """
+        placement_groups = self.placement_groups
+        ticket_group_branches = self.ticket_group_branches
+        branch_group_releases = self.branch_group_releases
+        current_release = None
+        start = 0
+        for position, index in enumerate(order):
+            release_code = branch_group_releases[
+                ticket_group_branches[placement_groups[index]]
+            ]
+            if release_code != current_release:
+                if current_release is not None:
+                    yield current_release, start, position
+                current_release = release_code
+                start = position
+        if current_release is not None:
+            yield current_release, start, len(order)
+
+    def make_branches(
+        self,
+        order: array,
+        start: int,
+        end: int
+    ) -> Dict[str, Dict[str, TicketRecord]]:
+        """Make branch types, tickets and commits of the release.
+
+        :param order: Sorted placement indexes (see `sort_placements`).
+        :param start: First placement of the release in the `order`.
+        :param end: Placement past the last one of the release.
+        :return:
+        """
+        store = self.store
+        unique_commit_messages = self.unique_commit_messages
+        lazy_tree = self.lazy_tree
+        placement_groups = self.placement_groups
+        placement_rows = self.placement_rows
+
+        branches = {}
+        current_group = None
+        current_branch_group = None
+        tickets = commits = None
+        for index in order[start:end]:
+            group = placement_groups[index]
+            row = placement_rows[index]
+            if group != current_group:
+                current_group = group
+                branch_group = self.ticket_group_branches[group]
+                if branch_group != current_branch_group:
+                    current_branch_group = branch_group
+                    tickets = branches[self.branch_type_table[
+                        self.branch_group_branch_types[branch_group]
+                    ]] = {}
+
+                # First placement of the group decides what the ticket is
+                if row < ROW_TICKET:
+                    ticket = self.tickets[ROW_TICKET - 1 - row]
+                    if lazy_tree:
+                        # Subtrees are made anew, tickets are not shared
+                        ticket = TicketRecord(**dict(
+                            ticket.items(),
+                            commits={}
+                        ))
+                else:
+                    ticket = TicketRecord(commits={})
+                tickets[self.ticket_number_table[
+                    self.ticket_group_ticket_numbers[group]
+                ]] = ticket
+                commits = ticket.commits
+
+            if row >= 0:
+                commit = store.get_commit(row)
+                commits[
+                    commit.title if unique_commit_messages
+                    else commit.commit_hash
+                ] = commit
+
+        return branches
+
+    def build(self) -> Dict[str, ReleaseNode]:
+        releases_tree = OrderedDict(
+            (_release, ReleaseNode(self.date_tags.get(_release)))
+            for _release in self.releases
+        )
+        order = self.sort_placements()
+        for release_code, start, end in self.iter_release_placements(order):
+            release = self.release_table[release_code]
+            date = self.date_tags.get(release, None)
+            if self.lazy_tree:
+                releases_tree[release] = LazyReleaseNode(
+                    date,
+                    partial(self.make_branches, order, start, end)
+                )
+            else:
+                releases_tree[release] = ReleaseNode(
+                    date,
+                    self.make_branches(order, start, end)
+                )
+
+        return releases_tree
@@ -4,6 +4,7 @@ from ..auto_correct import (
     add_final_dot,
     capitalize,
     capitalize_first_letter,
+    Normalizer,
     unslugify,
 )
 
@@ -71,3 +72,22 @@ class TestAutoCorrect(unittest.TestCase):
         ]
         for before, after in texts:
             self.assertEqual(capitalize(before), after)
+
+    def test_normalizer(self):
+        """Test `Normalizer`."""
+        normalize = Normalizer(cache_size=2)
+        for value in ('fix-tests', 'update-docs', 'fix-tests', 'other'):
+            self.assertEqual(
+                normalize(value),
+                add_final_dot(capitalize(unslugify(value)))
+            )
+        self.assertEqual(normalize.hits, 1)
+        self.assertEqual(normalize.misses, 3)
+
+        self.assertEqual(
+            Normalizer(['unslugify'])('fix-tests'),
+            'Fix tests'
+        )
+        self.assertEqual(Normalizer([])('fix-tests'), 'fix-tests')
+        with self.assertRaises(ValueError):
+            Normalizer(['unknown'])
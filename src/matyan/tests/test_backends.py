@@ -0,0 +1,317 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from ..backends import (
+    BackendRegistry,
+    BaseBackend,
+    ObjectsBackend,
+    SessionBackend,
+    parse_commit,
+)
+from ..backends.objects import apply_delta
+from ..utils import get_logs, iter_log_entries
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'TestBackends',
+    'TestObjectsBackend',
+)
+
+COMMIT = (
+    b'tree 7e0d329f8962573c5c3d0b756928dbdcd0f34293\n'
+    b'parent 23a992961010cc0a022201fe9c404de43f164445\n'
+    b'parent 84f016c5ad263c180500c58ee498338afc928b77\n'
+    b'author Artur Barseghyan <a@b.c> 1574021880 +0100\n'
+    b'committer Artur Barseghyan <a@b.c> 1574021880 +0100\n'
+    b'gpgsig -----BEGIN PGP SIGNATURE-----\n'
+    b' parent 0000000000000000000000000000000000000000\n'
+    b' -----END PGP SIGNATURE-----\n'
+    b'\n'
+    b'Merge branch \'feature/MSFT-1237\'\n'
+)
+
+
+class TestBackends(unittest.TestCase):
+
+    def test_registry(self):
+        """Test backends registry."""
+        self.assertIs(BackendRegistry.get('git'), BaseBackend)
+        self.assertIs(BackendRegistry.get('session'), SessionBackend)
+
+    def test_parse_commit(self):
+        """Test parsing of raw commit objects."""
+        commit = parse_commit(COMMIT)
+        self.assertEqual(
+            commit['tree'],
+            '7e0d329f8962573c5c3d0b756928dbdcd0f34293'
+        )
+        self.assertEqual(
+            commit['parents'],
+            [
+                '23a992961010cc0a022201fe9c404de43f164445',
+                '84f016c5ad263c180500c58ee498338afc928b77',
+            ]
+        )
+        self.assertEqual(
+            commit['committer'],
+            'Artur Barseghyan <a@b.c> 1574021880 +0100'
+        )
+        self.assertEqual(
+            commit['message'],
+            "Merge branch 'feature/MSFT-1237'\n"
+        )
+
+    def test_apply_delta(self):
+        """Test applying of git deltas."""
+        base = b'0123456789abcdef'
+        # Source size 16, target size 9: copy 4 bytes at offset 2,
+        # insert `XYZ`, copy 2 bytes at offset 14.
+        delta = bytes([
+            16, 9,
+            0x91, 2, 4,
+            3, ord('X'), ord('Y'), ord('Z'),
+            0x91, 14, 2,
+        ])
+        self.assertEqual(apply_delta(base, delta), b'2345XYZef')
+
+
+class TestObjectsBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.git('init', '-q')
+        self.git('symbolic-ref', 'HEAD', 'refs/heads/master')
+        self.commit('Commit 0')
+        self.commit('Commit 1')
+        self.git('tag', '-a', '0.1', '-m', 'Release 0.1')
+        # Octopus merge (three parents)
+        for branch in ('a', 'b'):
+            self.git('checkout', '-q', '-b', branch, 'master')
+            self.commit(f'Commit {branch}')
+        self.git('checkout', '-q', 'master')
+        self.commit('Commit 2')
+        self.git('merge', '-q', '--no-ff', '-m', 'Octopus', 'a', 'b')
+        self.commit('Commit 3')
+        self.git('tag', '0.2')
+        self.git('pack-refs', '--all')
+        self.git('repack', '-adq')
+        # Loose object on top of the packed ones
+        self.commit('Loose commit')
+
+    def git(self, *args):
+        subprocess.run(
+            ['git', '-c', 'user.name=Dev', '-c', 'user.email=d@x', *args],
+            cwd=self.path,
+            check=True,
+            capture_output=True
+        )
+
+    def commit(self, message: str):
+        self.git('commit', '-q', '--allow-empty', '-m', message)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_objects_backend(self):
+        """Test reading straight from the object database."""
+        repository = BaseBackend(self.path)
+        backend = ObjectsBackend(self.path)
+        for revision in ('HEAD', 'master', '0.1', '0.2', 'HEAD~2', 'nope'):
+            self.assertEqual(
+                backend.resolve(revision),
+                repository.resolve(revision)
+            )
+        head = repository.resolve('HEAD')
+        self.assertEqual(
+            backend.read_commit(head),
+            repository.read_commit(head)
+        )
+        parents = backend.get_parents([head])
+        self.assertEqual(len(parents), 8)
+        self.assertEqual(parents, repository.get_parents([head]))
+
+    def test_moving_refs(self):
+        """Test refs resolved again once they move."""
+        repository = BaseBackend(self.path)
+        for backend in (SessionBackend(self.path), ObjectsBackend(self.path)):
+            head = backend.resolve('HEAD')
+            self.assertEqual(backend.resolve(head), head)
+            self.commit('Moved')
+            self.git('tag', f'{backend.uid}-tag')
+            self.git('pack-refs', '--all')
+            self.assertEqual(
+                backend.resolve('HEAD'),
+                repository.resolve('HEAD')
+            )
+            self.assertNotEqual(backend.resolve('HEAD'), head)
+            self.assertEqual(
+                backend.resolve(f'{backend.uid}-tag'),
+                repository.resolve('HEAD')
+            )
+
+    def test_worktree(self):
+        """Test reading objects and refs of a linked worktree."""
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        worktree = os.path.join(path, 'worktree')
+        self.git('worktree', 'add', '-q', '-b', 'side', worktree)
+        repository = BaseBackend(worktree)
+        backend = ObjectsBackend(worktree)
+        self.assertEqual(
+            backend.get_common_dir(),
+            BaseBackend(self.path).get_git_dir()
+        )
+        for revision in ('HEAD', 'side', 'master', '0.1', '0.2'):
+            self.assertEqual(
+                backend.resolve(revision),
+                repository.resolve(revision)
+            )
+        head = repository.resolve('HEAD')
+        self.assertEqual(
+            backend.read_commit(head),
+            repository.read_commit(head)
+        )
+        self.assertEqual(
+            backend.get_parents([head]),
+            repository.get_parents([head])
+        )
+
+        # Objects packed after the object database was opened
+        self.commit('Packed commit')
+        self.git('repack', '-adq')
+        head = BaseBackend(self.path).resolve('HEAD')
+        self.assertEqual(
+            backend.get_parents([head]),
+            repository.get_parents([head])
+        )
+
+    def test_resolve_range(self):
+        """Test resolving of ranges, without walking them."""
+        repository = BaseBackend(self.path)
+        backend = ObjectsBackend(self.path)
+        tag_0_1 = repository.resolve('0.1')
+        tag_0_2 = repository.resolve('0.2')
+        for expression, expected in (
+            ('0.1..0.2', ([tag_0_2], [tag_0_1])),
+            ('0.2', ([tag_0_2], [])),
+            ('0.1..', ([repository.resolve('HEAD')], [tag_0_1])),
+            ('non-existing..0.2', ([], [])),
+            ('README.rst', ([], [])),
+        ):
+            self.assertEqual(repository.resolve_range(expression), expected)
+            self.assertEqual(backend.resolve_range(expression), expected)
+
+        # Symmetric difference, excluding the merge base
+        include, exclude = backend.resolve_range('a...b')
+        self.assertCountEqual(
+            include,
+            [repository.resolve('a'), repository.resolve('b')]
+        )
+        self.assertEqual(exclude, [tag_0_1])
+
+    def test_get_logs_range(self):
+        """Test logs of ranges (single commit and root commit ones)."""
+        for between, count in (
+            ('HEAD~1..HEAD', 1),
+            ('0.1..0.2', 5),
+            ('0.1', 2),
+        ):
+            logs = get_logs(between=between, path=self.path)
+            self.assertEqual(
+                len(list(iter_log_entries(logs['LOG']))),
+                count
+            )
+
+    def test_commit_graph(self):
+        """Test reading parents from the commit-graph."""
+        self.git('commit-graph', 'write', '--reachable')
+        # Not in the commit-graph
+        self.commit('Commit 4')
+        repository = BaseBackend(self.path)
+        backend = ObjectsBackend(self.path)
+        self.assertEqual(len(backend.commit_graph), 8)
+
+        head = repository.resolve('HEAD')
+        parents = repository.get_parents([head])
+        self.assertEqual(backend.get_parents([head]), parents)
+        octopus = repository.resolve('0.2~1')
+        self.assertEqual(len(backend.commit_graph.get_parents(octopus)), 3)
+        self.assertIsNone(backend.commit_graph.get_parents(head))
+
+    def test_commit_graph_reachability(self):
+        """Test reachability queries cut short by generation numbers."""
+        self.git('commit-graph', 'write', '--reachable')
+        # Not in the commit-graph
+        self.commit('Commit 4')
+        repository = BaseBackend(self.path)
+        backend = ObjectsBackend(self.path)
+        commit_graph = backend.commit_graph
+        tag_0_1 = repository.resolve('0.1')
+        tag_0_2 = repository.resolve('0.2')
+        branch_a = repository.resolve('a')
+        head = repository.resolve('HEAD')
+        self.assertLess(
+            commit_graph.get_generation(tag_0_1),
+            commit_graph.get_generation(tag_0_2)
+        )
+        self.assertTrue(commit_graph.is_ancestor(tag_0_1, tag_0_2))
+        self.assertTrue(commit_graph.is_ancestor(tag_0_2, tag_0_2))
+        self.assertFalse(commit_graph.is_ancestor(tag_0_2, tag_0_1))
+        self.assertIsNone(commit_graph.is_ancestor(tag_0_1, head))
+        for commit_hashes, bases, expected in (
+            ([tag_0_1, tag_0_2, branch_a], [tag_0_1], [tag_0_2, branch_a]),
+            ([tag_0_1, tag_0_2], [tag_0_2], []),
+            ([tag_0_2, branch_a], [branch_a, tag_0_1], [tag_0_2]),
+            ([tag_0_1, head], [tag_0_2], [head]),
+        ):
+            self.assertEqual(
+                repository.get_unreachable(commit_hashes, bases),
+                expected
+            )
+            self.assertEqual(
+                backend.get_unreachable(commit_hashes, bases),
+                expected
+            )
+        self.assertTrue(backend.is_ancestor(branch_a, head))
+        self.assertFalse(repository.is_ancestor(head, branch_a))
+
+    def test_commit_graph_unsupported(self):
+        """Test commit-graph files of other versions are not used."""
+        self.git('commit-graph', 'write', '--reachable')
+        filename = os.path.join(
+            self.path, '.git', 'objects', 'info', 'commit-graph'
+        )
+        os.chmod(filename, 0o644)
+        repository = BaseBackend(self.path)
+        head = repository.resolve('HEAD')
+        for position, value in ((4, 2), (5, 2)):
+            with open(filename, 'r+b') as _file:
+                _file.seek(position)
+                original = _file.read(1)
+                _file.seek(position)
+                _file.write(bytes([value]))
+            try:
+                backend = ObjectsBackend(self.path)
+                with self.assertLogs('matyan', level='INFO'):
+                    self.assertIsNone(backend.commit_graph)
+                self.assertEqual(
+                    backend.get_parents([head]),
+                    repository.get_parents([head])
+                )
+                self.assertEqual(
+                    backend.get_unreachable([head], [head]),
+                    []
+                )
+            finally:
+                with open(filename, 'r+b') as _file:
+                    _file.seek(position)
+                    _file.write(original)
+
+
+if __name__ == '__main__':
+    unittest.main()
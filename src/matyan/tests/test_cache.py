@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from ..cache import CommitCache
+from ..utils import get_logs, iter_log_entries
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'TestCachedLogs',
+    'TestCommitCache',
+)
+
+
+def make_record(commit_hash: str, minute: int, parents: str = ''):
+    return {
+        'commit_hash': commit_hash,
+        'commit_abbr': commit_hash[:7],
+        'datetime': '2019-11-17 20:{:02d}:00 +0100'.format(minute),
+        'title': 'Commit {}'.format(commit_hash),
+        'author': 'Artur Barseghyan',
+        'merge': parents,
+        'refs': '',
+    }
+
+
+# a - b - c ----- f (merge)
+#      \         /
+#       d ---- e
+RECORDS = [
+    make_record('f', 6, 'c e'),
+    make_record('e', 5, 'd'),
+    make_record('c', 4, 'b'),
+    make_record('d', 3, 'b'),
+    make_record('b', 2, 'a'),
+    make_record('a', 1),
+]
+
+
+class TestCommitCache(unittest.TestCase):
+
+    def setUp(self):
+        self.git_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.git_dir)
+
+    def test_walk(self):
+        """Test walking cached commits by date."""
+        cache = CommitCache(self.git_dir)
+        self.assertEqual(cache.update(RECORDS), 6)
+        self.assertEqual(
+            [_r['commit_hash'] for _r in cache.walk(['f'])],
+            ['f', 'e', 'c', 'd', 'b', 'a']
+        )
+        self.assertEqual(
+            [_r['commit_hash'] for _r in cache.walk(['f'], exclude=['c'])],
+            ['f', 'e', 'd']
+        )
+        self.assertNotIn('refs', cache.commits['f'])
+
+    def test_save_load(self):
+        """Test tips are stored along with the commits."""
+        cache = CommitCache(self.git_dir)
+        cache.update(RECORDS[2:])
+        cache.save()
+
+        cache = CommitCache(self.git_dir).load()
+        self.assertEqual(sorted(cache.tips), ['c', 'd'])
+        self.assertEqual(cache.get_exclude_args(), ['^c', '^d'])
+
+        cache.update(RECORDS[:2])
+        cache.save()
+        self.assertEqual(
+            CommitCache(self.git_dir).load().tips,
+            ['f']
+        )
+        self.assertTrue(cache.filename.endswith('.jsonl'))
+
+    def test_save_append(self):
+        """Test only the new records are written."""
+        cache = CommitCache(self.git_dir)
+        cache.update(RECORDS[2:])
+        cache.save()
+        with open(cache.filename) as _file:
+            saved = _file.read()
+
+        cache = CommitCache(self.git_dir).load()
+        cache.save()
+        cache.update(RECORDS[:2])
+        cache.save()
+        with open(cache.filename) as _file:
+            lines = _file.read()[len(saved):].splitlines()
+        self.assertEqual(
+            [json.loads(_line)['commit_hash'] for _line in lines],
+            ['f', 'e']
+        )
+        self.assertEqual(
+            CommitCache(self.git_dir).load().commits,
+            cache.commits
+        )
+
+        # Discarded commits are written out along with the whole cache
+        cache.discard(['f'])
+        cache.save()
+        self.assertEqual(
+            sorted(CommitCache(self.git_dir).load().commits),
+            ['a', 'b', 'c', 'd', 'e']
+        )
+
+    def test_version(self):
+        """Test caches of other versions are not used."""
+        cache = CommitCache(self.git_dir)
+        cache.update(RECORDS)
+        cache.save()
+        with open(cache.filename) as _file:
+            lines = _file.readlines()
+        lines[0] = json.dumps(['0', '']) + '\n'
+        with open(cache.filename, 'w') as _file:
+            _file.writelines(lines)
+        cache = CommitCache(self.git_dir).load()
+        self.assertEqual(cache.commits, {})
+        self.assertTrue(cache.rewrite)
+
+    def test_discard(self):
+        """Test discarding commits."""
+        cache = CommitCache(self.git_dir)
+        cache.update(RECORDS[2:])
+        cache.save()
+        cache.discard(['c'])
+        self.assertEqual(cache.tips, ['d'])
+        self.assertNotIn('c', cache.commits)
+
+
+class TestCachedLogs(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.git('init', '-q')
+        self.git('symbolic-ref', 'HEAD', 'refs/heads/master')
+        self.git('commit', '-q', '--allow-empty', '-m', 'Initial commit')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def git(self, *args):
+        subprocess.run(
+            ['git', '-c', 'user.name=Dev', '-c', 'user.email=d@x', *args],
+            cwd=self.path,
+            check=True,
+            capture_output=True
+        )
+
+    def get_titles(self):
+        logs = get_logs(path=self.path, cache=True)
+        return [_entry['title'] for _entry in iter_log_entries(logs['LOG'])]
+
+    def test_pruned_tip(self):
+        """Test tips of deleted (and garbage collected) branches."""
+        self.git('checkout', '-q', '-b', 'side')
+        self.git('commit', '-q', '--allow-empty', '-m', 'Side commit')
+        self.assertEqual(self.get_titles(), ['Side commit', 'Initial commit'])
+        cache = CommitCache(os.path.join(self.path, '.git'))
+        self.assertTrue(os.path.exists(cache.filename))
+
+        self.git('checkout', '-q', 'master')
+        self.git('branch', '-q', '-D', 'side')
+        self.git('reflog', 'expire', '--expire=now', '--all')
+        self.git('gc', '-q', '--prune=now')
+        self.git('commit', '-q', '--allow-empty', '-m', 'Master commit')
+        self.assertEqual(
+            self.get_titles(),
+            ['Master commit', 'Initial commit']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from ..classifier import CommitClassifier
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = ('TestCommitClassifier',)
+
+MERGE = 'a b'
+
+
+def make_record(title: str, merge: str = 'a') -> dict:
+    return {'title': title, 'merge': merge}
+
+
+class TestCommitClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.classifier = CommitClassifier()
+
+    def test_classify(self):
+        """Test classification of merges and regular commits."""
+        records = [
+            make_record(
+                'Merged in feature/MSFT-1238-token-authentication '
+                '(pull request #2)',
+                MERGE
+            ),
+            make_record(
+                'Merge pull request #5 in PROJ/repo from '
+                'Bugfix/MSFT-1239-fix-login to master',
+                MERGE
+            ),
+            make_record(
+                'Merged in unknown/MSFT-1240-something (pull request #3)',
+                MERGE
+            ),
+            make_record('Merge branch \'master\' into develop', MERGE),
+            make_record('MSFT-1238 Implement token authentication'),
+            make_record('clean up'),
+        ]
+        classifications = [
+            _classification
+            for _record, _classification in self.classifier.classify(records)
+        ]
+        self.assertEqual(
+            classifications[0],
+            {
+                'merge': True,
+                'branch_type': 'feature',
+                'ticket_number': 'MSFT-1238',
+                'message': 'token-authentication',
+            }
+        )
+        self.assertEqual(classifications[1]['branch_type'], 'bugfix')
+        self.assertEqual(classifications[1]['ticket_number'], 'MSFT-1239')
+        self.assertEqual(classifications[2]['branch_type'], 'other')
+        self.assertIsNone(classifications[2]['ticket_number'])
+        self.assertIsNone(classifications[3])
+        self.assertEqual(
+            classifications[4],
+            {
+                'merge': False,
+                'branch_type': None,
+                'ticket_number': 'MSFT-1238',
+                'message': 'Implement token authentication',
+            }
+        )
+        self.assertIsNone(classifications[5]['ticket_number'])
+        self.assertEqual(classifications[5]['message'], 'clean up')
+
+
+if __name__ == '__main__':
+    unittest.main()
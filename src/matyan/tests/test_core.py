@@ -7,6 +7,7 @@ from ..utils import (
     generate_changelog,
     get_branch_type,
     get_logs,
+    iter_log_entries,
     json_changelog,
     prepare_changelog,
     prepare_releases_changelog,
@@ -210,6 +211,80 @@ class TestCore(unittest.TestCase, ChangelogMixin):
     #     )
     #     return res
 
+    @log_info
+    def test_get_logs_single_pass(self):
+        """Test single-pass logs."""
+        logs = get_logs(path=self.test_dir)
+        single_pass_logs = get_logs(path=self.test_dir, single_pass=True)
+        for key in ('LOG', 'LOG_MERGES'):
+            commit_hashes = [
+                _entry['commit_hash']
+                for _entry in iter_log_entries(logs[key])
+            ]
+            # Records keep commits with quotes in their titles as well
+            self.assertEqual(
+                [
+                    _entry['commit_hash']
+                    for _entry in single_pass_logs[key]
+                    if _entry['commit_hash'] in commit_hashes
+                ],
+                commit_hashes
+            )
+        self.assertEqual(single_pass_logs['DATE_TAGS'], logs['DATE_TAGS'])
+        commit_releases = single_pass_logs['COMMIT_RELEASES']
+        for entry in iter_log_entries(logs['LOG']):
+            self.assertEqual(
+                commit_releases.get(entry['commit_hash']),
+                logs['COMMIT_TAGS'].get(entry['commit_abbr'])
+            )
+        return single_pass_logs
+
+    @log_info
+    def test_get_logs_stream(self):
+        """Test streamed logs."""
+        logs = get_logs(path=self.test_dir)
+        streamed_logs = get_logs(path=self.test_dir, stream=True)
+        self.assertEqual(list(streamed_logs['LOG_MERGES']), logs['LOG_MERGES'])
+        self.assertEqual(list(streamed_logs['LOG']), logs['LOG'])
+        self.assertEqual(streamed_logs['COMMIT_TAGS'], logs['COMMIT_TAGS'])
+        return streamed_logs
+
+    @log_info
+    def test_get_repository_session(self):
+        """Test session backend is reused and resolves like plain git."""
+        repository = get_repository(self.test_dir, backend='git')
+        session = get_repository(self.test_dir, backend='session')
+        self.assertIs(
+            get_repository(self.test_dir, backend='session'),
+            session
+        )
+        for revision in ('HEAD', 'HEAD~1', 'non-existing-revision'):
+            self.assertEqual(
+                session.resolve(revision),
+                repository.resolve(revision)
+            )
+        commit_hash = repository.resolve('HEAD')
+        self.assertEqual(
+            session.read_commit(commit_hash),
+            repository.read_commit(commit_hash)
+        )
+        return session
+
+    @log_info
+    def test_get_logs_tag_index(self):
+        """Test logs with the tag index."""
+        logs = get_logs(path=self.test_dir)
+        tag_index_logs = get_logs(path=self.test_dir, tag_index=True)
+        self.assertEqual(tag_index_logs['LOG'], logs['LOG'])
+        self.assertEqual(tag_index_logs['DATE_TAGS'], logs['DATE_TAGS'])
+        commit_releases = tag_index_logs['COMMIT_RELEASES']
+        for entry in iter_log_entries(tag_index_logs['LOG']):
+            self.assertEqual(
+                commit_releases.get(entry['commit_hash']),
+                logs['COMMIT_TAGS'].get(entry['commit_abbr'])
+            )
+        return tag_index_logs
+
     @log_info
     def test_make_config_file(self):
         """Test make config file."""
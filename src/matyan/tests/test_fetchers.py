@@ -0,0 +1,698 @@
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from ..config import CONFIG
+from ..fetchers import (
+    BaseFetcher,
+    CachedFetcher,
+    CircuitBreaker,
+    CircuitOpenError,
+    FetchError,
+    IssueCache,
+    MemoizedFetcher,
+    Resilience,
+    RetryableFetchError,
+    TokenBucket,
+    get_retry_after,
+)
+
+try:
+    from ..fetchers.jira import JiraFetcher
+except ImportError:
+    JiraFetcher = None
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'TestCachedFetcher',
+    'TestFetchMany',
+    'TestJiraFetcher',
+    'TestMemoizedFetcher',
+    'TestResilience',
+)
+
+
+class SlowFetcher(BaseFetcher):
+    """Fetcher of made up issues, taking a while for each of them."""
+
+    uid: str = 'TestSlowFetcher'
+    workers: int = 4
+
+    def get_instance(self):
+        self.lock = threading.Lock()
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    def fetch_issue_data(self, issue_id: str):
+        with self.lock:
+            self.calls.append(issue_id)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+        return {'title': f"Title of {issue_id}"}
+
+
+class TestFetchMany(unittest.TestCase):
+
+    def tearDown(self):
+        CONFIG.remove_section(SlowFetcher.uid)
+
+    def test_fetch_many(self):
+        """Test concurrent fetching of distinct issues."""
+        fetcher = SlowFetcher()
+        issue_ids = [f"MSFT-{_i}" for _i in range(12)] + ['MSFT-1']
+        fetched = fetcher.fetch_many(issue_ids)
+        self.assertEqual(list(fetched), issue_ids[:12])
+        self.assertEqual(fetched['MSFT-3'], {'title': 'Title of MSFT-3'})
+        self.assertCountEqual(fetcher.calls, issue_ids[:12])
+        self.assertGreater(fetcher.max_running, 1)
+        self.assertLessEqual(fetcher.max_running, 4)
+
+    def test_workers(self):
+        """Test size of the worker pool."""
+        fetcher = SlowFetcher()
+        self.assertEqual(fetcher.get_workers(), 4)
+        CONFIG.read_dict({SlowFetcher.uid: {'workers': '1'}})
+        self.assertEqual(fetcher.get_workers(), 1)
+        fetched = fetcher.fetch_many(['MSFT-1', 'MSFT-2', 'MSFT-3'])
+        self.assertEqual(len(fetched), 3)
+        self.assertEqual(fetcher.max_running, 1)
+        self.assertEqual(fetcher.fetch_many([]), {})
+
+
+class CountingFetcher(BaseFetcher):
+    """Fetcher of made up issues, counting the lookups.
+
+    Issues starting with ``MISSING`` do not exist, issues starting with
+    ``ERROR`` can not be fetched.
+    """
+
+    uid: str = 'TestCountingFetcher'
+
+    def get_instance(self):
+        self.calls = []
+
+    def fetch_batch(self, issue_ids):
+        self.calls.extend(issue_ids)
+        return {
+            _issue_id: (
+                None if _issue_id.startswith('MISSING')
+                else {'title': f"Title of {_issue_id}"}
+            )
+            for _issue_id in issue_ids
+            if not _issue_id.startswith('ERROR')
+        }
+
+
+class TestCachedFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'matyan', 'issues.sqlite3')
+        self.issue_ids = ['MSFT-1', 'MSFT-2', 'MISSING-1', 'ERROR-1']
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def get_fetcher(self, **kwargs):
+        return CachedFetcher(
+            CountingFetcher(),
+            IssueCache(self.filename),
+            **kwargs
+        )
+
+    def test_fetch_many(self):
+        """Test issues read through the cache."""
+        fetcher = self.get_fetcher()
+        fetched = fetcher.fetch_many(self.issue_ids)
+        self.assertEqual(
+            fetched,
+            {
+                'MSFT-1': {'title': 'Title of MSFT-1'},
+                'MSFT-2': {'title': 'Title of MSFT-2'},
+                'MISSING-1': {},
+                'ERROR-1': {},
+            }
+        )
+        self.assertEqual(fetcher.fetcher.calls, self.issue_ids)
+
+        # Issues not found are cached too, errors are not
+        fetcher = self.get_fetcher()
+        self.assertEqual(fetcher.fetch_many(self.issue_ids), fetched)
+        self.assertEqual(fetcher.fetcher.calls, ['ERROR-1'])
+        self.assertEqual(
+            fetcher.fetch_issue_data('MSFT-2'),
+            {'title': 'Title of MSFT-2'}
+        )
+        self.assertEqual(fetcher.fetcher.calls, ['ERROR-1'])
+
+    def test_ttl(self):
+        """Test lifetime of the cached entries."""
+        self.get_fetcher().fetch_many(self.issue_ids)
+        fetcher = self.get_fetcher(negative_ttl=0)
+        fetcher.fetch_many(self.issue_ids)
+        self.assertEqual(fetcher.fetcher.calls, ['MISSING-1', 'ERROR-1'])
+        fetcher = self.get_fetcher(ttl=0)
+        fetcher.fetch_many(self.issue_ids)
+        self.assertEqual(
+            fetcher.fetcher.calls,
+            ['MSFT-1', 'MSFT-2', 'ERROR-1']
+        )
+
+    def test_refresh(self):
+        """Test refreshing of the cached entries."""
+        self.get_fetcher().fetch_many(self.issue_ids)
+        cache = IssueCache(self.filename)
+        cache.set_many(CountingFetcher.uid, {'MSFT-1': {'title': 'Old'}})
+        fetcher = CachedFetcher(CountingFetcher(), cache, refresh=True)
+        self.assertEqual(
+            fetcher.fetch_issue_data('MSFT-1'),
+            {'title': 'Title of MSFT-1'}
+        )
+        self.assertEqual(
+            cache.get_many(CountingFetcher.uid, ['MSFT-1', 'MSFT-3']),
+            {'MSFT-1': {'title': 'Title of MSFT-1'}}
+        )
+        self.assertEqual(
+            cache.get_many('TestOtherFetcher', ['MSFT-1']),
+            {}
+        )
+
+    def test_threads(self):
+        """Test cache used by many threads at once."""
+        fetcher = MemoizedFetcher(self.get_fetcher())
+        errors = []
+
+        def fetch(number):
+            try:
+                fetcher.fetch_many(
+                    [f'MSFT-{number}', f'MSFT-{number + 1}', 'MISSING-1']
+                )
+            except Exception as err:
+                errors.append(err)
+
+        threads = [
+            threading.Thread(target=fetch, args=(_i,)) for _i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(errors, [])
+        cached = IssueCache(self.filename).get_many(
+            CountingFetcher.uid,
+            [f'MSFT-{_i}' for _i in range(10)] + ['MISSING-1']
+        )
+        self.assertEqual(len(cached), 10)
+        self.assertIsNone(cached['MISSING-1'])
+
+    def test_close(self):
+        """Test cache closed along with the fetcher."""
+        fetcher = MemoizedFetcher(self.get_fetcher())
+        fetcher.fetch_many(self.issue_ids)
+        fetcher.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            fetcher.fetcher.cache.get_many(CountingFetcher.uid, ['MSFT-1'])
+
+
+class GatedFetcher(CountingFetcher):
+    """Fetcher holding lookups of ``MSFT-1`` until the gate is opened."""
+
+    uid: str = 'TestGatedFetcher'
+
+    def get_instance(self):
+        super().get_instance()
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def fetch_batch(self, issue_ids):
+        if 'MSFT-1' in issue_ids:
+            self.started.set()
+            self.gate.wait(5)
+        return super().fetch_batch(issue_ids)
+
+
+class TestMemoizedFetcher(unittest.TestCase):
+
+    def test_fetch_many(self):
+        """Test each distinct issue fetched once per run."""
+        fetcher = MemoizedFetcher(CountingFetcher())
+        fetched = fetcher.fetch_many(
+            ['MSFT-1', 'MSFT-2', 'MSFT-1', 'ERROR-1', 'MSFT-1']
+        )
+        self.assertEqual(
+            fetched,
+            {
+                'MSFT-1': {'title': 'Title of MSFT-1'},
+                'MSFT-2': {'title': 'Title of MSFT-2'},
+                'ERROR-1': {},
+            }
+        )
+        self.assertEqual(
+            fetcher.fetch_issue_data('MSFT-2'),
+            {'title': 'Title of MSFT-2'}
+        )
+        fetcher.fetch_many(['ERROR-1', 'MSFT-3'])
+        self.assertEqual(
+            fetcher.fetcher.calls,
+            ['MSFT-1', 'MSFT-2', 'ERROR-1', 'MSFT-3']
+        )
+        self.assertEqual(
+            (fetcher.requested, fetcher.fetched, fetcher.saved),
+            (8, 4, 4)
+        )
+        with self.assertLogs('matyan', level='INFO') as logs:
+            fetcher.log_stats()
+        self.assertIn(
+            'Issue lookups: 8 requested, 4 fetched, 4 saved',
+            logs.output[0]
+        )
+
+    def test_coalescing(self):
+        """Test lookups of the issues being fetched by another thread."""
+        fetcher = MemoizedFetcher(GatedFetcher())
+        results = {}
+
+        def fetch(name, issue_ids):
+            results[name] = fetcher.fetch_many(issue_ids)
+
+        first = threading.Thread(
+            target=fetch,
+            args=('first', ['MSFT-1', 'MSFT-2'])
+        )
+        first.start()
+        self.assertTrue(fetcher.fetcher.started.wait(5))
+        second = threading.Thread(
+            target=fetch,
+            args=('second', ['MSFT-3', 'MSFT-1'])
+        )
+        second.start()
+        second.join(0.1)
+        # Waits for the lookup of the first thread
+        self.assertTrue(second.is_alive())
+        fetcher.fetcher.gate.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(
+            results['second'],
+            {
+                'MSFT-3': {'title': 'Title of MSFT-3'},
+                'MSFT-1': {'title': 'Title of MSFT-1'},
+            }
+        )
+        self.assertEqual(len(results['first']), 2)
+        self.assertCountEqual(
+            fetcher.fetcher.calls,
+            ['MSFT-1', 'MSFT-2', 'MSFT-3']
+        )
+        self.assertEqual(fetcher.saved, 1)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestResilience(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_retry_after(self):
+        """Test values of the ``Retry-After`` header."""
+        self.assertEqual(get_retry_after('5'), 5.0)
+        self.assertEqual(
+            get_retry_after(
+                'Sun, 09 Feb 2020 12:00:30 GMT',
+                now=datetime(2020, 2, 9, 12, 0, 0, tzinfo=timezone.utc)
+            ),
+            30.0
+        )
+        self.assertIsNone(get_retry_after('soon'))
+        self.assertIsNone(get_retry_after(None))
+
+    def test_token_bucket(self):
+        """Test rate limiting."""
+        bucket = TokenBucket(2, burst=2, clock=self.clock,
+                             sleep=self.clock.sleep)
+        for _i in range(4):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])
+        self.clock.now += 10
+        bucket.acquire()
+        self.assertEqual(len(self.clock.sleeps), 2)
+        self.assertEqual(TokenBucket(0).acquire(), 0.0)
+
+    def test_circuit_breaker(self):
+        """Test circuit opened after failures in a row."""
+        breaker = CircuitBreaker(2, reset_timeout=60, clock=self.clock)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        with self.assertLogs('matyan', level='WARNING'):
+            breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.clock.now += 60
+        # Half open, a single trial fails
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        with self.assertLogs('matyan', level='WARNING'):
+            breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.clock.now += 60
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+    def test_circuit_breaker_probe(self):
+        """Test a single trial request of the half open circuit."""
+        breaker = CircuitBreaker(1, reset_timeout=60, clock=self.clock)
+        with self.assertLogs('matyan', level='WARNING'):
+            breaker.record_failure()
+        self.clock.now += 60
+        allowed = []
+        threads = [
+            threading.Thread(target=lambda: allowed.append(breaker.allow()))
+            for _i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(allowed), [False] * 7 + [True])
+        # Trial never done, given up on
+        self.clock.now += 60
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_call(self):
+        """Test retries of the failed requests."""
+        resilience = Resilience(retries=3, backoff=1, backoff_max=3,
+                                sleep=self.clock.sleep)
+        errors = [
+            RetryableFetchError('503'),
+            RetryableFetchError('429', retry_after=7),
+            RetryableFetchError('503'),
+        ]
+
+        def request():
+            if errors:
+                raise errors.pop(0)
+            return 'response'
+
+        self.assertEqual(resilience.call(request), 'response')
+        first, second, third = self.clock.sleeps
+        self.assertTrue(0 <= first <= 1)
+        # Capped at the maximum delay
+        self.assertEqual(second, 3)
+        self.assertEqual(resilience.get_delay(0, retry_after=2), 2)
+        self.assertTrue(0 <= third <= 3)
+
+        # Retries exhausted
+        errors = [RetryableFetchError('503')] * 2
+        resilience = Resilience(retries=1, sleep=self.clock.sleep)
+        with self.assertRaises(RetryableFetchError):
+            resilience.call(request)
+
+        # Not retried
+        calls = []
+
+        def forbidden():
+            calls.append(1)
+            raise FetchError('403')
+
+        resilience = Resilience(circuit_threshold=2, sleep=self.clock.sleep)
+        for _i in range(2):
+            with self.assertRaises(FetchError):
+                resilience.call(forbidden)
+        self.assertEqual(len(calls), 2)
+        with self.assertRaises(CircuitOpenError):
+            resilience.call(forbidden)
+        self.assertEqual(len(calls), 2)
+
+    def test_from_config(self):
+        """Test options of the fetcher section."""
+        CONFIG.read_dict({
+            'TestResilience': {
+                'timeout': '2.5',
+                'retries': '5',
+                'rateLimit': '10',
+                'circuitThreshold': '3',
+            }
+        })
+        try:
+            resilience = Resilience.from_config('TestResilience')
+        finally:
+            CONFIG.remove_section('TestResilience')
+        self.assertEqual(resilience.timeout, 2.5)
+        self.assertEqual(resilience.retries, 5)
+        self.assertEqual(resilience.bucket.rate, 10)
+        self.assertEqual(resilience.breaker.threshold, 3)
+        self.assertEqual(resilience.backoff, 0.5)
+        self.assertEqual(Resilience.from_config('Missing').retries, 3)
+
+
+class FakeJiraHandler(BaseHTTPRequestHandler):
+    """Search and issue endpoints of Jira.
+
+    Keys are matched case-insensitively. Moved issues are found by the
+    issue endpoint only (under their new keys).
+    """
+
+    def send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_issue(self, key: str, fields: list) -> dict:
+        return {
+            'key': key,
+            'fields': {
+                _field: self.server.issues[key][_field]
+                for _field in fields
+            },
+        }
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {
+            _key: _value[0] for _key, _value in parse_qs(url.query).items()
+        }
+        self.server.requests.append((url.path, params))
+        if self.server.failures:
+            status, headers = self.server.failures.pop(0)
+            body = b'{"errorMessages": ["Failed"]}'
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        fields = params['fields'].split(',')
+        if url.path.startswith('/rest/api/2/issue/'):
+            key = url.path.rsplit('/', 1)[1].upper()
+            key = self.server.moved.get(key, key)
+            if key in self.server.issues:
+                self.send_json(200, self.get_issue(key, fields))
+            else:
+                self.send_json(404, {'errorMessages': ['Does not exist']})
+            return
+
+        keys = re.match(r'key in \((.*)\)$', params['jql']).group(1)
+        found = [
+            _key.upper() for _key in keys.split(', ')
+            if _key.upper() in self.server.issues
+        ]
+        start = int(params.get('startAt', 0))
+        limit = min(int(params['maxResults']), self.server.max_results)
+        self.send_json(200, {
+            'startAt': start,
+            'maxResults': limit,
+            'total': len(found),
+            'issues': [
+                self.get_issue(_key, fields)
+                for _key in found[start:start + limit]
+            ],
+        })
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(JiraFetcher is None, "atlassian-python-api not installed")
+class TestJiraFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeJiraHandler)
+        self.server.requests = []
+        self.server.failures = []
+        self.server.max_results = 50
+        self.server.moved = {}
+        self.server.issues = {
+            f"MSFT-{_i}": {
+                'summary': f"Summary {_i}",
+                'description': f"Description {_i}",
+                'comment': 'Not requested',
+            }
+            for _i in range(250)
+        }
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.config = dict(CONFIG['Jira']) if 'Jira' in CONFIG else None
+        CONFIG.remove_section('Jira')
+        CONFIG.read_dict({
+            'Jira': {
+                'url': 'http://127.0.0.1:{}'.format(
+                    self.server.server_address[1]
+                ),
+                'username': 'user',
+                'token': 'token',
+                'workers': '1',
+            }
+        })
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        CONFIG.remove_section('Jira')
+        if self.config is not None:
+            CONFIG.read_dict({'Jira': self.config})
+
+    def test_fetch_many(self):
+        """Test batched lookups of issues."""
+        fetcher = JiraFetcher()
+        issue_ids = [f"MSFT-{_i}" for _i in range(260)]
+        with self.assertLogs('matyan', level='WARNING') as logs:
+            fetched = fetcher.fetch_many(issue_ids)
+
+        self.assertEqual(list(fetched), issue_ids)
+        self.assertEqual(
+            fetched['MSFT-120'],
+            {'title': 'Summary 120', 'description': 'Description 120'}
+        )
+        self.assertEqual(fetched['MSFT-255'], {})
+        self.assertIn(
+            'Issues not found: ' + ', '.join(issue_ids[250:]),
+            logs.output[0]
+        )
+        # Batches of 100, pages of 50 (as limited by the server), then
+        # issues not found are looked up one by one
+        self.assertEqual(
+            [
+                _params.get('startAt', _path)
+                for _path, _params in self.server.requests
+            ],
+            ['0', '50', '0', '50', '0'] + [
+                f'/rest/api/2/issue/{_issue_id}'
+                for _issue_id in issue_ids[250:]
+            ]
+        )
+        for path, params in self.server.requests:
+            self.assertEqual(params['fields'], 'summary,description')
+
+        self.assertEqual(
+            fetcher.fetch_issue_data('MSFT-7'),
+            {'title': 'Summary 7', 'description': 'Description 7'}
+        )
+        with self.assertLogs('matyan', level='WARNING'):
+            self.assertEqual(
+                fetcher.fetch_batch(['MSFT-1', 'MSFT-300']),
+                {
+                    'MSFT-1': {
+                        'title': 'Summary 1',
+                        'description': 'Description 1',
+                    },
+                    'MSFT-300': None,
+                }
+            )
+
+    def test_keys(self):
+        """Test lowercase keys and keys of moved issues."""
+        fetcher = JiraFetcher()
+        self.server.moved = {'OLD-1': 'MSFT-1'}
+        self.assertEqual(
+            fetcher.fetch_batch(['msft-2', 'OLD-1']),
+            {
+                'msft-2': {
+                    'title': 'Summary 2',
+                    'description': 'Description 2',
+                },
+                'OLD-1': {
+                    'title': 'Summary 1',
+                    'description': 'Description 1',
+                },
+            }
+        )
+        # Found by the search and the issue endpoint respectively
+        self.assertEqual(
+            [_path for _path, _params in self.server.requests],
+            ['/rest/api/2/search', '/rest/api/2/issue/OLD-1']
+        )
+
+    def test_failures(self):
+        """Test failed requests retried or given up."""
+        fetcher = JiraFetcher()
+        sleeps = []
+        fetcher.resilience.sleep = sleeps.append
+        self.server.failures = [(429, {'Retry-After': '0'}), (503, {})]
+        self.assertEqual(
+            fetcher.fetch_issue_data('MSFT-1'),
+            {'title': 'Summary 1', 'description': 'Description 1'}
+        )
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(sleeps[0], 0)
+
+        self.server.requests = []
+        self.server.failures = [(401, {})] * 10
+        with self.assertLogs('matyan', level='ERROR'):
+            self.assertEqual(fetcher.fetch_many(['MSFT-1', 'MSFT-2']), {
+                'MSFT-1': {},
+                'MSFT-2': {},
+            })
+        self.assertEqual(len(self.server.requests), 1)
+
+        # Circuit opens after 5 failures in a row, the last request is not
+        # made at all
+        for _i in range(5):
+            with self.assertLogs('matyan', level='ERROR'):
+                fetcher.fetch_issue_data('MSFT-1')
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertFalse(fetcher.should_continue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import re
+import unittest
+
+from ..ignore import IgnoreRuleSet, RULE_EXACT, RULE_PREFIX, RULE_REGEX
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = ('TestIgnoreRuleSet',)
+
+
+class TestIgnoreRuleSet(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = IgnoreRuleSet(
+            exact_words=['wip', 'clean up'],
+            prefixes=['more on', 'continue on', 'more on docs'],
+            regex_patterns=[
+                r'^[Pp]repare\s\d+\.\d+(\.\d)*',
+                r'(?P<word>Bump) version',
+                r'x*',
+                r'Revert',
+            ]
+        )
+
+    def test_match(self):
+        """Test matching of messages against the rules."""
+        self.assertEqual(self.rules.match('WIP'), (RULE_EXACT, 'wip'))
+        self.assertEqual(
+            self.rules.match('More on docs.'),
+            (RULE_PREFIX, 'more on')
+        )
+        self.assertEqual(
+            self.rules.match('Continue on'),
+            (RULE_PREFIX, 'continue on')
+        )
+        self.assertEqual(
+            self.rules.match('prepare 0.4.7'),
+            (RULE_REGEX, r'^[Pp]repare\s\d+\.\d+(\.\d)*')
+        )
+        self.assertEqual(
+            self.rules.match('Bump version to 0.5'),
+            (RULE_REGEX, r'(?P<word>Bump) version')
+        )
+        # Empty match of `x*` does not shadow the following pattern
+        self.assertEqual(
+            self.rules.match('Revert something'),
+            (RULE_REGEX, 'Revert')
+        )
+        self.assertIsNone(self.rules.match('WIP on login'))
+        self.assertIsNone(self.rules.match('More'))
+        self.assertIsNone(self.rules.match('Prepare release'))
+        # Regex patterns are case sensitive
+        self.assertIsNone(self.rules.match('bump version'))
+
+        self.assertEqual(self.rules.hits[(RULE_EXACT, 'wip')], 1)
+        self.assertEqual(self.rules.hits[(RULE_PREFIX, 'more on')], 1)
+        self.assertEqual(sum(self.rules.hits.values()), 6)
+
+    def test_not_combinable(self):
+        """Test patterns, which can't be combined into one."""
+        rules = IgnoreRuleSet(
+            regex_patterns=[r'(?P<word>Fix) (?P=word)', r'(?i)merge']
+        )
+        self.assertIsNone(rules.regex)
+        self.assertTrue(rules.is_ignored('Fix Fix'))
+        self.assertTrue(rules.is_ignored('MERGE branch'))
+        self.assertFalse(rules.is_ignored('Fix tests'))
+
+    def test_same_as_baseline(self):
+        """Test the rules against the plain checks on many messages."""
+        exact_words = ['word{}'.format(_i) for _i in range(100)]
+        prefixes = ['prefix{} '.format(_i) for _i in range(100)]
+        patterns = [r'Release{}\.\d'.format(_i) for _i in range(100)]
+        rules = IgnoreRuleSet(exact_words, prefixes, patterns)
+        messages = [
+            _template.format(_i)
+            for _i in range(150)
+            for _template in (
+                'Word{}', 'Prefix{} and more', 'Prefix{}', 'Release{}.1',
+                'release{}.1', 'Something {}',
+            )
+        ]
+        for message in messages:
+            expected = (
+                message.lower() in exact_words
+                or message.lower().startswith(tuple(prefixes))
+                or any(
+                    re.match(_pattern, message)
+                    for _pattern in patterns
+                )
+            )
+            self.assertEqual(rules.is_ignored(message), expected, message)
+
+
+if __name__ == '__main__':
+    unittest.main()
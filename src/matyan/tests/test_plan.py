@@ -0,0 +1,487 @@
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from git import Git
+
+from ..config import CONFIG
+from ..labels import UNRELEASED
+from ..plan import LogPlan
+from ..utils import (
+    generate_changelog,
+    get_commit_release,
+    get_logs,
+    get_max_releases_range,
+    iter_log_entries,
+    json_changelog,
+    limit_releases,
+    positive_int,
+)
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = ('TestLogPlan',)
+
+MODES = (
+    {},
+    {'single_pass': True},
+    {'stream': True},
+    {'records': True},
+    {'records': True, 'stream': True},
+    {'cache': True},
+    {'release_index': True},
+    {'tag_index': True},
+)
+
+# Settings of the modes (and combinations of them)
+SETTINGS = (
+    {},
+    {'singlePassLog': 'true'},
+    {'singlePassLog': 'true', 'tagIndex': 'true'},
+    {'singlePassLog': 'true', 'releaseIndex': 'true'},
+    {'streamLog': 'true'},
+    {'recordLog': 'true'},
+    {'recordLog': 'true', 'streamLog': 'true'},
+    {'recordLog': 'true', 'tagIndex': 'true'},
+    {'commitCache': 'true'},
+    {'commitCache': 'true', 'releaseIndex': 'true'},
+    {'releaseIndex': 'true'},
+    {'tagIndex': 'true'},
+)
+
+
+class TestLogPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        # Commits (and tags) are a minute apart, starting at 2020-01-01
+        self.timestamp = 1577836800
+        self.git('init', '-q')
+        self.git('symbolic-ref', 'HEAD', 'refs/heads/master')
+        self.commit('Initial commit')
+        self.merge('feature/MSFT-1-login', 'MSFT-1 Add login')
+        self.git('tag', '0.1')
+        self.merge('bugfix/MSFT-2-logout', 'MSFT-2 Fix logout')
+        self.commit('Orphan commit')
+
+    def git(self, *args, env: dict = None):
+        self.timestamp += 60
+        date = f'@{self.timestamp} +0000'
+        git_env = dict(
+            os.environ,
+            GIT_AUTHOR_DATE=date,
+            GIT_COMMITTER_DATE=date
+        )
+        git_env.update(env or {})
+        subprocess.run(
+            ['git', '-c', 'user.name=Dev', '-c', 'user.email=d@x', *args],
+            cwd=self.path,
+            check=True,
+            capture_output=True,
+            env=git_env
+        )
+
+    def commit(self, message: str, *args, env: dict = None):
+        self.git('commit', '-q', '--allow-empty', '-m', message, *args,
+                 env=env)
+
+    def add_file(self, name: str):
+        os.makedirs(
+            os.path.join(self.path, os.path.dirname(name)),
+            exist_ok=True
+        )
+        with open(os.path.join(self.path, name), 'w') as _file:
+            _file.write(name)
+        self.git('add', name)
+
+    def merge(self, branch: str, message: str):
+        self.git('checkout', '-q', '-b', branch, 'master')
+        self.commit(message)
+        self.git('checkout', '-q', 'master')
+        self.git('merge', '-q', '--no-ff', '-m', f'Merged in {branch}', branch)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def get_titles(self, log):
+        return [_entry['title'] for _entry in iter_log_entries(log)]
+
+    def test_for_changelog(self):
+        """Test plans of the changelog options."""
+        plan = LogPlan.for_changelog()
+        self.assertTrue(plan.commits)
+        self.assertTrue(plan.released)
+        plan = LogPlan.for_changelog(headings_only=True, unreleased_only=True)
+        self.assertFalse(plan.commits)
+        self.assertFalse(plan.released)
+        self.assertEqual(plan.get_filter_args(), [])
+        plan = LogPlan.for_changelog(
+            since='2020-01-01',
+            author='Dev',
+            paths=['api', 'docs']
+        )
+        self.assertEqual(
+            plan.get_filter_args(),
+            [
+                '--since=2020-01-01',
+                '--author=Dev',
+                '--full-history',
+                '--',
+                'api',
+                'docs',
+            ]
+        )
+        # Merges are filtered by the paths only
+        self.assertEqual(
+            plan.get_filter_args(merges=True),
+            ['--first-parent', '--', 'api', 'docs']
+        )
+
+    def test_headings_only(self):
+        """Test merges only logs."""
+        for mode in MODES:
+            logs = get_logs(
+                path=self.path,
+                plan=LogPlan(commits=False),
+                **mode
+            )
+            self.assertEqual(self.get_titles(logs['LOG']), [], mode)
+            merges = list(iter_log_entries(logs['LOG_MERGES']))
+            self.assertEqual(
+                [_entry['title'] for _entry in merges],
+                [
+                    'Merged in bugfix/MSFT-2-logout',
+                    'Merged in feature/MSFT-1-login',
+                ],
+                mode
+            )
+            self.assertEqual(
+                [get_commit_release(logs, _entry) for _entry in merges],
+                [None, '0.1'],
+                mode
+            )
+
+    def test_unreleased_only(self):
+        """Test logs of the commits not contained in any tag."""
+        for mode in MODES:
+            logs = get_logs(
+                path=self.path,
+                plan=LogPlan(released=False),
+                **mode
+            )
+            self.assertEqual(
+                self.get_titles(logs['LOG']),
+                [
+                    'Orphan commit',
+                    'Merged in bugfix/MSFT-2-logout',
+                    'MSFT-2 Fix logout',
+                ],
+                mode
+            )
+            self.assertEqual(
+                self.get_titles(logs['LOG_MERGES']),
+                ['Merged in bugfix/MSFT-2-logout'],
+                mode
+            )
+            for entry in iter_log_entries(logs['LOG']):
+                self.assertIsNone(get_commit_release(logs, entry), mode)
+
+    def test_filters(self):
+        """Test logs filtered by git."""
+        self.git('checkout', '-q', '-b', 'feature/MSFT-3-api', 'master')
+        self.add_file('api/views.py')
+        self.commit('MSFT-3 Add api')
+        self.git('checkout', '-q', 'master')
+        self.add_file('web/index.html')
+        self.commit('Add index', '--author=Other <o@x>')
+        self.git('merge', '-q', '--no-ff', '-m',
+                 'Merged in feature/MSFT-3-api', 'feature/MSFT-3-api')
+        self.commit('Old commit', env={
+            'GIT_AUTHOR_DATE': '2001-01-01T00:00:00',
+            'GIT_COMMITTER_DATE': '2001-01-01T00:00:00',
+        })
+        all_merges = [
+            'Merged in feature/MSFT-3-api',
+            'Merged in bugfix/MSFT-2-logout',
+            'Merged in feature/MSFT-1-login',
+        ]
+        for plan, titles, merges in (
+            (
+                LogPlan(paths=['api']),
+                ['Merged in feature/MSFT-3-api', 'MSFT-3 Add api'],
+                ['Merged in feature/MSFT-3-api'],
+            ),
+            (
+                # Merge of the branch is walked along the commits, but no
+                # heading is made of it
+                LogPlan(paths=['web']),
+                ['Merged in feature/MSFT-3-api', 'Add index'],
+                [],
+            ),
+            (
+                LogPlan(author='Other'),
+                ['Add index'],
+                all_merges,
+            ),
+            (
+                LogPlan(until='2010-01-01'),
+                ['Old commit'],
+                all_merges,
+            ),
+        ):
+            for mode in MODES:
+                logs = get_logs(path=self.path, plan=plan, **mode)
+                self.assertEqual(
+                    self.get_titles(logs['LOG']),
+                    titles,
+                    (plan, mode)
+                )
+                self.assertEqual(
+                    self.get_titles(logs['LOG_MERGES']),
+                    merges,
+                    (plan, mode)
+                )
+
+        # Releases are read unfiltered
+        self.git('tag', '0.2')
+        for mode in MODES:
+            logs = get_logs(
+                path=self.path,
+                plan=LogPlan(paths=['api']),
+                **mode
+            )
+            self.assertEqual(
+                [
+                    get_commit_release(logs, _entry)
+                    for _entry in iter_log_entries(logs['LOG'])
+                ],
+                ['0.2', '0.2'],
+                mode
+            )
+        changelog = json_changelog(
+            show_releases=True,
+            paths=['api'],
+            path=self.path
+        )
+        self.assertEqual(
+            list(changelog['0.2']['branches']['feature']),
+            ['MSFT-3']
+        )
+        self.assertNotIn('branches', changelog['0.1'])
+
+    def test_merge_author(self):
+        """Test headings of branches merged by someone else."""
+        self.git('checkout', '-q', '-b', 'feature/MSFT-3-api', 'master')
+        self.commit('MSFT-3 Add api', '--author=Other <o@x>')
+        self.git('checkout', '-q', 'master')
+        self.git('merge', '-q', '--no-ff', '-m',
+                 'Merged in feature/MSFT-3-api', 'feature/MSFT-3-api')
+        for mode in MODES:
+            logs = get_logs(
+                path=self.path,
+                plan=LogPlan(author='Other'),
+                **mode
+            )
+            self.assertEqual(
+                self.get_titles(logs['LOG']),
+                ['MSFT-3 Add api'],
+                mode
+            )
+            self.assertIn(
+                'Merged in feature/MSFT-3-api',
+                self.get_titles(logs['LOG_MERGES']),
+                mode
+            )
+        changelog = json_changelog(author='Other', path=self.path)
+        self.assertIn('MSFT-3', changelog['feature'])
+
+    def test_range_tags(self):
+        """Test releases of the range read from the tag index."""
+        self.git('tag', '0.2')
+        self.commit('MSFT-3 Unreleased commit')
+        for mode in MODES:
+            logs = get_logs(
+                between='0.1..HEAD',
+                path=self.path,
+                plan=LogPlan(range_tags=True),
+                **mode
+            )
+            self.assertEqual(
+                [
+                    get_commit_release(logs, _entry)
+                    for _entry in iter_log_entries(logs['LOG'])
+                ],
+                [None, '0.2', '0.2', '0.2'],
+                mode
+            )
+
+    def test_logged_releases(self):
+        """Test releases propagated along the log, whatever the titles."""
+        self.commit('MSFT-3 Fix "quoted" title')
+        self.commit('MSFT-4 Released commit')
+        self.git('tag', '0.2')
+        logs = get_logs(path=self.path, tag_index=True)
+        releases = logs['COMMIT_RELEASES']
+        self.assertEqual(len(releases), len(logs['LOG']))
+        self.assertEqual(set(releases.values()), {'0.1', '0.2'})
+        self.assertEqual(
+            [
+                get_commit_release(logs, _entry)
+                for _entry in iter_log_entries(logs['LOG'])
+            ][:2],
+            ['0.2', '0.2']
+        )
+
+    def test_single_pass(self):
+        """Test logs and releases of commits read in a single walk."""
+        self.commit('MSFT-3 Fix "quoted" title')
+        self.git('tag', '0.2')
+        self.commit('MSFT-4 Unreleased commit')
+        logs = get_logs(path=self.path)
+        with mock.patch.object(Git, 'execute', autospec=True,
+                               side_effect=Git.execute) as execute:
+            single_pass_logs = get_logs(
+                between='0.1..HEAD',
+                path=self.path,
+                single_pass=True
+            )
+        commands = [_call.args[1][1] for _call in execute.call_args_list]
+        self.assertEqual(commands.count('log'), 1)
+        self.assertNotIn('rev-list', commands)
+        self.assertEqual(
+            self.get_titles(single_pass_logs['LOG']),
+            ['MSFT-4 Unreleased commit', 'MSFT-3 Fix "quoted" title',
+             'Orphan commit', 'Merged in bugfix/MSFT-2-logout',
+             'MSFT-2 Fix logout']
+        )
+        self.assertEqual(
+            self.get_titles(single_pass_logs['LOG_MERGES']),
+            ['Merged in bugfix/MSFT-2-logout']
+        )
+        self.assertEqual(
+            [
+                get_commit_release(single_pass_logs, _entry)
+                for _entry in single_pass_logs['LOG']
+            ],
+            [None, '0.2', '0.2', '0.2', '0.2']
+        )
+        self.assertEqual(single_pass_logs['DATE_TAGS'], logs['DATE_TAGS'])
+
+    def test_modes(self):
+        """Test changelogs are the same whatever the mode."""
+        # Lightweight tags are dated by their commits
+        self.git('tag', '-a', '-m', 'Release 0.2', '0.2')
+        self.merge('feature/MSFT-3-profile', 'MSFT-3 Add profile')
+        self.git('tag', '0.3')
+        self.commit('MSFT-4 Unreleased commit')
+        calls = (
+            (generate_changelog, {'show_releases': True}),
+            (generate_changelog, {'show_releases': True,
+                                  'between': '0.1..0.3'}),
+            (generate_changelog, {'show_releases': True,
+                                  'between': '0.2..HEAD'}),
+            (generate_changelog, {'show_releases': True,
+                                  'headings_only': True}),
+            (generate_changelog, {'show_releases': True,
+                                  'latest_release': True}),
+            (generate_changelog, {'unreleased_only': True}),
+            (generate_changelog, {'between': '0.1..0.3'}),
+            # Tag outside of the range
+            (generate_changelog, {'show_releases': True,
+                                  'between': '0.1..0.2'}),
+            (json_changelog, {'show_releases': True}),
+            (json_changelog, {'show_releases': True,
+                              'between': '0.1..0.3'}),
+        )
+        settings = dict(CONFIG['Settings']) if 'Settings' in CONFIG else {}
+        outputs = {}
+        try:
+            for mode in SETTINGS:
+                CONFIG.remove_section('Settings')
+                CONFIG.read_dict({'Settings': dict(settings, **mode)})
+                for _i, (func, kwargs) in enumerate(calls):
+                    output = func(path=self.path, **kwargs)
+                    self.assertEqual(
+                        outputs.setdefault(_i, output),
+                        output,
+                        (mode, kwargs)
+                    )
+        finally:
+            CONFIG.remove_section('Settings')
+            CONFIG.read_dict({'Settings': settings})
+        self.assertIn('0.2', outputs[0])
+        self.assertIn('### 0.2\n*2020-01-01*', outputs[0])
+        self.assertIn('### 0.3\n*2020-01-01*', outputs[0])
+        self.assertNotIn('### 0.1', outputs[1])
+
+    def test_max_releases(self):
+        """Test changelog of the latest releases."""
+        self.assertIsNone(get_max_releases_range(1, path=self.path))
+        self.git('tag', '0.2')
+        self.merge('feature/MSFT-3-profile', 'MSFT-3 Add profile')
+        self.git('tag', '0.10')
+        self.assertEqual(
+            get_max_releases_range(1, path=self.path),
+            '0.2..HEAD'
+        )
+        self.assertIsNone(get_max_releases_range(3, path=self.path))
+        for max_releases, releases in (
+            (1, ['0.10']),
+            (2, ['0.10', '0.2']),
+        ):
+            changelog = json_changelog(
+                show_releases=True,
+                max_releases=max_releases,
+                path=self.path
+            )
+            self.assertEqual(list(changelog), releases)
+        # Whole history (commits of the same date, order is not defined)
+        changelog = json_changelog(
+            show_releases=True,
+            max_releases=5,
+            path=self.path
+        )
+        self.assertCountEqual(changelog, ['0.10', '0.2', '0.1'])
+        self.commit('Unreleased commit')
+        changelog = json_changelog(
+            show_releases=True,
+            max_releases=1,
+            path=self.path
+        )
+        self.assertEqual(list(changelog), [UNRELEASED, '0.10'])
+
+
+    def test_max_releases_invalid(self):
+        """Test numbers of releases which are not positive."""
+        self.assertEqual(positive_int('2'), 2)
+        for value in ('0', '-1', 'two'):
+            with self.assertRaises(argparse.ArgumentTypeError, msg=value):
+                positive_int(value)
+        parser = argparse.ArgumentParser()
+        parser.add_argument('--max-releases', type=positive_int)
+        for value in ('0', '-1'):
+            with self.assertRaises(SystemExit), \
+                    contextlib.redirect_stderr(io.StringIO()):
+                parser.parse_args(['--max-releases', value])
+        for max_releases in (0, -1):
+            with self.assertRaises(ValueError, msg=max_releases):
+                get_max_releases_range(max_releases, path=self.path)
+            with self.assertRaises(ValueError, msg=max_releases):
+                limit_releases({}, max_releases)
+            with self.assertRaises(ValueError, msg=max_releases):
+                json_changelog(
+                    show_releases=True,
+                    max_releases=max_releases,
+                    path=self.path
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from ..records import iter_records, parse_record
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = ('TestRecords',)
+
+LOG = (
+    b'c42ff7ed2e5b1a3c42ead2b81735397cefc554b8\x00c42ff7e\x00'
+    b'2019-11-17 20:50:49 +0000\x00Artur Barseghyan\x00'
+    b'2d799b037160961d7ebc6e552dfd63c60b155553 '
+    b'7fbd3035ef40d0f311469ec88088266bc7d13f5c\x00tag: 0.2\x00'
+    b'Merged in feature/MSFT-1238-token-authentication (pull request #2)'
+    b'\x1e\n'
+    b'7fbd3035ef40d0f311469ec88088266bc7d13f5c\x007fbd303\x00'
+    b'2019-11-17 21:49:49 +0100\x00\xc3\x81rtur Barseghyan\x00'
+    b'2d799b037160961d7ebc6e552dfd63c60b155553\x00\x00'
+    b'MSFT-1238 Implement "token" authentication, {with: braces}'
+    b'\x1e'
+)
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_parse_record(self):
+        """Test `parse_record`."""
+        entry = parse_record(LOG.split(b'\x1e')[0])
+        self.assertEqual(
+            entry,
+            {
+                'commit_hash': 'c42ff7ed2e5b1a3c42ead2b81735397cefc554b8',
+                'commit_abbr': 'c42ff7e',
+                'datetime': '2019-11-17 20:50:49 +0000',
+                'title': 'Merged in feature/MSFT-1238-token-authentication '
+                         '(pull request #2)',
+                'author': 'Artur Barseghyan',
+                'merge': '2d799b037160961d7ebc6e552dfd63c60b155553 '
+                         '7fbd3035ef40d0f311469ec88088266bc7d13f5c',
+                'refs': 'tag: 0.2',
+            }
+        )
+
+    def test_iter_records(self):
+        """Test `iter_records` does not lose commits."""
+        entries = list(iter_records([LOG]))
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(
+            entries[1]['title'],
+            'MSFT-1238 Implement "token" authentication, {with: braces}'
+        )
+        self.assertEqual(entries[1]['author'], 'Ártur Barseghyan')
+        self.assertEqual(
+            entries[1]['commit_hash'],
+            '7fbd3035ef40d0f311469ec88088266bc7d13f5c'
+        )
+
+    def test_iter_records_chunks(self):
+        """Test `iter_records` with chunks not aligned to records."""
+        for size in (1, 3, 7, 64, len(LOG)):
+            chunks = [LOG[_pos:_pos + size]
+                      for _pos in range(0, len(LOG), size)]
+            with self.subTest(f'Chunk size {size}'):
+                self.assertEqual(
+                    list(iter_records(chunks)),
+                    list(iter_records([LOG]))
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
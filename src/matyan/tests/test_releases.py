@@ -0,0 +1,78 @@
+import unittest
+
+from ..releases import ReleaseIndex, TagIndex
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'TestReleaseIndex',
+    'TestTagIndex',
+)
+
+
+def sha(name: str) -> str:
+    return name.encode().hex().ljust(40, '0')
+
+
+#  a - b (0.1) - d - e (0.2, 0.2-final) - g
+#   \               /
+#    c ------------
+PARENTS = {
+    sha('g'): [sha('e')],
+    sha('e'): [sha('d'), sha('c')],
+    sha('d'): [sha('b')],
+    sha('c'): [sha('a')],
+    sha('b'): [sha('a')],
+    sha('a'): [],
+}
+TAGS = [
+    ('0.1', sha('b')),
+    ('0.2', sha('e')),
+    ('0.2-final', sha('e')),
+]
+
+
+class TestReleaseIndex(unittest.TestCase):
+
+    def test_build(self):
+        """Test commits are assigned to the earliest tag containing them."""
+        index = ReleaseIndex.build(TAGS, PARENTS)
+        self.assertEqual(index.get(sha('a')), '0.1')
+        self.assertEqual(index.get(sha('b')), '0.1')
+        self.assertEqual(index.get(sha('c')), '0.2')
+        self.assertEqual(index.get(sha('d')), '0.2')
+        self.assertEqual(index.get(sha('e')), '0.2')
+        self.assertIsNone(index.get(sha('g')))
+        self.assertNotIn(sha('g'), index)
+        self.assertEqual(len(index), 5)
+
+    def test_releases(self):
+        """Test releases (tags releasing nothing are omitted)."""
+        index = ReleaseIndex.build(TAGS, PARENTS)
+        self.assertEqual(index.releases, ['0.2', '0.1'])
+
+
+class TestTagIndex(unittest.TestCase):
+
+    def test_parse(self):
+        """Test parsing of the `git for-each-ref` output."""
+        text = '\n'.join([
+            # Lightweight tag
+            '\x00'.join([sha('b'), '', '2019-11-17', '0.1']),
+            # Annotated tags, peeled to the commit
+            '\x00'.join([sha('t'), sha('e'), '2019-11-18', '0.2']),
+            '\x00'.join([sha('u'), sha('e'), '2019-11-19', '0.2-final']),
+            '',
+        ])
+        index = TagIndex.parse(text)
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.get_tags(sha('b')), ['0.1'])
+        self.assertEqual(index.get_tags(sha('e')), ['0.2', '0.2-final'])
+        self.assertEqual(index.get_tags(sha('t')), [])
+        self.assertEqual(index.dates['0.2-final'], '2019-11-19')
+        self.assertEqual(list(index.iter_tagged_commits()), TAGS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import random
+import unittest
+
+from ..store import (
+    ColumnarReleasesTreeBuilder,
+    CommitStore,
+    format_date,
+    parse_date,
+)
+from ..renderers import MarkdownRenderer
+from ..tree import (
+    LazyReleaseNode,
+    ReleasesTreeBuilder,
+    TicketRecord,
+    tree_to_dict,
+)
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = ('TestCommitStore',)
+
+
+def fill(builder, seed: int = 0):
+    """Place the same random tickets and commits with the given builder."""
+    rand = random.Random(seed)
+    releases = ['0.3', '0.2', '0.1', 'unknown', 'unreleased']
+    branch_types = ['feature', 'bugfix', 'other']
+    for number in range(20):
+        branch_type = rand.choice(branch_types)
+        builder.add_ticket(
+            rand.choice(releases),
+            TicketRecord(
+                commit_hash='{:040x}'.format(number),
+                ticket_number=f'MSFT-{number % 15}',
+                branch_type=branch_type,
+                title=f'Ticket {number}',
+                commits={},
+            )
+        )
+    for number in range(500):
+        release = rand.choice(releases)
+        ticket_number = f'MSFT-{rand.randrange(30)}'
+        if rand.random() < 0.2:
+            builder.touch_ticket(
+                release,
+                rand.choice(branch_types),
+                ticket_number
+            )
+        builder.add_commit(
+            release,
+            rand.choice(branch_types),
+            ticket_number,
+            '{:040x}'.format(1000 + number),
+            '{:040x}'.format(1000 + number)[:7 + number % 3],
+            f'Developer {number % 7}',
+            '2020-02-{:02d} 12:{:02d}:00 {}'.format(
+                1 + number % 28,
+                number % 60,
+                rand.choice(['+0100', '-0430', '+0000', '-0000'])
+            ),
+            ticket_number if number % 5 else None,
+            # Repeated titles (keys, if commit messages are unique)
+            f'Change {number % 40}.'
+        )
+    return builder.build()
+
+
+class TestCommitStore(unittest.TestCase):
+
+    def test_dates(self):
+        """Test dates stored as numbers."""
+        for value in (
+            '2020-02-09 12:00:00 +0100',
+            '1969-12-31 23:59:59 -0430',
+            '2038-01-19 03:14:08 +1345',
+        ):
+            self.assertEqual(format_date(*parse_date(value)), value)
+        self.assertIsNone(parse_date('2020-02-09 12:00:00 -0000'))
+        self.assertIsNone(parse_date('2020-02-09'))
+
+    def test_store(self):
+        """Test commits read from the store."""
+        store = CommitStore()
+        rows = [
+            store.append(
+                'a' * 40,
+                'aaaaaaa',
+                'Artur Barseghyan',
+                '2020-02-09 12:00:00 +0100',
+                'MSFT-1',
+                'Fix the “login”.'
+            ),
+            store.append(
+                'b' * 40,
+                'bbbbbbbbb',
+                'Artur Barseghyan',
+                '2020-02-09 12:00:00 -0000',
+                None,
+                ''
+            ),
+        ]
+        self.assertEqual(rows, [0, 1])
+        self.assertEqual(len(store), 2)
+        self.assertEqual(len(store.author_table), 1)
+        self.assertEqual(store.get_commit(0).to_dict(), {
+            'commit_hash': 'a' * 40,
+            'commit_abbr': 'aaaaaaa',
+            'author': 'Artur Barseghyan',
+            'date': '2020-02-09 12:00:00 +0100',
+            'ticket_number': 'MSFT-1',
+            'title': 'Fix the “login”.',
+        })
+        self.assertEqual(store.get_commit(1)['commit_abbr'], 'bbbbbbbbb')
+        self.assertEqual(store.get_date(1), '2020-02-09 12:00:00 -0000')
+        self.assertIsNone(store.get_commit(1)['ticket_number'])
+        self.assertEqual(store.get_title(1), '')
+        with self.assertRaises(ValueError):
+            store.append('c' * 64, 'c' * 7, '', '', None, '')
+
+    def test_columnar_builder(self):
+        """Test the columnar builder makes the same tree."""
+        for unique_commit_messages in (False, True):
+            for seed in range(5):
+                trees = [
+                    tree_to_dict(fill(
+                        builder_cls(
+                            ['0.3', '0.2', '0.1'],
+                            {'0.3': '2020-03-01', '0.1': '2020-01-01'},
+                            unique_commit_messages
+                        ),
+                        seed
+                    ))
+                    for builder_cls in (
+                        ReleasesTreeBuilder,
+                        ColumnarReleasesTreeBuilder,
+                    )
+                ]
+                self.assertEqual(repr(trees[0]), repr(trees[1]))
+
+    def test_lazy_tree(self):
+        """Test releases made of the store on access."""
+        for unique_commit_messages in (False, True):
+            trees = [
+                fill(
+                    ColumnarReleasesTreeBuilder(
+                        ['0.3', '0.2', '0.1'],
+                        {'0.3': '2020-03-01', '0.1': '2020-01-01'},
+                        unique_commit_messages,
+                        lazy_tree
+                    )
+                )
+                for lazy_tree in (False, True)
+            ]
+            self.assertEqual(list(trees[0]), list(trees[1]))
+            self.assertTrue(any(
+                isinstance(_node, LazyReleaseNode)
+                for _node in trees[1].values()
+            ))
+            self.assertEqual(
+                repr(tree_to_dict(trees[0])),
+                repr(tree_to_dict(trees[1]))
+            )
+            self.assertEqual(
+                MarkdownRenderer().render_releases_changelog(
+                    releases_tree=trees[1],
+                    include_other=True,
+                    headings_only=False,
+                    fetch_description=False
+                ),
+                MarkdownRenderer().render_releases_changelog(
+                    releases_tree=trees[0],
+                    include_other=True,
+                    headings_only=False,
+                    fetch_description=False
+                )
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+from collections import OrderedDict
+
+from ..tree import (
+    CommitRecord,
+    LazyReleaseNode,
+    ReleaseNode,
+    ReleasesTreeBuilder,
+    TicketRecord,
+    tree_to_dict,
+    TreeBuilder,
+)
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = ('TestTree',)
+
+
+def make_commit(ticket_number: str = 'MSFT-1') -> CommitRecord:
+    return CommitRecord(
+        'a' * 40,
+        'a' * 7,
+        'Artur Barseghyan',
+        '2020-02-09 12:00:00 +0100',
+        ticket_number,
+        'Fix login.'
+    )
+
+
+class TestTree(unittest.TestCase):
+
+    def test_records(self):
+        """Test records read as mappings."""
+        commit = make_commit()
+        self.assertEqual(commit['title'], 'Fix login.')
+        self.assertEqual(
+            list(commit.keys()),
+            [
+                'commit_hash',
+                'commit_abbr',
+                'author',
+                'date',
+                'ticket_number',
+                'title',
+            ]
+        )
+        self.assertIs(commit.author, make_commit().author)
+
+        ticket = TicketRecord(commits={'a' * 40: commit})
+        self.assertIn('commits', ticket)
+        self.assertNotIn('title', ticket)
+        self.assertIsNone(ticket.get('title'))
+        with self.assertRaises(KeyError):
+            ticket['title']
+        with self.assertRaises(KeyError):
+            ticket['unknown'] = 'value'
+        ticket['title'] = 'Title'
+        self.assertEqual(ticket['title'], 'Title')
+
+        with self.assertRaises(AttributeError):
+            commit.unknown = 'value'
+
+    def test_to_dict(self):
+        """Test dict view of the tree."""
+        ticket = TicketRecord(
+            commit_hash='b' * 40,
+            commit_abbr='b' * 7,
+            date='2020-02-09 12:00:00 +0100',
+            ticket_number='MSFT-1',
+            branch_type='feature',
+            slug='fix-login',
+            title='Fix login',
+            description=None,
+            commits={'a' * 40: make_commit()},
+            release='0.1',
+        )
+        releases_tree = OrderedDict([
+            ('0.2', ReleaseNode('2020-02-10')),
+            ('0.1', ReleaseNode('2020-02-09', {'feature': {'MSFT-1': ticket}})),
+        ])
+        converted = tree_to_dict(releases_tree)
+        self.assertIsInstance(converted, OrderedDict)
+        self.assertEqual(
+            converted['0.2'],
+            {'releases': {}, 'date': '2020-02-10'}
+        )
+        self.assertEqual(list(converted['0.1']), ['branches', 'date'])
+        ticket_dict = converted['0.1']['branches']['feature']['MSFT-1']
+        self.assertIs(type(ticket_dict), dict)
+        self.assertEqual(list(ticket_dict)[-2:], ['commits', 'release'])
+        self.assertEqual(
+            ticket_dict['commits']['a' * 40],
+            make_commit().to_dict()
+        )
+        self.assertEqual(ticket, ticket_dict)
+        self.assertEqual(
+            tree_to_dict({'other': {'other': TicketRecord(commits={})}}),
+            {'other': {'other': {'commits': {}}}}
+        )
+
+    def test_builders(self):
+        """Test flat and releases trees built from the same input."""
+        builders = [
+            TreeBuilder(unique_commit_messages=True),
+            ReleasesTreeBuilder(['0.2', '0.1'], {'0.1': '2020-02-09'}, True),
+        ]
+        for builder in builders:
+            builder.add_ticket(
+                '0.1',
+                TicketRecord(
+                    ticket_number='MSFT-1',
+                    branch_type='feature',
+                    commits={},
+                )
+            )
+            # Already there
+            builder.add_ticket(
+                '0.1',
+                TicketRecord(
+                    ticket_number='MSFT-1',
+                    branch_type='feature',
+                    title='Duplicate',
+                    commits={},
+                )
+            )
+            builder.touch_ticket('0.1', 'bugfix', 'MSFT-2')
+            for commit_hash in ('a' * 40, 'b' * 40):
+                builder.add_commit(
+                    '0.1',
+                    'feature',
+                    'MSFT-1',
+                    commit_hash,
+                    commit_hash[:7],
+                    'Artur Barseghyan',
+                    '2020-02-09 12:00:00 +0100',
+                    'MSFT-1',
+                    'Fix login.'
+                )
+
+        tree = tree_to_dict(builders[0].build())
+        releases_tree = tree_to_dict(builders[1].build())
+        self.assertEqual(list(tree), ['feature', 'bugfix'])
+        self.assertNotIn('title', tree['feature']['MSFT-1'])
+        # Commits are keyed by (unique) titles, the last one is kept
+        self.assertEqual(
+            tree['feature']['MSFT-1']['commits']['Fix login.']['commit_hash'],
+            'b' * 40
+        )
+        self.assertEqual(tree['bugfix']['MSFT-2'], {'commits': {}})
+        self.assertEqual(releases_tree['0.1']['branches'], tree)
+        self.assertEqual(releases_tree['0.1']['date'], '2020-02-09')
+        self.assertEqual(releases_tree['0.2'], {'releases': {}, 'date': None})
+
+    def test_lazy_release_node(self):
+        """Test branches of the release made on access."""
+        made = []
+
+        def make_branches():
+            made.append(1)
+            return {
+                'feature': {
+                    'MSFT-1': TicketRecord(
+                        commits={'a' * 40: make_commit()}
+                    ),
+                },
+            }
+
+        node = LazyReleaseNode('2020-02-09', make_branches)
+        self.assertEqual(made, [])
+        self.assertIn('branches', node)
+        self.assertEqual(node.keys(), ['branches', 'date'])
+        self.assertEqual(made, [])
+        self.assertEqual(
+            node.to_dict(),
+            ReleaseNode('2020-02-09', make_branches()).to_dict()
+        )
+        # Made anew on each access, never kept by the node
+        self.assertIsNot(node['branches'], node['branches'])
+        self.assertEqual(len(made), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,392 @@
+from collections import OrderedDict
+from sys import intern
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+__author__ = 'Artur Barseghyan'
+__copyright__ = '2019-2020 Artur Barseghyan'
+__license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
+__all__ = (
+    'CommitRecord',
+    'LazyReleaseNode',
+    'Record',
+    'ReleaseNode',
+    'ReleasesTreeBuilder',
+    'TicketRecord',
+    'tree_to_dict',
+    'TreeBuilder',
+)
+
+
+class Record:
+    """Compact (slotted) record of the changelog tree.
+
+    Fields are the slots of the record. Fields which were never set are
+    missing (as keys of a dict would be). Records can be read as mappings,
+    so renderers can use them the way they use dicts.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        return [_key for _key in self.__slots__ if hasattr(self, _key)]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(_key, getattr(self, _key)) for _key in self.keys()]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get dict (the way the changelog tree used to be made of) view.
+
+        :return:
+        """
+        return dict(self.items())
+
+
+class CommitRecord(Record):
+    """Commit of the changelog tree."""
+
+    __slots__ = (
+        'commit_hash',
+        'commit_abbr',
+        'author',
+        'date',
+        'ticket_number',
+        'title',
+    )
+
+    def __init__(
+        self,
+        commit_hash: str,
+        commit_abbr: str,
+        author: str,
+        date: str,
+        ticket_number: str,
+        title: str
+    ):
+        self.commit_hash = commit_hash
+        self.commit_abbr = commit_abbr
+        self.author = intern(author)
+        self.date = date
+        self.ticket_number = intern(ticket_number) \
+            if ticket_number \
+            else ticket_number
+        self.title = title
+
+
+class TicketRecord(Record):
+    """Ticket (branch) of the changelog tree.
+
+    Tickets only referred to by commits (no merge of their branch found)
+    have no fields but `commits`.
+    """
+
+    __slots__ = (
+        'commit_hash',
+        'commit_abbr',
+        'date',
+        'ticket_number',
+        'branch_type',
+        'slug',
+        'title',
+        'description',
+        'commits',
+        'release',
+    )
+
+    def __init__(self, **fields):
+        for key in ('ticket_number', 'branch_type'):
+            if fields.get(key):
+                fields[key] = intern(fields[key])
+        super().__init__(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        if 'commits' in data:
+            data['commits'] = {
+                _key: _commit.to_dict()
+                if isinstance(_commit, Record)
+                else _commit
+                for _key, _commit in data['commits'].items()
+            }
+        return data
+
+
+class ReleaseNode(Record):
+    """Release of the changelog tree.
+
+    Releases without any (not ignored) commits have no `branches`. They are
+    shown as ``{'releases': {}, 'date': ...}`` by `to_dict`, the way they
+    always were.
+    """
+
+    __slots__ = ('branches', 'date')
+
+    def __init__(
+        self,
+        date: Optional[str] = None,
+        branches: Dict[str, Dict[str, TicketRecord]] = None
+    ):
+        self.date = date
+        if branches is not None:
+            self.branches = branches
+
+    def to_dict(self) -> Dict[str, Any]:
+        if 'branches' not in self:
+            return {'releases': {}, 'date': self.date}
+        return {
+            'branches': tree_to_dict(self.branches),
+            'date': self.date,
+        }
+
+
+class LazyReleaseNode(ReleaseNode):
+    """Release of the changelog tree, branches of which are made on access.
+
+    Branch types, tickets and commits of the release are made anew on each
+    access (by `make_branches`) and are not kept by the node, so only the
+    subtree of the release being rendered is held in memory.
+    """
+
+    __slots__ = ('make_branches',)
+
+    def __init__(
+        self,
+        date: Optional[str],
+        make_branches: Callable[[], Dict[str, Dict[str, TicketRecord]]]
+    ):
+        super().__init__(date)
+        self.make_branches = make_branches
+
+    @property
+    def branches(self) -> Dict[str, Dict[str, TicketRecord]]:
+        return self.make_branches()
+
+    def __contains__(self, key: str) -> bool:
+        return key in ReleaseNode.__slots__
+
+    def keys(self) -> List[str]:
+        return list(ReleaseNode.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'branches': tree_to_dict(self.branches),
+            'date': self.date,
+        }
+
+
+class TreeBuilder:
+    """Builder of the changelog tree (branch types, tickets and commits).
+
+    Tickets and commits are inserted into the nested mappings as they come.
+    Branch types and tickets keep the order in which they were first seen,
+    commits keep their first position and the last value. Releases are not
+    a level of the tree (see `ReleasesTreeBuilder`).
+    """
+
+    def __init__(self, unique_commit_messages: bool = False):
+        self.unique_commit_messages = unique_commit_messages
+        self.tree: Dict[str, Dict[str, TicketRecord]] = {}
+
+    def get_tickets(
+        self,
+        release: str,
+        branch_type: str
+    ) -> Dict[str, TicketRecord]:
+        """Get tickets of the branch type (created on first use).
+
+        :param release:
+        :param branch_type:
+        :return:
+        """
+        return self.tree.setdefault(branch_type, {})
+
+    def add_ticket(self, release: str, ticket: TicketRecord) -> None:
+        """Add ticket (of a merged branch), unless it's there already.
+
+        :param release:
+        :param ticket: Ticket with (at least) `branch_type`,
+            `ticket_number` and `commits` set.
+        :return:
+        """
+        tickets = self.get_tickets(release, ticket.branch_type)
+        if ticket.ticket_number not in tickets:
+            tickets[ticket.ticket_number] = ticket
+
+    def touch_ticket(
+        self,
+        release: str,
+        branch_type: str,
+        ticket_number: str
+    ) -> TicketRecord:
+        """Get ticket, adding an empty one if it's not there yet.
+
+        :param release:
+        :param branch_type:
+        :param ticket_number:
+        :return:
+        """
+        tickets = self.get_tickets(release, branch_type)
+        ticket = tickets.get(ticket_number)
+        if ticket is None:
+            ticket = tickets[ticket_number] = TicketRecord(commits={})
+        return ticket
+
+    def add_commit(
+        self,
+        release: str,
+        branch_type: str,
+        ticket_number: str,
+        commit_hash: str,
+        commit_abbr: str,
+        author: str,
+        date: str,
+        commit_ticket_number: str,
+        title: str
+    ) -> None:
+        """Add commit to the ticket.
+
+        Commits are keyed by their titles if `unique_commit_messages` is
+        set, by their hashes otherwise.
+
+        :param release:
+        :param branch_type:
+        :param ticket_number: Ticket to add the commit to.
+        :param commit_hash:
+        :param commit_abbr:
+        :param author:
+        :param date:
+        :param commit_ticket_number: Ticket number found in the commit.
+        :param title:
+        :return:
+        """
+        ticket = self.touch_ticket(release, branch_type, ticket_number)
+        ticket.commits[
+            title if self.unique_commit_messages else commit_hash
+        ] = CommitRecord(
+            commit_hash,
+            commit_abbr,
+            author,
+            date,
+            commit_ticket_number,
+            title
+        )
+
+    def build(self) -> Dict[str, Dict[str, TicketRecord]]:
+        """Get the tree.
+
+        :return:
+        """
+        return self.tree
+
+
+class ReleasesTreeBuilder(TreeBuilder):
+    """Builder of the releases changelog tree.
+
+    Same as `TreeBuilder`, with releases (in the order given, the ones not
+    known upfront are added as they come) at the top of the tree.
+    """
+
+    def __init__(
+        self,
+        releases: Iterable[str],
+        date_tags: Dict[str, str],
+        unique_commit_messages: bool = False
+    ):
+        self.date_tags = date_tags
+        self.unique_commit_messages = unique_commit_messages
+        self.releases_tree = OrderedDict(
+            (_release, ReleaseNode(date_tags.get(_release)))
+            for _release in releases
+        )
+
+    def get_branches(self, release: str) -> Dict[str, Dict[str, Any]]:
+        """Get branches of the release (created on first use).
+
+        :param release:
+        :return:
+        """
+        node = self.releases_tree.get(release)
+        if node is None or 'branches' not in node:
+            node = self.releases_tree[release] = ReleaseNode(
+                self.date_tags.get(release, None),
+                {}
+            )
+        return node.branches
+
+    def get_tickets(
+        self,
+        release: str,
+        branch_type: str
+    ) -> Dict[str, TicketRecord]:
+        return self.get_branches(release).setdefault(branch_type, {})
+
+    def build(self) -> Dict[str, ReleaseNode]:
+        """Get the releases tree.
+
+        :return:
+        """
+        return self.releases_tree
+
+
+def tree_to_dict(tree: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert (releases) changelog tree into nested dicts.
+
+    :param tree: Tree of branch types and tickets or (ordered) tree of
+        releases.
+    :return: Same kind of mapping (dict or `OrderedDict`) of dicts.
+    """
+    converted = OrderedDict() if isinstance(tree, OrderedDict) else {}
+    for key, value in tree.items():
+        if isinstance(value, Record):
+            converted[key] = value.to_dict()
+        elif isinstance(value, dict):
+            converted[key] = tree_to_dict(value)
+        else:
+            converted[key] = value
+    return converted
@@ -1,34 +1,61 @@
 import argparse
 from collections import OrderedDict
-import copy
 import json
 import os
-import re
 import sys
 from shutil import copyfile
-from typing import Any, AnyStr, Dict, List, Tuple, Type, Union
+from typing import (
+    Any,
+    AnyStr,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from git import Git
 from git.exc import GitCommandError
 
-from .auto_correct import add_final_dot, capitalize, unslugify
-from .constants import PRETTY_FORMAT, TICKET_NUMBER_OTHER
-from .fetchers import FetcherRegistry
+from .auto_correct import get_normalizer, unslugify
+from .backends import BaseBackend, get_backend
+from .cache import CACHE_DIR_NAME, CommitCache
+from .classifier import CommitClassifier
+from .constants import (
+    PRETTY_FORMAT,
+    RECORD_CHUNK_SIZE,
+    RECORD_FORMAT,
+    TAG_INDEX_FORMAT,
+    TAG_REF_PREFIX,
+    TICKET_NUMBER_OTHER,
+)
+from .fetchers import (
+    CachedFetcher,
+    DEFAULT_NEGATIVE_TTL,
+    DEFAULT_TTL,
+    FetcherRegistry,
+    ISSUE_CACHE_FILE_NAME,
+    IssueCache,
+    MemoizedFetcher,
+)
 from .helpers import project_dir
 from .labels import (
     BRANCH_TYPE_OTHER,
     BRANCH_TYPES,
-    get_ignore_commits_prefixes,
-    get_ignore_commits_regex_patterns,
     get_settings,
-    IGNORE_COMMITS_EXACT_WORDS,
+    get_settings_flag,
     UNRELEASED,
 )
+from .ignore import IgnoreRuleSet
 from .logger import LOGGER
+from .plan import LogPlan
+from .records import iter_records
+from .releases import ReleaseIndex, TagIndex
 from .patterns import (
     REGEX_PATTERN_BRANCH_NAME,
     REGEX_PATTERN_COMMIT,
-    REGEX_PATTERN_COMMIT_LINE,
-    REGEX_PATTERN_MERGED_BRANCH_NAME,
     REGEX_PATTERN_TAG,
 )
 from .renderers import (
@@ -37,136 +64,973 @@ from .renderers import (
     RendererRegistry,
     RestructuredTextRenderer,
 )
+from .store import ColumnarReleasesTreeBuilder
+from .tree import (
+    ReleaseNode,
+    ReleasesTreeBuilder,
+    TicketRecord,
+    tree_to_dict,
+    TreeBuilder,
+)
 
 __author__ = 'Artur Barseghyan'
 __copyright__ = '2019-2020 Artur Barseghyan'
 __license__ = 'GPL-2.0-only OR LGPL-2.1-or-later'
 __all__ = (
+    'build_changelog_trees',
+    'finalize_releases_tree',
     'generate_changelog',
     'generate_changelog_cli',
     'get_branch_type',
+    'get_cached_commit_releases',
+    'get_cached_logs',
+    'get_commit_cache',
+    'get_commit_release',
+    'get_commit_releases',
+    'get_date_tags',
+    'get_default_logs',
+    'get_fetcher',
+    'get_logged_commit_releases',
     'get_logs',
+    'get_max_releases_range',
+    'get_range_commit_releases',
+    'get_record_logs',
+    'get_ref_tags',
+    'get_release_index',
+    'get_releases',
+    'get_releases_tree_builder',
     'get_repository',
+    'get_single_pass_logs',
+    'get_streamed_commit_tags',
+    'get_streamed_logs',
+    'get_tag_index',
+    'get_tag_logs',
+    'get_tag_walk_args',
+    'iter_git_lines',
+    'iter_git_records',
+    'iter_log_entries',
+    'iter_log_parents',
     'json_changelog',
     'json_changelog_cli',
+    'limit_releases',
     'make_config_file',
     'make_config_file_cli',
+    'positive_int',
     'prepare_changelog',
     'prepare_releases_changelog',
     'validate_between',
 )
 
 
-def is_regex_ignored_commit(
-    regex_patterns: Union[List[str], Tuple[str]],
-    commit_message: str
-) -> bool:
-    for ignore_commit_re in regex_patterns:
+def get_repository(path: str = None, backend: str = None) -> BaseBackend:
+    """Get repository (git backend).
+
+    :param path:
+    :param backend: Backend uid (see `BackendRegistry`). If not given, the
+        ``gitBackend`` setting is used.
+    :return:
+    """
+    if not (path and os.path.exists(path) and os.path.isdir(path)):
+        path = os.getcwd()
+
+    if backend is None:
+        backend = get_settings().get('gitBackend')
+
+    return get_backend(path, backend)
+
+
+def get_date_tags(repository: Git) -> Dict[str, str]:
+    """Get tag dates.
+
+    :param repository:
+    :return:
+    """
+    tags_with_dates_text = repository.tag([
+        '-l',
+        '--format=%(refname:short),%(creatordate:short)'
+    ])
+    tags_with_dates = tags_with_dates_text.split('\n')
+    date_tags = {}
+    for _log_data_raw in filter(None, tags_with_dates):
+        _tag, _date = _log_data_raw.split(',')
+        _tag = _tag.strip()
+        if _tag:
+            date_tags.update({_tag: _date})
+    return date_tags
+
+
+def iter_git_lines(repository: Git, command: str, *args) -> Iterator[str]:
+    """Run git command and yield its output line by line.
+
+    The process is started lazily (on first iteration) and its output is
+    read incrementally, so that it's never held in memory as a whole.
+
+    :param repository:
+    :param command: Git command, such as `log`.
+    :param args:
+    :return:
+    """
+    process = getattr(repository, command)(*args, as_process=True)
+    for line in process.stdout:
+        yield line.decode('utf-8', 'replace').rstrip('\n')
+    process.wait()
+
+
+def iter_git_records(repository: Git, *args) -> Iterator[Dict[str, str]]:
+    """Run `git log` and yield parsed records as the output comes.
+
+    :param repository:
+    :param args: Arguments of `git log`, pathspecs (if any) last.
+    :return:
+    """
+    process = repository.log(
+        "--pretty=format:{}".format(RECORD_FORMAT),
+        *args,
+        as_process=True
+    )
+    yield from iter_records(
+        iter(lambda: process.stdout.read(RECORD_CHUNK_SIZE), b'')
+    )
+    process.wait()
+
+
+def iter_log_entries(
+    log: Iterable[Union[str, Dict[str, str]]]
+) -> Iterator[Dict[str, str]]:
+    """Parse log lines into commit entries.
+
+    :param log: Iterable of JSON lines (as produced by the `PRETTY_FORMAT`).
+        Already parsed records are passed through as is.
+    :return:
+    """
+    for json_entry in filter(None, log):
+        if isinstance(json_entry, dict):
+            yield json_entry
+            continue
         try:
-            if re.match(ignore_commit_re, commit_message).group():
-                return True
-        except AttributeError:
-            pass
+            yield json.loads(json_entry)
+        except json.decoder.JSONDecodeError:
+            continue  # TODO: fix this (when commit message contains " symbols)
 
-    return False
 
+def get_tag_index(repository: Git) -> TagIndex:
+    """Get tag index (a single `git for-each-ref refs/tags` pass).
 
-def get_repository(path: str = None) -> Git:
-    if not (path and os.path.exists(path) and os.path.isdir(path)):
-        path = os.getcwd()
+    :param repository:
+    :return:
+    """
+    return TagIndex.parse(
+        repository.for_each_ref(
+            '--sort=creatordate',
+            '--format={}'.format(TAG_INDEX_FORMAT),
+            'refs/tags'
+        )
+    )
+
+
+def get_release_index(repository: BaseBackend,
+                      tag_index: TagIndex = None,
+                      exclude: List[str] = None) -> ReleaseIndex:
+    """Get release index of all tagged commits.
+
+    The parent graph of all tagged commits is read once (see
+    `BaseBackend.get_parents`) and tags are ordered by their creation date.
+
+    :param repository:
+    :param tag_index:
+    :param exclude: Commits excluded from the range. Tags of them (and of
+        their ancestors) release nothing within the range, so they are left
+        out.
+    :return:
+    """
+    if tag_index is None:
+        tag_index = get_tag_index(repository)
+
+    # Tags of the excluded commits are found with a single walk (cut short
+    # by the generation numbers of the commit-graph, if any)
+    tagged_commits = set(
+        repository.get_unreachable(list(tag_index.commits), exclude)
+        if exclude
+        else tag_index.commits
+    )
+    return ReleaseIndex.build(
+        (
+            (_tag, _commit_hash)
+            for _tag, _commit_hash in tag_index.iter_tagged_commits()
+            if _commit_hash in tagged_commits
+        ),
+        repository.get_parents(list(tagged_commits))
+    )
+
+
+def get_commit_release(logs: Dict[str, Any],
+                       entry: Dict[str, str]) -> Optional[str]:
+    """Get release (tag) of the commit entry.
+
+    :param logs: As returned by `get_logs`.
+    :param entry:
+    :return:
+    """
+    release_index = logs.get('RELEASE_INDEX')
+    if release_index is not None:
+        return release_index.get(entry['commit_hash'])
+    commit_releases = logs.get('COMMIT_RELEASES')
+    if commit_releases is not None:
+        return commit_releases.get(entry['commit_hash'])
+    return logs['COMMIT_TAGS'].get(entry['commit_abbr'])
+
+
+def get_releases(logs: Dict[str, Any]) -> List[str]:
+    """Get releases (tags), latest first.
+
+    :param logs: As returned by `get_logs`.
+    :return:
+    """
+    release_index = logs.get('RELEASE_INDEX')
+    if release_index is not None:
+        return release_index.releases
+    commit_releases = logs.get('COMMIT_RELEASES')
+    if commit_releases is None:
+        commit_releases = logs['COMMIT_TAGS']
+    return list(OrderedDict.fromkeys(commit_releases.values()))
+
+
+def get_commit_releases(
+    commits: Iterable[Tuple[str, str, List[str]]]
+) -> Dict[str, str]:
+    """Get releases (tags) of commits out of their parents and tags.
+
+    The tag each commit belongs to is propagated from the tagged commits to
+    their ancestors in the order git walks them (the same way
+    ``git log --tags --source`` does).
+
+    :param commits: Iterable of (commit_hash, parents, tags) tuples in the
+        git log order.
+    :return: Dictionary of full commit hashes and tags.
+    """
+    commit_releases = {}
+    sources = {}
+    for commit_hash, parents, tags in commits:
+        source = min(tags) if tags else sources.pop(commit_hash, None)
+        if not source:
+            continue
+
+        commit_releases[commit_hash] = source
+        for parent in parents.split():
+            sources.setdefault(parent, source)
+
+    return commit_releases
+
+
+def get_tag_walk_args(exclude: List[str]) -> List[str]:
+    """Get git arguments of the walk of the history of tags.
+
+    Commits excluded from the range (and their ancestors) are left out.
+    Releases of the commits within the range do not depend on them, since
+    tags are propagated from descendants to ancestors.
+
+    :param exclude:
+    :return:
+    """
+    return ['--tags', '--not', *exclude] if exclude else ['--tags']
+
+
+def get_range_commit_releases(repository: Git,
+                              range_args: List[str],
+                              tag_index: TagIndex) -> Dict[str, str]:
+    """Get releases (tags) of the commits walked.
+
+    Only hashes and parents are walked (``git rev-list --parents``, no
+    formatting).
+
+    :param repository:
+    :param range_args: See `get_tag_walk_args`.
+    :param tag_index:
+    :return: Dictionary of full commit hashes and tags.
+    """
+    def _iter_commits():
+        for line in iter_git_lines(
+            repository,
+            'rev_list',
+            '--parents',
+            *range_args
+        ):
+            commit_hash, _, parents = line.partition(' ')
+            yield commit_hash, parents, tag_index.get_tags(commit_hash)
+
+    return get_commit_releases(_iter_commits())
+
+
+def get_cached_commit_releases(commit_cache: CommitCache,
+                               exclude: List[str],
+                               tag_index: TagIndex) -> Dict[str, str]:
+    """Get releases (tags) of commits, walking the history of tags cached.
+
+    Same as `get_range_commit_releases`, but nothing is read from git.
+
+    :param commit_cache: Shall hold the history of all tags (see
+        `get_commit_cache`).
+    :param exclude:
+    :param tag_index:
+    :return: Dictionary of full commit hashes and tags.
+    """
+    # Git walks tags in the order of their names
+    tagged_commits = [
+        _commit_hash
+        for _tag, _commit_hash in sorted(tag_index.iter_tagged_commits())
+    ]
+    return get_commit_releases(
+        (
+            _entry['commit_hash'],
+            _entry['merge'],
+            tag_index.get_tags(_entry['commit_hash']),
+        )
+        for _entry in commit_cache.walk(
+            include=list(OrderedDict.fromkeys(tagged_commits)),
+            exclude=exclude
+        )
+    )
 
-    return Git(path)
 
+def iter_log_parents(
+    log: Iterable[Union[str, Dict[str, str]]]
+) -> Iterator[Tuple[str, str]]:
+    """Iterate over hashes and parents of the log entries.
 
-def get_logs(between: str = None, path: str = None) -> Dict[str, Any]:
+    Unlike `iter_log_entries`, JSON lines are not decoded (only the first
+    and the last fields of the `PRETTY_FORMAT` are taken), so no commit is
+    lost because of the characters used in its title.
+
+    :param log: Iterable of JSON lines or parsed records.
+    :return: Iterator of (commit_hash, parents) tuples.
+    """
+    for entry in filter(None, log):
+        if isinstance(entry, dict):
+            yield entry['commit_hash'], entry['merge']
+            continue
+        commit_hash = entry[len('{"commit_hash": "'):].partition('"')[0]
+        parents = entry.rpartition('"merge": "')[2][:-len('"}')]
+        yield commit_hash, parents
+
+
+def get_logged_commit_releases(
+    repository: BaseBackend,
+    log: List[Union[str, Dict[str, str]]],
+    include: List[str],
+    exclude: List[str],
+    tag_index: TagIndex
+) -> Optional[Dict[str, str]]:
+    """Get releases (tags) of commits, walking the log already read.
+
+    Possible only if each of the tags is either within the range, or
+    excluded from it (tags outside of the range might release commits
+    within it). That is checked with a single reachability query, which is
+    cut short as soon as everything is found (see
+    `BaseBackend.get_unreachable`).
+
+    :param repository:
+    :param log: Commits of the range, in the git log order.
+    :param include: Commits included into the range (HEAD, if empty).
+    :param exclude: Commits excluded from the range.
+    :param tag_index:
+    :return: Dictionary of full commit hashes and tags, or None if any of
+        the tags is outside of the range.
+    """
+    if repository.get_unreachable(
+        list(tag_index.commits),
+        (include or [repository.resolve('HEAD')]) + exclude
+    ):
+        return None
+
+    return get_commit_releases(
+        (_commit_hash, _parents, tag_index.get_tags(_commit_hash))
+        for _commit_hash, _parents in iter_log_parents(log)
+    )
+
+
+def get_streamed_commit_tags(repository: Git, *args) -> Dict[str, str]:
+    """Get tags of commits, streamed from the `git log --tags` walk.
+
+    :param repository:
+    :param args: See `get_tag_walk_args`.
+    :return: Dictionary of abbreviated commit hashes and tags.
+    """
+    commit_tags = {}
+    for line in iter_git_lines(
+        repository,
+        'log',
+        "--source",
+        "--oneline",
+        *args
+    ):
+        _commit_tag = line.split(' ', 1)[0].split('\t', 1)
+        if len(_commit_tag) > 1:
+            commit_tags[_commit_tag[0]] = _commit_tag[1]
+    return commit_tags
+
+
+def get_tag_logs(repository: Git,
+                 exclude: List[str],
+                 stream: bool = False,
+                 tag_index: TagIndex = None,
+                 commit_cache: CommitCache = None,
+                 log: List[Union[str, Dict[str, str]]] = None,
+                 include: List[str] = None) -> Dict[str, Any]:
+    """Get tags (releases) of commits.
+
+    Whatever way the logs are read, tags are propagated along the walk of
+    the history of tags (see `get_tag_walk_args`), the same way
+    ``git log --tags --source`` does. If all of the tags are within the
+    range (or excluded from it), the log of the range is that walk already
+    (see `get_logged_commit_releases`).
+
+    :param repository:
+    :param exclude: Commits excluded from the range.
+    :param stream: Stream the ``git log --tags`` walk.
+    :param tag_index: If given, tags are taken from it and propagated along
+        the walk of hashes and parents only. Releases of commits are then
+        keyed by full commit hashes (`COMMIT_RELEASES`).
+    :param commit_cache: If given (along with the `tag_index`), the history
+        of tags is walked out of the cache.
+    :param log: Complete (not filtered) log of the range, if read at once.
+        Only used along with the `tag_index`.
+    :param include: Commits included into the range.
+    :return:
+    """
+    if tag_index is not None:
+        commit_releases = None
+        if log:
+            commit_releases = get_logged_commit_releases(
+                repository,
+                log,
+                include or [],
+                exclude,
+                tag_index
+            )
+        if commit_releases is None and commit_cache is not None:
+            commit_releases = get_cached_commit_releases(
+                commit_cache,
+                exclude,
+                tag_index
+            )
+        if commit_releases is None:
+            commit_releases = get_range_commit_releases(
+                repository,
+                get_tag_walk_args(exclude),
+                tag_index
+            )
+        return {'COMMIT_RELEASES': commit_releases}
+
+    if stream:
+        return {
+            'COMMIT_TAGS': get_streamed_commit_tags(
+                repository,
+                *get_tag_walk_args(exclude)
+            ),
+        }
+
+    text_log_tags = repository.log(
+        "--source",
+        "--oneline",
+        *get_tag_walk_args(exclude)
+    )
+    log_tags = text_log_tags.split("\n")
+    commit_tags_list = [s.split(' ', 1)[0].split('\t', 1) for s in log_tags]
+    return {
+        'TEXT_LOG_TAGS': text_log_tags,
+        'LOG_TAGS': log_tags,
+        'COMMIT_TAGS': dict([l for l in commit_tags_list if len(l) > 1]),
+    }
+
+
+def get_streamed_logs(repository: Git,
+                      range_args: List[str],
+                      with_commits: bool = True,
+                      filter_args: List[str] = None,
+                      merge_filter_args: List[str] = None) -> Dict[str, Any]:
+    """Get merges and commits logs, streamed from git.
+
+    Merges and commits logs are generators, which read the output of git as
+    it comes. Nothing is buffered, so memory usage does not grow with the
+    length of the history. Note, that each of them can be iterated only once.
+
+    :param repository:
+    :param range_args:
+    :param with_commits: If False, regular commits are not read (only
+        merges).
+    :param filter_args: Filters of the commits walk (see
+        `LogPlan.get_filter_args`).
+    :param merge_filter_args: Filters of the merges walk.
+    :return:
+    """
+    filter_args = filter_args or []
+    merge_filter_args = merge_filter_args or []
+    log_merges = iter_git_lines(
+        repository,
+        'log',
+        *range_args,
+        "--pretty={}".format(PRETTY_FORMAT),
+        "--source",
+        "--merges",
+        *merge_filter_args
+    )
+    log = iter_git_lines(
+        repository,
+        'log',
+        *range_args,
+        "--pretty={}".format(PRETTY_FORMAT),
+        "--source",
+        *filter_args
+    ) if with_commits else []
+
+    return {
+        'TEXT_LOG_MERGES': None,
+        'LOG_MERGES': log_merges,
+        'TEXT_LOG': None,
+        'LOG': log,
+    }
+
+
+def get_ref_tags(refs: str) -> List[str]:
+    """Get tag names out of the ref names (`%D`) of a record.
+
+    :param refs:
+    :return:
+    """
+    return [
+        _ref[len(TAG_REF_PREFIX):]
+        for _ref in refs.split(', ')
+        if _ref.startswith(TAG_REF_PREFIX)
+    ]
+
+
+def get_single_pass_logs(repository: Git,
+                         range_args: List[str],
+                         include: List[str],
+                         exclude: List[str],
+                         with_tags: bool = True) -> Dict[str, Any]:
+    """Get merges, commits and releases of commits walking the history once.
+
+    The range is walked along with the history of tags (see
+    `get_tag_walk_args`), reading each commit as a record (see
+    `RECORD_FORMAT`) with its parents and tags (``%D``). Merges are split
+    from regular commits, commits of the range are told apart from the
+    rest of the walk by their parents and releases of commits are
+    propagated along the walk (see `get_commit_releases`), all in Python.
+
+    :param repository:
+    :param range_args: Walked instead, if `with_tags` is False.
+    :param include: Commits included into the range (HEAD, if empty).
+    :param exclude: Commits excluded from the range.
+    :param with_tags: If False, only the range is walked and releases of
+        commits are not read (`COMMIT_RELEASES` are left out).
+    :return:
+    """
+    if with_tags:
+        include = include or [repository.resolve('HEAD')]
+        range_args = [*include, *get_tag_walk_args(exclude)]
+
+    walk = OrderedDict(
+        (_entry['commit_hash'], _entry)
+        for _entry in iter_records([
+            repository.log(
+                *range_args,
+                "--decorate-refs=refs/tags",
+                "--pretty=format:{}".format(RECORD_FORMAT),
+                stdout_as_string=False
+            )
+        ])
+    )
+
+    logs = {'TEXT_LOG_MERGES': None, 'TEXT_LOG': None}
+    if with_tags:
+        logs['COMMIT_RELEASES'] = get_commit_releases(
+            (_commit_hash, _entry['merge'], get_ref_tags(_entry['refs']))
+            for _commit_hash, _entry in walk.items()
+        )
+
+        # Commits of the range are the ones reachable from its upper end
+        in_range = set()
+        stack = list(include)
+        while stack:
+            commit_hash = stack.pop()
+            if commit_hash in in_range or commit_hash not in walk:
+                continue
+            in_range.add(commit_hash)
+            stack.extend(walk[commit_hash]['merge'].split())
+        log = [
+            _entry for _commit_hash, _entry in walk.items()
+            if _commit_hash in in_range
+        ]
+    else:
+        log = list(walk.values())
+
+    logs.update({
+        'LOG_MERGES': [_entry for _entry in log if ' ' in _entry['merge']],
+        'LOG': log,
+    })
+    return logs
+
+
+def get_record_logs(repository: Git,
+                    range_args: List[str],
+                    stream: bool = False,
+                    with_commits: bool = True,
+                    filter_args: List[str] = None,
+                    merge_filter_args: List[str] = None) -> Dict[str, Any]:
+    """Get merges and commits logs as parsed records (see `RECORD_FORMAT`).
+
+    Unlike the JSON lines, records never lose commits because of the
+    characters used in their titles. The history is walked once, unless
+    `stream` is set (in that case merges and commits are streamed in two
+    separate walks, see `get_streamed_logs`).
+
+    :param repository:
+    :param range_args:
+    :param stream:
+    :param with_commits: If False, regular commits are not streamed (only
+        merges). Ignored, unless `stream` is set.
+    :param filter_args: Filters of the commits walk (see
+        `LogPlan.get_filter_args`). Only supported if `stream` is set
+        (merges are split from the commits of the single walk otherwise).
+    :param merge_filter_args: Filters of the merges walk. Same as above.
+    :return:
+    """
+    if stream:
+        filter_args = filter_args or []
+        merge_filter_args = merge_filter_args or []
+        return {
+            'TEXT_LOG_MERGES': None,
+            'LOG_MERGES': iter_git_records(
+                repository,
+                *range_args,
+                "--merges",
+                *merge_filter_args
+            ),
+            'TEXT_LOG': None,
+            'LOG': (
+                iter_git_records(repository, *range_args, *filter_args)
+                if with_commits
+                else []
+            ),
+        }
+
+    log = list(
+        iter_records([
+            repository.log(
+                *range_args,
+                "--pretty=format:{}".format(RECORD_FORMAT),
+                stdout_as_string=False
+            )
+        ])
+    )
+    return {
+        'TEXT_LOG_MERGES': None,
+        'LOG_MERGES': [_entry for _entry in log if ' ' in _entry['merge']],
+        'TEXT_LOG': None,
+        'LOG': log,
+    }
+
+
+def get_commit_cache(repository: BaseBackend,
+                     revisions: List[str]) -> CommitCache:
+    """Get the persistent commit cache, holding the history of revisions.
+
+    Only the commits not cached yet are read from git (everything reachable
+    from the given revisions, but not from the cached tips).
+
+    :param repository:
+    :param revisions: Commit hashes.
+    :return:
+    """
+    cache = CommitCache(repository.get_git_dir()).load()
+    if all(_commit_hash in cache.commits for _commit_hash in revisions):
+        return cache
+
+    # Tips of deleted branches might have been pruned by `git gc`
+    missing = repository.get_missing(cache.tips)
+    if missing:
+        LOGGER.info(f"Discarded {len(missing)} pruned commit cache tips")
+        cache.discard(missing)
+    try:
+        output = repository.log(
+            *revisions,
+            *cache.get_exclude_args(),
+            "--pretty=format:{}".format(RECORD_FORMAT),
+            stdout_as_string=False
+        )
+    except GitCommandError:
+        LOGGER.exception("Could not update the commit cache, rebuilding")
+        cache.clear()
+        output = repository.log(
+            *revisions,
+            "--pretty=format:{}".format(RECORD_FORMAT),
+            stdout_as_string=False
+        )
+    added = cache.update(iter_records([output]))
+    LOGGER.info(f"Added {added} commits to the commit cache")
+    cache.save()
+    return cache
+
+
+def get_cached_logs(commit_cache: CommitCache,
+                    include: List[str],
+                    exclude: List[str]) -> Dict[str, Any]:
+    """Get merges and commits logs as parsed records, walking the cache.
+
+    :param commit_cache: See `get_commit_cache`.
+    :param include: Commits to include.
+    :param exclude: Commits to exclude (along with their ancestors).
+    :return:
+    """
+    log = list(commit_cache.walk(include=include, exclude=exclude))
+    return {
+        'TEXT_LOG_MERGES': None,
+        'LOG_MERGES': [_entry for _entry in log if ' ' in _entry['merge']],
+        'TEXT_LOG': None,
+        'LOG': log,
+    }
+
+
+def get_logs(between: str = None,
+             path: str = None,
+             single_pass: bool = None,
+             stream: bool = None,
+             records: bool = None,
+             cache: bool = None,
+             release_index: bool = None,
+             tag_index: bool = None,
+             plan: LogPlan = None) -> Dict[str, Any]:
     """Get lots of logs.
 
+    Logs are assembled in stages. Merges and commits are read first (by
+    the reader picked by `cache`, `records`, `stream` and `single_pass`,
+    in order of precedence). Then the dates of tags and the releases of
+    commits are read (as picked by `tag_index` and `release_index`, unless
+    the reader has read the releases already). Flags only change the way
+    each stage is done, not its result.
+
     :param between:
     :param path:
+    :param single_pass: Read merges, commits and releases of commits in a
+        single walk along with the history of tags (instead of three, see
+        `get_single_pass_logs`). If not given, the ``singlePassLog``
+        setting is used.
+    :param stream: Stream the logs from git instead of reading them at once.
+        If not given, the ``streamLog`` setting is used.
+    :param records: Read the logs as NUL separated records instead of JSON
+        lines. If not given, the ``recordLog`` setting is used. Records are
+        always read in a single walk (unless streamed).
+    :param cache: Read the logs as records through the persistent commit
+        cache (see `CommitCache`). If not given, the ``commitCache`` setting
+        is used. Implies `tag_index` (the history of tags is walked out of
+        the cache as well).
+    :param release_index: Assign commits to the earliest release (tag)
+        containing them, using the `ReleaseIndex` (stored under the
+        `RELEASE_INDEX` key, `COMMIT_TAGS` are left empty then). If not
+        given, the ``releaseIndex`` setting is used.
+    :param tag_index: Read tags (and their dates) in a single
+        ``git for-each-ref`` pass (see `TagIndex`). Releases of commits are
+        then keyed by full commit hashes (stored under the `COMMIT_RELEASES`
+        key). If not given, the ``tagIndex`` setting is used.
+    :param plan: What is needed of the history (see `LogPlan`). Everything,
+        if not given. Regular commits (`LOG`) are left empty, unless needed.
+        Filters of the plan (dates, author, paths) apply to merges and
+        commits (see `LogPlan.get_filter_args`), but not to the tags.
     :return:
     """
+    if plan is None:
+        plan = LogPlan()
+
+    if single_pass is None:
+        single_pass = get_settings_flag('singlePassLog')
+
+    if stream is None:
+        stream = get_settings_flag('streamLog')
+
+    if records is None:
+        records = get_settings_flag('recordLog')
+
+    if cache is None:
+        cache = get_settings_flag('commitCache')
+
+    if release_index is None:
+        release_index = get_settings_flag('releaseIndex')
+
+    if tag_index is None:
+        tag_index = get_settings_flag('tagIndex')
+
+    # Range bounded by releases, no need to walk the history beyond it
+    if plan.range_tags and not release_index:
+        tag_index = True
+
+    filter_args = plan.get_filter_args()
+    merge_filter_args = plan.get_filter_args(merges=True)
+    if filter_args:
+        # Merges and commits are filtered differently, so they are read in
+        # separate walks.
+        cache = False
+        single_pass = False
+        if records:
+            stream = True
+
+    if cache:
+        tag_index = True
+
     repository = get_repository(path)
-    lower: Union[str, Type[None]] = None
-    upper: Union[str, Type[None]] = None
-    if between:
-        try:
-            rev_list_text = repository.rev_list(between)
-            rev_list = rev_list_text.split('\n')
-            if len(rev_list) >= 2:
-                upper = rev_list[0]
-                lower = rev_list[-1]
-        except GitCommandError as err:
-            pass
+    # Only the ends of the range are resolved, nothing is walked. Invalid
+    # ranges are ignored (the whole history is taken).
+    include, exclude = (
+        repository.resolve_range(between) if between else ([], [])
+    )
+    range_args = [between] if include else []
+
+    with_commit_tags = True
+    if not plan.released:
+        # Only commits not contained in any tag (all of them unreleased)
+        release_index = False
+        with_commit_tags = False
+        range_args = (range_args or ['HEAD']) + ['--not', '--tags']
+
+    # Tag index is shared by all of the stages
+    tags = (
+        get_tag_index(repository) if (tag_index or release_index) else None
+    )
 
-    # Merges log
-    text_log_merges_args = []
-    if lower and upper:
-        # Note, that ~1 addition make sure the lower range is inclusive
-        text_log_merges_args.append(
-            "{}~1..{}".format(lower, upper)
+    # Merges and commits
+    commit_cache = None
+    if cache:
+        include = include or [repository.resolve('HEAD')]
+        if not plan.released:
+            exclude = exclude + list(tags.commits)
+        # History of tags is needed for the releases of commits
+        commit_cache = get_commit_cache(
+            repository,
+            list(OrderedDict.fromkeys(include + exclude + list(tags.commits)))
+        )
+        logs = get_cached_logs(commit_cache, include, exclude)
+    elif records:
+        logs = get_record_logs(
+            repository,
+            range_args,
+            stream=stream,
+            with_commits=plan.commits,
+            filter_args=filter_args,
+            merge_filter_args=merge_filter_args
+        )
+    elif stream:
+        logs = get_streamed_logs(
+            repository,
+            range_args,
+            with_commits=plan.commits,
+            filter_args=filter_args,
+            merge_filter_args=merge_filter_args
+        )
+    elif single_pass:
+        logs = get_single_pass_logs(
+            repository,
+            range_args,
+            include,
+            exclude,
+            with_tags=with_commit_tags and not release_index
         )
+    else:
+        logs = get_default_logs(
+            repository,
+            range_args,
+            with_commits=plan.commits,
+            filter_args=filter_args,
+            merge_filter_args=merge_filter_args
+        )
+
+    if not plan.commits:
+        # Walked anyway (single walk modes), but not needed
+        logs['TEXT_LOG'] = None
+        logs['LOG'] = []
+
+    # Tags and releases of commits
+    logs.update({
+        'TEXT_LOG_TAGS': None,
+        'LOG_TAGS': [],
+        'COMMIT_TAGS': {},
+        'DATE_TAGS': (
+            tags.dates if tags is not None else get_date_tags(repository)
+        ),
+    })
+    if release_index:
+        logs['RELEASE_INDEX'] = get_release_index(repository, tags, exclude)
+    elif with_commit_tags and 'COMMIT_RELEASES' not in logs:
+        logs.update(
+            get_tag_logs(
+                repository,
+                exclude,
+                stream=stream,
+                tag_index=tags,
+                commit_cache=commit_cache,
+                log=(
+                    logs['LOG']
+                    if isinstance(logs['LOG'], list) and not filter_args
+                    else None
+                ),
+                include=include
+            )
+        )
+
+    return logs
+
+
+def get_default_logs(repository: Git,
+                     range_args: List[str],
+                     with_commits: bool = True,
+                     filter_args: List[str] = None,
+                     merge_filter_args: List[str] = None) -> Dict[str, Any]:
+    """Get merges and commits logs, walking the history for each of them.
+
+    :param repository:
+    :param range_args:
+    :param with_commits: If False, regular commits are not read (only
+        merges).
+    :param filter_args: Filters of the commits walk (see
+        `LogPlan.get_filter_args`).
+    :param merge_filter_args: Filters of the merges walk.
+    :return:
+    """
+    filter_args = filter_args or []
+    merge_filter_args = merge_filter_args or []
+
+    # Merges log
+    text_log_merges_args = list(range_args)
     text_log_merges_args.extend([
         "--pretty={}".format(PRETTY_FORMAT),
         "--source",
         # "--all",
         "--merges",
     ])
+    text_log_merges_args.extend(merge_filter_args)
     text_log_merges = repository.log(*text_log_merges_args)
     log_merges = text_log_merges.split("\n")
 
     # Commits log
-    text_log_args = []
-    if lower and upper:
-        # Note, that ~1 addition make sure the lower range is inclusive
-        text_log_args.append(
-            "{}~1..{}".format(lower, upper)
-        )
+    text_log_args = list(range_args)
     text_log_args.extend([
         "--pretty={}".format(PRETTY_FORMAT),
         "--source",
         # "--all"  # TODO: remove
     ])
+    text_log_args.extend(filter_args)
 
-    text_log = repository.log(*text_log_args)
-    log = text_log.split("\n")
-
-    # Tags log
-    tags_with_dates_text = repository.tag([
-        '-l',
-        '--format=%(refname:short),%(taggerdate:short)'
-    ])
-    tags_with_dates = tags_with_dates_text.split('\n')
-    date_tags = {}
-    for _log_data_raw in filter(None, tags_with_dates):
-        _tag, _date = _log_data_raw.split(',')
-        _tag = _tag.strip()
-        if _tag:
-            date_tags.update({_tag: _date})
-
-    text_log_tags_args = []
-    # if lower and upper:
-    #     text_log_tags_args.append(
-    #         "{}..{}".format(lower, upper)
-    #     )
-    text_log_tags_args.extend([
-        "--tags",
-        "--source",
-        "--oneline"
-    ])
-    text_log_tags = repository.log(*text_log_tags_args)
-    log_tags = text_log_tags.split("\n")
-    commit_tags_list = [s.split(' ', 1)[0].split('\t', 1) for s in log_tags]
-    commit_tags = dict([l for l in commit_tags_list if len(l) > 1])
+    if with_commits:
+        text_log = repository.log(*text_log_args)
+        log = text_log.split("\n")
+    else:
+        text_log = None
+        log = []
 
     return {
         'TEXT_LOG_MERGES': text_log_merges,
         'LOG_MERGES': log_merges,
         'TEXT_LOG': text_log,
         'LOG': log,
-        'TEXT_LOG_TAGS': text_log_tags,
-        'LOG_TAGS': log_tags,
-        'COMMIT_TAGS': commit_tags,
-        'DATE_TAGS': date_tags,
     }
 
 
@@ -180,38 +1044,30 @@ def get_branch_type(branch_type: AnyStr) -> str:
     return branch_type if branch_type in BRANCH_TYPES else BRANCH_TYPE_OTHER
 
 
-def prepare_changelog(
-    between: str = None,
-    unique_commit_messages: bool = False,
-    headings_only: bool = False,
-    unreleased_only: bool = False,
+def get_fetcher(
     fetch_title: bool = False,
     fetch_description: bool = False,
-    path: str = None
-) -> Dict[
-        str, Dict[str, Dict[str, Union[str, Dict[str, Union[str, str]]]]]
-]:
-    """Prepare changelog.
+    path: str = None,
+    refresh_fetch_cache: bool = False
+) -> Optional[MemoizedFetcher]:
+    """Get fetcher of the ticket data (``fetchDataFrom`` setting).
+
+    Each distinct ticket is fetched at most once by the returned fetcher
+    (see `MemoizedFetcher`).
+
+    If the ``fetchCache`` setting is on, the fetcher reads tickets through
+    the persistent `IssueCache` (under ``.git/matyan/``), with lifetimes of
+    entries set by the ``fetchCacheTTL`` and ``fetchCacheNegativeTTL``
+    settings (in seconds).
 
-    :param between:
-    :param unique_commit_messages:
-    :param headings_only:
-    :param unreleased_only:
     :param fetch_title:
     :param fetch_description:
-    :param path:
-    :return:
+    :param path: Path to the repository (of the issue cache).
+    :param refresh_fetch_cache: Fetch all tickets anew (cached entries are
+        replaced).
+    :return: Fetcher or None if nothing is to be fetched.
     """
-    logs = get_logs(between=between, path=path)
     settings = get_settings()
-    tree = {}
-
-    cur_branch = None
-    cur_branch_type = None
-    branch_types = {}
-
-    ignore_commits_prefixes = tuple(get_ignore_commits_prefixes())
-
     fetcher = None
 
     if (
@@ -221,6 +1077,26 @@ def prepare_changelog(
     ):
         fetcher_cls = FetcherRegistry.REGISTRY[settings.get('fetchDataFrom')]
         fetcher = fetcher_cls()
+        if get_settings_flag('fetchCache'):
+            ttl = settings.get('fetchCacheTTL')
+            negative_ttl = settings.get('fetchCacheNegativeTTL')
+            fetcher = CachedFetcher(
+                fetcher,
+                IssueCache(
+                    os.path.join(
+                        get_repository(path).get_git_dir(),
+                        CACHE_DIR_NAME,
+                        ISSUE_CACHE_FILE_NAME
+                    )
+                ),
+                ttl=DEFAULT_TTL if ttl is None else float(ttl),
+                negative_ttl=(
+                    DEFAULT_NEGATIVE_TTL if negative_ttl is None
+                    else float(negative_ttl)
+                ),
+                refresh=refresh_fetch_cache
+            )
+        fetcher = MemoizedFetcher(fetcher)
     elif (
         settings.get('fetchDataFrom')
         and settings.get('fetchDataFrom') not in FetcherRegistry.REGISTRY
@@ -229,205 +1105,241 @@ def prepare_changelog(
             f"settings.get('fetchDataFrom') is not found in the registry!"
         )
 
-    # First fill feature branches only
-    for json_entry in logs['LOG_MERGES']:
-        try:
-            entry = json.loads(json_entry)
-        except json.decoder.JSONDecodeError:
-            continue  # TODO: fix this (when commit message contains " symbols)
-        merge_commit = True if ' ' in entry['merge'] else False
-        if merge_commit:
-            match = re.match(REGEX_PATTERN_MERGED_BRANCH_NAME, entry['title'])
+    return fetcher
 
-            # Skip strange feature branches
-            if not match:
-                continue
 
-            # If no pattern found, use other branch
-            try:
-                branch_type = get_branch_type(match.group('branch_type'))
-            except AttributeError:
-                branch_type = BRANCH_TYPE_OTHER
-
-            # If no pattern found, use other ticket number
-            try:
-                ticket_number = match.group('ticket_number')
-            except AttributeError:
-                ticket_number = TICKET_NUMBER_OTHER
-
-            branch_title = None
-            branch_description = None
-            if (
-                fetcher is not None
-                and ticket_number
-                and ticket_number != TICKET_NUMBER_OTHER
-            ):
-                fetcher_data = fetcher.fetch_issue_data(ticket_number)
-                if fetch_title and 'title' in fetcher_data:
-                    branch_title = fetcher_data['title']
-                if fetch_description and 'description' in fetcher_data:
-                    branch_description = fetcher_data['description']
-
-            if not branch_title:
-                branch_title = match.group('branch_title')
-
-            # For normal tree
-            release = logs['COMMIT_TAGS'].get(entry['commit_abbr'])
-
-            if branch_type not in tree:
-                tree[branch_type] = {}
-
-            if ticket_number not in tree[branch_type]:
-                tree[branch_type][ticket_number] = {
-                    'commit_hash': entry['commit_hash'],
-                    'commit_abbr': entry['commit_abbr'],
-                    'date': entry['datetime'],
-                    'ticket_number': ticket_number,
-                    'branch_type': branch_type,
-                    'slug': branch_title,
-                    'title': unslugify(branch_title),
-                    'description': branch_description,
-                    'commits': {},
-                    'release': release,
-                }
-            branch_types.update({ticket_number: branch_type})
+def build_changelog_trees(
+    logs: Dict[str, Any],
+    tree_builder: TreeBuilder = None,
+    releases_tree_builder: ReleasesTreeBuilder = None,
+    headings_only: bool = False,
+    fetch_title: bool = False,
+    fetch_description: bool = False,
+    path: str = None,
+    refresh_fetch_cache: bool = False
+) -> None:
+    """Build changelog trees in a single pass over the logs.
+
+    The changelog tree and the releases changelog tree differ in the way
+    commits are ignored: messages are checked against the exact words and
+    prefixes once normalized for the former, while for the latter raw
+    messages are checked and the regex patterns apply as well.
+
+    :param logs: Logs (see `get_logs`).
+    :param tree_builder: Builder of the changelog tree.
+    :param releases_tree_builder: Builder of the releases changelog tree.
+    :param headings_only: Tickets (of merged branches) only.
+    :param fetch_title:
+    :param fetch_description:
+    :param path: Path to the repository (see `get_fetcher`).
+    :param refresh_fetch_cache: See `get_fetcher`.
+    :return:
+    """
+    builders = [
+        _builder
+        for _builder in (tree_builder, releases_tree_builder)
+        if _builder is not None
+    ]
+    cur_branch = None
+    cur_branch_type = None
+    branch_types = {}
 
-    if headings_only:
-        return tree
+    classifier = CommitClassifier()
+    ignore_rules = IgnoreRuleSet.from_config(regex=False) \
+        if tree_builder is not None \
+        else None
+    releases_ignore_rules = IgnoreRuleSet.from_config() \
+        if releases_tree_builder is not None \
+        else None
+    normalize = get_normalizer()
+    fetcher = get_fetcher(
+        fetch_title,
+        fetch_description,
+        path=path,
+        refresh_fetch_cache=refresh_fetch_cache
+    )
 
-    # Now go through commits
-    for json_entry in filter(None, logs['LOG']):
+    # First fill feature branches only. Merges are collected first, so that
+    # data of their tickets is fetched all at once (and concurrently).
+    merges = [
+        (_entry, _classification)
+        for _entry, _classification in classifier.classify(
+            iter_log_entries(logs['LOG_MERGES'])
+        )
+        # Skip strange feature branches
+        if ' ' in _entry['merge'] and _classification
+    ]
+    fetched = {}
+    if fetcher is not None:
         try:
-            entry = json.loads(json_entry)
-        except json.decoder.JSONDecodeError:
-            continue  # TODO: fix this (when commit message contains " symbols)
-        merge_commit = True if ' ' in entry['merge'] else False
-        if merge_commit:
-            match = re.match(REGEX_PATTERN_MERGED_BRANCH_NAME, entry['title'])
-
-            # Skip strange feature branches
-            if not match:
-                continue
-
-            try:
-                branch_type = get_branch_type(match.group('branch_type'))
-            except AttributeError:
-                branch_type = BRANCH_TYPE_OTHER
+            fetched = fetcher.fetch_many(
+                _classification['ticket_number']
+                for _entry, _classification in merges
+                if _classification['ticket_number']
+                and _classification['ticket_number'] != TICKET_NUMBER_OTHER
+            )
+            fetcher.log_stats()
+        finally:
+            # Nothing else is fetched in this run
+            fetcher.close()
+
+    for entry, classification in merges:
+        branch_type = classification['branch_type']
+        ticket_number = classification['ticket_number']
+
+        branch_title = None
+        branch_description = None
+        if ticket_number in fetched:
+            fetcher_data = fetched[ticket_number]
+            if fetch_title and 'title' in fetcher_data:
+                branch_title = fetcher_data['title']
+            if fetch_description and 'description' in fetcher_data:
+                branch_description = fetcher_data['description']
+
+        if not branch_title:
+            branch_title = classification['message']
+
+        release = get_commit_release(logs, entry)
+        for builder in builders:
+            # Releases tree puts unreleased tickets into a release of
+            # their own
+            if builder is releases_tree_builder and not release:
+                ticket_release = UNRELEASED
+            else:
+                ticket_release = release
+            builder.add_ticket(
+                ticket_release,
+                TicketRecord(
+                    commit_hash=entry['commit_hash'],
+                    commit_abbr=entry['commit_abbr'],
+                    date=entry['datetime'],
+                    ticket_number=ticket_number,
+                    branch_type=branch_type,
+                    slug=branch_title,
+                    title=unslugify(branch_title),
+                    description=branch_description,
+                    commits={},
+                    release=ticket_release,
+                )
+            )
+        branch_types.update({ticket_number: branch_type})
 
-            try:
-                ticket_number = match.group('ticket_number')
-            except AttributeError:
-                ticket_number = TICKET_NUMBER_OTHER
+    if headings_only:
+        return
 
-            branch_title = match.group('branch_title')
-            cur_branch = copy.copy(ticket_number)
-            cur_branch_type = copy.copy(branch_type)
+    # Now go through commits
+    for entry, classification in classifier.classify(
+        iter_log_entries(logs['LOG'])
+    ):
+        if classification is None:
+            # Skip strange feature branches
+            continue
+
+        if classification['merge']:
+            cur_branch = classification['ticket_number']
+            cur_branch_type = classification['branch_type']
+            continue
+
+        ticket_number = classification['ticket_number']
+        commit_message = normalize(classification['message'])
+
+        # Ignore the following messages
+        targets = []
+        if (
+            tree_builder is not None
+            and not ignore_rules.is_ignored(commit_message)
+        ):
+            targets.append(tree_builder)
+        if (
+            releases_tree_builder is not None
+            and not releases_ignore_rules.is_ignored(
+                classification['message']
+            )
+        ):
+            targets.append(releases_tree_builder)
+        if not targets:
+            continue
+
+        if cur_branch:
+            if cur_branch == ticket_number:
+                branch_type = cur_branch_type
+            else:
+                branch_type = branch_types.get(
+                    ticket_number,
+                    BRANCH_TYPE_OTHER
+                )
+            target_ticket_number = ticket_number
         else:
-            match = re.match(REGEX_PATTERN_COMMIT_LINE, entry['title'])
-            try:
-                ticket_number = match.group('ticket_number')
-                commit_message = match.group('commit_message')
-            except AttributeError:
-                ticket_number = ''
-                commit_message = entry['title'][:]
-
-            commit_message = unslugify(commit_message)
-            commit_message = capitalize(commit_message)
-            commit_message = add_final_dot(commit_message)
-
-            # Ignore the following messages
-            if commit_message.lower() in IGNORE_COMMITS_EXACT_WORDS:
-                continue
-
-            if commit_message.lower().startswith(ignore_commits_prefixes):
-                continue
-
-            commit_hash = commit_message \
-                if unique_commit_messages \
-                else entry['commit_hash']
-
-            release = logs['COMMIT_TAGS'].get(entry['commit_abbr'])
+            branch_type = BRANCH_TYPE_OTHER
+            target_ticket_number = TICKET_NUMBER_OTHER
 
+        release = get_commit_release(logs, entry) or UNRELEASED
+        for builder in targets:
             if cur_branch:
-
-                if cur_branch_type not in tree:
-                    tree[cur_branch_type] = {}
-
-                if cur_branch not in tree[cur_branch_type]:
-                    tree[cur_branch_type][cur_branch] = {}
-
-                if 'commits' not in tree[cur_branch_type][cur_branch]:
-                    tree[cur_branch_type][cur_branch]['commits'] = {}
-
-                if cur_branch == ticket_number:
-                    tree[cur_branch_type][cur_branch]['commits'][commit_hash] = {  # NOQA
-                        'commit_hash': entry['commit_hash'],
-                        'commit_abbr': entry['commit_abbr'],
-                        'author': entry['author'],
-                        'date': entry['datetime'],
-                        'ticket_number': ticket_number,
-                        'title': commit_message,
-                    }
-                else:
-                    other_branch_type = branch_types.get(
-                        ticket_number,
-                        BRANCH_TYPE_OTHER
-                    )
-                    try:
-                        if other_branch_type not in tree:
-                            tree[other_branch_type] = {}
-
-                        if ticket_number not in tree[other_branch_type]:
-                            tree[other_branch_type][ticket_number] = {}
-
-                        if 'commits' not in tree[other_branch_type][ticket_number]:
-                            tree[other_branch_type][ticket_number]['commits'] = {}
-
-                        tree[other_branch_type][ticket_number]['commits'][commit_hash] = {  # NOQA
-                            'commit_hash': entry['commit_hash'],
-                            'commit_abbr': entry['commit_abbr'],
-                            'author': entry['author'],
-                            'date': entry['datetime'],
-                            'ticket_number': ticket_number,
-                            'title': commit_message,
-                        }
-                    except:
-                        # TODO: Anything here?
-                        pass
-            else:
-                if BRANCH_TYPE_OTHER not in tree:
-                    tree[BRANCH_TYPE_OTHER] = {}
-
-                if TICKET_NUMBER_OTHER not in tree[BRANCH_TYPE_OTHER]:
-                    tree[BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER] = {}
-
-                if 'commits' not in tree[BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER]:
-                    tree[BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER]['commits'] = {}
-
-                tree[BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER]['commits'][commit_hash] = {  # NOQA
-                    'commit_hash': entry['commit_hash'],
-                    'commit_abbr': entry['commit_abbr'],
-                    'author': entry['author'],
-                    'date': entry['datetime'],
-                    'ticket_number': ticket_number,
-                    'title': commit_message,
-                }
-
-    return tree
+                builder.touch_ticket(release, cur_branch_type, cur_branch)
+            builder.add_commit(
+                release,
+                branch_type,
+                target_ticket_number,
+                entry['commit_hash'],
+                entry['commit_abbr'],
+                entry['author'],
+                entry['datetime'],
+                ticket_number,
+                commit_message
+            )
+
+    for rules in (ignore_rules, releases_ignore_rules):
+        if rules is not None:
+            rules.log_hits()
+    normalize.log_stats()
+
+
+def get_releases_tree_builder(
+    logs: Dict[str, Any],
+    unique_commit_messages: bool = False
+) -> ReleasesTreeBuilder:
+    """Get builder of the releases changelog tree.
+
+    Builder is picked by the ``columnarStore`` setting. Releases of the
+    columnar tree are made on access if the ``lazyTree`` setting is on.
+
+    :param logs:
+    :param unique_commit_messages:
+    :return:
+    """
+    if get_settings_flag('columnarStore'):
+        return ColumnarReleasesTreeBuilder(
+            get_releases(logs),
+            logs['DATE_TAGS'],
+            unique_commit_messages=unique_commit_messages,
+            lazy_tree=get_settings_flag('lazyTree')
+        )
+    return ReleasesTreeBuilder(
+        get_releases(logs),
+        logs['DATE_TAGS'],
+        unique_commit_messages=unique_commit_messages
+    )
 
 
-def prepare_releases_changelog(
+def prepare_changelog(
     between: str = None,
     unique_commit_messages: bool = False,
     headings_only: bool = False,
     unreleased_only: bool = False,
     fetch_title: bool = False,
     fetch_description: bool = False,
-    path: str = None
+    path: str = None,
+    range_tags: bool = False,
+    since: str = None,
+    until: str = None,
+    author: str = None,
+    paths: List[str] = None,
+    refresh_fetch_cache: bool = False
 ) -> Dict[
         str, Dict[str, Dict[str, Union[str, Dict[str, Union[str, str]]]]]
 ]:
-    """Prepare releases changelog.
+    """Prepare changelog.
 
     :param between:
     :param unique_commit_messages:
@@ -436,282 +1348,53 @@ def prepare_releases_changelog(
     :param fetch_title:
     :param fetch_description:
     :param path:
+    :param range_tags: The range is bounded by releases, only tags within
+        it are read (see `LogPlan`).
+    :param since: Only commits more recent than the given date.
+    :param until: Only commits older than the given date.
+    :param author: Only commits of the matching authors.
+    :param paths: Only commits touching the given paths.
+    :param refresh_fetch_cache: Fetch all tickets anew (see `get_fetcher`).
     :return:
     """
-    logs = get_logs(between=between, path=path)
-    settings = get_settings()
-
-    releases_tree = OrderedDict(
-        {
-            _t: {'releases': {}, 'date': logs['DATE_TAGS'].get(_t)}
-            for _, _t
-            in logs['COMMIT_TAGS'].items()
-        }
-    )
-
-    cur_branch = None
-    cur_branch_type = None
-    branch_types = {}
-
-    ignore_commits_prefixes = tuple(get_ignore_commits_prefixes())
-    ignore_commits_regex_patterns = tuple(get_ignore_commits_regex_patterns())
-
-    fetcher = None
-
-    if (
-        (fetch_title or fetch_description)
-        and settings.get('fetchDataFrom')
-        and settings.get('fetchDataFrom') in FetcherRegistry.REGISTRY
-    ):
-        fetcher_cls = FetcherRegistry.REGISTRY[settings.get('fetchDataFrom')]
-        fetcher = fetcher_cls()
-    elif (
-        settings.get('fetchDataFrom')
-        and settings.get('fetchDataFrom') not in FetcherRegistry.REGISTRY
-    ):
-        LOGGER.warning(
-            f"settings.get('fetchDataFrom') is not found in the registry!"
+    logs = get_logs(
+        between=between,
+        path=path,
+        plan=LogPlan.for_changelog(
+            headings_only=headings_only,
+            range_tags=range_tags,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths
         )
+    )
+    tree_builder = TreeBuilder(unique_commit_messages=unique_commit_messages)
+    build_changelog_trees(
+        logs,
+        tree_builder=tree_builder,
+        headings_only=headings_only,
+        fetch_title=fetch_title,
+        fetch_description=fetch_description,
+        path=path,
+        refresh_fetch_cache=refresh_fetch_cache
+    )
+    return tree_builder.build()
 
-    # First fill feature branches only
-    for json_entry in logs['LOG_MERGES']:
-        try:
-            entry = json.loads(json_entry)
-        except json.decoder.JSONDecodeError:
-            continue  # TODO: fix this (when commit message contains " symbols)
-
-        merge_commit = True if ' ' in entry['merge'] else False
-        if merge_commit:
-            match = re.match(REGEX_PATTERN_MERGED_BRANCH_NAME, entry['title'])
-
-            # Skip strange feature branches
-            if not match:
-                continue
-
-            # If no pattern found, use other branch
-            try:
-                branch_type = get_branch_type(match.group('branch_type'))
-            except AttributeError:
-                branch_type = BRANCH_TYPE_OTHER
-
-            # If no pattern found, use other ticket number
-            try:
-                ticket_number = match.group('ticket_number')
-            except AttributeError:
-                ticket_number = TICKET_NUMBER_OTHER
-
-            branch_title = None
-            branch_description = None
-
-            if (
-                fetcher is not None
-                and ticket_number
-                and ticket_number != TICKET_NUMBER_OTHER
-            ):
-                fetcher_data = fetcher.fetch_issue_data(ticket_number)
-                if fetch_title and 'title' in fetcher_data:
-                    branch_title = fetcher_data['title']
-                if fetch_description and 'description' in fetcher_data:
-                    branch_description = fetcher_data['description']
-
-            if not branch_title:
-                branch_title = match.group('branch_title')
-
-            # For normal tree
-            release = logs['COMMIT_TAGS'].get(entry['commit_abbr'])
-            if not release:
-                release = UNRELEASED
-
-            if (
-                release not in releases_tree
-                or 'branches' not in releases_tree.get(release, {})
-            ):
-                releases_tree[release] = {
-                    'branches': {},
-                    'date': logs['DATE_TAGS'].get(release, None),
-                }
-
-            if branch_type not in releases_tree[release]['branches']:
-                releases_tree[release]['branches'][branch_type] = {}
-
-            if ticket_number not in releases_tree[release]['branches'][branch_type]:
-                releases_tree[release]['branches'][branch_type][ticket_number] = {  # NOQA
-                    'commit_hash': entry['commit_hash'],
-                    'commit_abbr': entry['commit_abbr'],
-                    'date': entry['datetime'],
-                    'ticket_number': ticket_number,
-                    'branch_type': branch_type,
-                    'slug': branch_title,
-                    'title': unslugify(branch_title),
-                    'description': branch_description,
-                    'commits': {},
-                    'release': release,
-                }
-            branch_types.update({ticket_number: branch_type})
-    
-    if headings_only:
-        if unreleased_only:
-            return {UNRELEASED: releases_tree.get(UNRELEASED, {})}
-        return releases_tree
-
-    # Now go through commits
-    for json_entry in filter(None, logs['LOG']):
-        try:
-            entry = json.loads(json_entry)
-        except json.decoder.JSONDecodeError:
-            continue  # TODO: fix this (when commit message contains " symbols)
-
-        merge_commit = True if ' ' in entry['merge'] else False
-        if merge_commit:
-            match = re.match(REGEX_PATTERN_MERGED_BRANCH_NAME, entry['title'])
-
-            # Skip strange feature branches
-            if not match:
-                continue
-
-            try:
-                branch_type = get_branch_type(match.group('branch_type'))
-            except AttributeError:
-                branch_type = BRANCH_TYPE_OTHER
-
-            try:
-                ticket_number = match.group('ticket_number')
-            except AttributeError:
-                ticket_number = TICKET_NUMBER_OTHER
-
-            branch_title = match.group('branch_title')
-            cur_branch = copy.copy(ticket_number)
-            cur_branch_type = copy.copy(branch_type)
-        else:
-            match = re.match(REGEX_PATTERN_COMMIT_LINE, entry['title'])
-            try:
-                ticket_number = match.group('ticket_number')
-                commit_message = match.group('commit_message')
-            except AttributeError:
-                ticket_number = ''
-                commit_message = entry['title'][:]
-
-            # Ignore the following messages
-            if commit_message.lower() in IGNORE_COMMITS_EXACT_WORDS:
-                continue
-
-            # Ignore the following messages
-            if commit_message.lower().startswith(ignore_commits_prefixes):
-                continue
-
-            # Ignore the following messages
-            if ignore_commits_regex_patterns:
-                if is_regex_ignored_commit(
-                    ignore_commits_regex_patterns,
-                    commit_message
-                ):
-                    continue
-
-            commit_message = unslugify(commit_message)
-            commit_message = capitalize(commit_message)
-            commit_message = add_final_dot(commit_message)
-
-            commit_hash = commit_message \
-                if unique_commit_messages \
-                else entry['commit_hash']
-
-            release = logs['COMMIT_TAGS'].get(entry['commit_abbr'])
-            if not release:
-                release = UNRELEASED
 
-            if cur_branch:
+def finalize_releases_tree(
+    releases_tree: Dict[str, ReleaseNode],
+    headings_only: bool = False,
+    unreleased_only: bool = False
+) -> Dict[str, ReleaseNode]:
+    """Finalize releases changelog tree.
 
-                if (
-                    release not in releases_tree
-                    or 'branches' not in releases_tree.get(release, {})
-                ):
-                    releases_tree[release] = {
-                        'branches': {},
-                        'date': logs['DATE_TAGS'].get(release, None),
-                    }
-
-                if cur_branch_type not in releases_tree[release]['branches']:
-                    releases_tree[release]['branches'][cur_branch_type] = {}
-
-                if cur_branch not in releases_tree[release]['branches'][cur_branch_type]:
-                    releases_tree[release]['branches'][cur_branch_type][cur_branch] = {}
-
-                if 'commits' not in releases_tree[release]['branches'][cur_branch_type][cur_branch]:
-                    releases_tree[release]['branches'][cur_branch_type][cur_branch]['commits'] = {}
-
-                if cur_branch == ticket_number:
-                    releases_tree[release]['branches'][cur_branch_type][cur_branch]['commits'][commit_hash] = {  # NOQA
-                        'commit_hash': entry['commit_hash'],
-                        'commit_abbr': entry['commit_abbr'],
-                        'author': entry['author'],
-                        'date': entry['datetime'],
-                        'ticket_number': ticket_number,
-                        'title': commit_message,
-                    }
-                else:
-                    other_branch_type = branch_types.get(
-                        ticket_number,
-                        BRANCH_TYPE_OTHER
-                    )
-                    try:
-                        if (
-                            release not in releases_tree
-                            or 'branches' not in releases_tree.get(release, {})
-                        ):
-                            releases_tree[release] = {
-                                'branches': {},
-                                'date': logs['DATE_TAGS'].get(release, None),
-                            }
-
-                        if other_branch_type not in releases_tree[release]['branches']:
-                            releases_tree[release]['branches'][other_branch_type] = {}
-
-                        if ticket_number not in releases_tree[release]['branches'][other_branch_type]:
-                            releases_tree[release]['branches'][other_branch_type][ticket_number] = {}
-
-                        if 'commits' not in releases_tree[release]['branches'][other_branch_type][ticket_number]:
-                            releases_tree[release]['branches'][other_branch_type][ticket_number]['commits'] = {}
-
-                        releases_tree[release]['branches'][other_branch_type][ticket_number]['commits'][commit_hash] = {  # NOQA
-                            'commit_hash': entry['commit_hash'],
-                            'commit_abbr': entry['commit_abbr'],
-                            'author': entry['author'],
-                            'date': entry['datetime'],
-                            'ticket_number': ticket_number,
-                            'title': commit_message,
-                        }
-                    except:
-                        # TODO: Anything here?
-                        pass
-            else:
-                if (
-                    release not in releases_tree
-                    or 'branches' not in releases_tree.get(release, {})
-                ):
-                    releases_tree[release] = {
-                        'branches': {},
-                        'date': logs['DATE_TAGS'].get(release, None),
-                    }
-
-                if BRANCH_TYPE_OTHER not in releases_tree[release]['branches']:
-                    releases_tree[release]['branches'][BRANCH_TYPE_OTHER] = {}
-
-                if TICKET_NUMBER_OTHER not in releases_tree[release]['branches'][BRANCH_TYPE_OTHER]:
-                    releases_tree[release]['branches'][BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER] = {}
-
-                if 'commits' not in releases_tree[release]['branches'][BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER]:
-                    releases_tree[release]['branches'][BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER]['commits'] = {}
-
-                releases_tree[release]['branches'][BRANCH_TYPE_OTHER][TICKET_NUMBER_OTHER]['commits'][commit_hash] = {  # NOQA
-                    'commit_hash': entry['commit_hash'],
-                    'commit_abbr': entry['commit_abbr'],
-                    'author': entry['author'],
-                    'date': entry['datetime'],
-                    'ticket_number': ticket_number,
-                    'title': commit_message,
-                }
-
-    if UNRELEASED in releases_tree:
+    :param releases_tree:
+    :param headings_only:
+    :param unreleased_only:
+    :return:
+    """
+    if UNRELEASED in releases_tree and not headings_only:
         releases_tree.move_to_end(UNRELEASED, last=False)
 
     if unreleased_only:
@@ -720,6 +1403,74 @@ def prepare_releases_changelog(
     return releases_tree
 
 
+def prepare_releases_changelog(
+    between: str = None,
+    unique_commit_messages: bool = False,
+    headings_only: bool = False,
+    unreleased_only: bool = False,
+    fetch_title: bool = False,
+    fetch_description: bool = False,
+    path: str = None,
+    range_tags: bool = False,
+    since: str = None,
+    until: str = None,
+    author: str = None,
+    paths: List[str] = None,
+    refresh_fetch_cache: bool = False
+) -> Dict[
+        str, Dict[str, Dict[str, Union[str, Dict[str, Union[str, str]]]]]
+]:
+    """Prepare releases changelog.
+
+    :param between:
+    :param unique_commit_messages:
+    :param headings_only:
+    :param unreleased_only:
+    :param fetch_title:
+    :param fetch_description:
+    :param path:
+    :param range_tags: The range is bounded by releases, only tags within
+        it are read (see `LogPlan`).
+    :param since: Only commits more recent than the given date.
+    :param until: Only commits older than the given date.
+    :param author: Only commits of the matching authors.
+    :param paths: Only commits touching the given paths.
+    :param refresh_fetch_cache: Fetch all tickets anew (see `get_fetcher`).
+    :return:
+    """
+    logs = get_logs(
+        between=between,
+        path=path,
+        plan=LogPlan.for_changelog(
+            headings_only=headings_only,
+            unreleased_only=unreleased_only,
+            range_tags=range_tags,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths
+        )
+    )
+    releases_tree_builder = get_releases_tree_builder(
+        logs,
+        unique_commit_messages=unique_commit_messages
+    )
+    build_changelog_trees(
+        logs,
+        releases_tree_builder=releases_tree_builder,
+        headings_only=headings_only,
+        fetch_title=fetch_title,
+        fetch_description=fetch_description,
+        path=path,
+        refresh_fetch_cache=refresh_fetch_cache
+    )
+    return finalize_releases_tree(
+        releases_tree_builder.build(),
+        headings_only=headings_only,
+        unreleased_only=unreleased_only
+    )
+
+
 def validate_between(between: str = None) -> bool:
     """Validate between.
 
@@ -731,6 +1482,23 @@ def validate_between(between: str = None) -> bool:
     return True
 
 
+def positive_int(value: str) -> int:
+    """Parse positive integer (type of the command line options).
+
+    :param value:
+    :return:
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"{value!r} is not a positive integer"
+        )
+    return number
+
+
 def get_latest_releases(limit: int = 2, path: str = None) -> list:
     """Get latest <limit> releases.
 
@@ -746,6 +1514,50 @@ def get_latest_releases(limit: int = 2, path: str = None) -> list:
     ).split('\n')[:limit]
 
 
+def get_max_releases_range(max_releases: int,
+                           path: str = None) -> Optional[str]:
+    """Get range of the latest <max_releases> releases (and unreleased).
+
+    The range starts at the release preceding them (in version order, see
+    `get_latest_releases`), so that the history walk stops as soon as
+    <max_releases> release boundaries have been crossed.
+
+    :param max_releases: Positive number.
+    :param path:
+    :return: Range or None if there are no more releases than that (whole
+        history is needed then).
+    """
+    if max_releases < 1:
+        raise ValueError(f"max_releases shall be positive, not {max_releases}")
+    releases = list(
+        filter(None, get_latest_releases(limit=max_releases + 1, path=path))
+    )
+    if len(releases) > max_releases:
+        return '{}..HEAD'.format(releases[max_releases])
+    return None
+
+
+def limit_releases(releases_tree: Dict[str, ReleaseNode],
+                   max_releases: int) -> Dict[str, ReleaseNode]:
+    """Keep the latest <max_releases> releases (and unreleased) only.
+
+    :param releases_tree: Releases tree, latest releases first.
+    :param max_releases: Positive number.
+    :return:
+    """
+    if max_releases < 1:
+        raise ValueError(f"max_releases shall be positive, not {max_releases}")
+    limited = OrderedDict()
+    count = 0
+    for release, release_data in releases_tree.items():
+        if release != UNRELEASED:
+            if count >= max_releases:
+                continue
+            count += 1
+        limited[release] = release_data
+    return limited
+
+
 def json_changelog(between: str = None,
                    include_other: bool = True,
                    show_releases: bool = False,
@@ -753,33 +1565,62 @@ def json_changelog(between: str = None,
                    headings_only: bool = False,
                    fetch_title: bool = False,
                    fetch_description: bool = False,
-                   path: str = None):
+                   path: str = None,
+                   max_releases: int = None,
+                   since: str = None,
+                   until: str = None,
+                   author: str = None,
+                   paths: List[str] = None,
+                   refresh_fetch_cache: bool = False):
     throw_tag = None
+    range_tags = False
     if latest_release:
         latest_two_releases = get_latest_releases(limit=2, path=path)
         latest_two_releases = latest_two_releases[::-1]
         if len(latest_two_releases):
             between = '..'.join(latest_two_releases)
             throw_tag = latest_two_releases[0]
+            range_tags = True
+    elif max_releases is not None and not between:
+        between = get_max_releases_range(max_releases, path=path)
+        range_tags = bool(between)
 
     if not show_releases:
         tree = prepare_changelog(
             between=between,
             unique_commit_messages=True,
             headings_only=headings_only,
-            path=path
+            fetch_title=fetch_title,
+            fetch_description=fetch_description,
+            path=path,
+            range_tags=range_tags,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths,
+            refresh_fetch_cache=refresh_fetch_cache
         )
-        return tree
+        return tree_to_dict(tree)
     else:
         releases_tree = prepare_releases_changelog(
             between=between,
             unique_commit_messages=True,
             headings_only=headings_only,
-            path=path
+            fetch_title=fetch_title,
+            fetch_description=fetch_description,
+            path=path,
+            range_tags=range_tags,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths,
+            refresh_fetch_cache=refresh_fetch_cache
         )
         if latest_release:
             releases_tree.pop(throw_tag, None)
-        return releases_tree
+        elif max_releases is not None:
+            releases_tree = limit_releases(releases_tree, max_releases)
+        return tree_to_dict(releases_tree)
 
 
 def json_changelog_cli() -> Type[None]:
@@ -812,6 +1653,42 @@ def json_changelog_cli() -> Type[None]:
         action='store_true',
         help="Generate changelog for the latest release only",
     )
+    parser.add_argument(
+        '--max-releases',
+        dest="max_releases",
+        type=positive_int,
+        default=None,
+        action='store',
+        help="Generate changelog for the latest N releases only",
+    )
+    parser.add_argument(
+        '--since',
+        dest="since",
+        default=None,
+        action='store',
+        help="Show commits more recent than the given date",
+    )
+    parser.add_argument(
+        '--until',
+        dest="until",
+        default=None,
+        action='store',
+        help="Show commits older than the given date",
+    )
+    parser.add_argument(
+        '--author',
+        dest="author",
+        default=None,
+        action='store',
+        help="Show commits of the matching authors only",
+    )
+    parser.add_argument(
+        '--path',
+        dest="paths",
+        default=None,
+        action='append',
+        help="Show commits touching the given path only (repeatable)",
+    )
     parser.add_argument(
         '--headings-only',
         dest="headings_only",
@@ -833,15 +1710,28 @@ def json_changelog_cli() -> Type[None]:
         action='store_true',
         help="Fetch description",
     )
+    parser.add_argument(
+        '--refresh-fetch-cache',
+        dest="refresh_fetch_cache",
+        default=False,
+        action='store_true',
+        help="Fetch all tickets anew, replacing the cached ones",
+    )
 
     args = parser.parse_args(sys.argv[1:])
     between = args.between if validate_between(args.between) else None
     include_other = not args.no_other
     show_releases = args.show_releases
     latest_release = args.latest_release
+    max_releases = args.max_releases
+    since = args.since
+    until = args.until
+    author = args.author
+    paths = args.paths
     headings_only = args.headings_only
     fetch_title = args.fetch_title
     fetch_description = args.fetch_description
+    refresh_fetch_cache = args.refresh_fetch_cache
 
     changelog = json_changelog(
         between=between,
@@ -850,7 +1740,13 @@ def json_changelog_cli() -> Type[None]:
         latest_release=latest_release,
         headings_only=headings_only,
         fetch_title=fetch_title,
-        fetch_description=fetch_description
+        fetch_description=fetch_description,
+        max_releases=max_releases,
+        since=since,
+        until=until,
+        author=author,
+        paths=paths,
+        refresh_fetch_cache=refresh_fetch_cache
     )
     print(dict(changelog))
 
@@ -868,7 +1764,13 @@ def generate_changelog(between: str = None,
                            Type[MarkdownRenderer],
                            Type[RestructuredTextRenderer]
                        ] = MarkdownRenderer,
-                       path: str = None) -> str:
+                       path: str = None,
+                       max_releases: int = None,
+                       since: str = None,
+                       until: str = None,
+                       author: str = None,
+                       paths: List[str] = None,
+                       refresh_fetch_cache: bool = False) -> str:
     """Generate changelog (markdown format)."""
 
     # if show_latest_release and between:
@@ -877,12 +1779,17 @@ def generate_changelog(between: str = None,
     #         "tags/commits/branches range."
     #     )
     throw_tag = None
+    range_tags = False
     if latest_release:
         latest_two_releases = get_latest_releases(limit=2, path=path)
         latest_two_releases = latest_two_releases[::-1]
         if len(latest_two_releases):
             between = '..'.join(latest_two_releases)
             throw_tag = latest_two_releases[0]
+            range_tags = True
+    elif max_releases is not None and not between:
+        between = get_max_releases_range(max_releases, path=path)
+        range_tags = bool(between)
 
     renderer = renderer_cls()
 
@@ -894,7 +1801,13 @@ def generate_changelog(between: str = None,
             unreleased_only=unreleased_only and show_releases,
             fetch_title=fetch_title,
             fetch_description=fetch_description,
-            path=path
+            path=path,
+            range_tags=range_tags,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths,
+            refresh_fetch_cache=refresh_fetch_cache
         )
 
         return renderer.render_changelog(
@@ -911,10 +1824,18 @@ def generate_changelog(between: str = None,
             unreleased_only=unreleased_only and show_releases,
             fetch_title=fetch_title,
             fetch_description=fetch_description,
-            path=path
+            path=path,
+            range_tags=range_tags,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths,
+            refresh_fetch_cache=refresh_fetch_cache
         )
         if latest_release:
             releases_tree.pop(throw_tag, None)
+        elif max_releases is not None:
+            releases_tree = limit_releases(releases_tree, max_releases)
 
         return renderer.render_releases_changelog(
             releases_tree=releases_tree,
@@ -953,6 +1874,42 @@ def generate_changelog_cli() -> Type[None]:
         action='store_true',
         help="Generate changelog for the latest release only",
     )
+    parser.add_argument(
+        '--max-releases',
+        dest="max_releases",
+        type=positive_int,
+        default=None,
+        action='store',
+        help="Generate changelog for the latest N releases only",
+    )
+    parser.add_argument(
+        '--since',
+        dest="since",
+        default=None,
+        action='store',
+        help="Show commits more recent than the given date",
+    )
+    parser.add_argument(
+        '--until',
+        dest="until",
+        default=None,
+        action='store',
+        help="Show commits older than the given date",
+    )
+    parser.add_argument(
+        '--author',
+        dest="author",
+        default=None,
+        action='store',
+        help="Show commits of the matching authors only",
+    )
+    parser.add_argument(
+        '--path',
+        dest="paths",
+        default=None,
+        action='append',
+        help="Show commits touching the given path only (repeatable)",
+    )
     parser.add_argument(
         '--headings-only',
         dest="headings_only",
@@ -981,6 +1938,13 @@ def generate_changelog_cli() -> Type[None]:
         action='store_true',
         help="Fetch description",
     )
+    parser.add_argument(
+        '--refresh-fetch-cache',
+        dest="refresh_fetch_cache",
+        default=False,
+        action='store_true',
+        help="Fetch all tickets anew, replacing the cached ones",
+    )
     parser.add_argument(
         '--renderer',
         dest="renderer",
@@ -994,10 +1958,16 @@ def generate_changelog_cli() -> Type[None]:
     include_other = not args.no_other
     show_releases = args.show_releases
     latest_release = args.latest_release
+    max_releases = args.max_releases
+    since = args.since
+    until = args.until
+    author = args.author
+    paths = args.paths
     headings_only = args.headings_only
     unreleased_only = args.unreleased_only
     fetch_title = args.fetch_title
     fetch_description = args.fetch_description
+    refresh_fetch_cache = args.refresh_fetch_cache
     renderer_uid = args.renderer
 
     renderer_cls = RendererRegistry.get(renderer_uid, MarkdownRenderer)
@@ -1012,7 +1982,13 @@ def generate_changelog_cli() -> Type[None]:
             unreleased_only=unreleased_only,
             fetch_title=fetch_title,
             fetch_description=fetch_description,
-            renderer_cls=renderer_cls
+            renderer_cls=renderer_cls,
+            max_releases=max_releases,
+            since=since,
+            until=until,
+            author=author,
+            paths=paths,
+            refresh_fetch_cache=refresh_fetch_cache
         )
     )
 